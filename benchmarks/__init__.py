@@ -0,0 +1,23 @@
+"""Benchmark suite.
+
+Fixed workloads on the bundled `data/thermo.inp` and the test data
+subsets, measuring for each operation:
+
+  - wall time (best and median of several repeats, seconds per call)
+  - peak memory allocated during a call (bytes, via tracemalloc)
+  - memory blocks allocated during a call and held on return
+    (tracemalloc snapshots)
+
+Run the suite from the repository root and save the results:
+
+    $ python -m benchmarks run -o base.json
+    $ python -m benchmarks run -o head.json -k db.
+
+Compare two sets of results (e.g. from two commits); regressions
+beyond the thresholds are flagged and the exit status is non-zero:
+
+    $ python -m benchmarks compare base.json head.json
+
+Workloads are registered in `benchmarks.suite` with the `benchmark`
+decorator.
+"""
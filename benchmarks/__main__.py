@@ -0,0 +1,55 @@
+"""Command line interface; see the package docstring."""
+import sys
+import argparse
+
+from benchmarks import runner, suite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command')
+
+    run = commands.add_parser('run', help='run the benchmark suite')
+    run.add_argument('-o', '--output', help='write results (JSON)')
+    run.add_argument('-k', '--select', default='',
+                     help='run benchmarks whose name contains this')
+    run.add_argument('--repeat', type=int, default=5)
+    run.add_argument('--min-time', type=float, default=0.05,
+                     help='minimum duration of a repeat, s')
+
+    compare = commands.add_parser('compare',
+                                  help='compare two sets of results')
+    compare.add_argument('base')
+    compare.add_argument('head')
+    compare.add_argument('--time-threshold', type=float,
+                         default=runner.TIME_THRESHOLD)
+    compare.add_argument('--memory-threshold', type=float,
+                         default=runner.MEMORY_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        benchmarks = {name: setup
+                      for name, setup in suite.BENCHMARKS.items()
+                      if args.select in name}
+        try:
+            results = runner.run(benchmarks, args.repeat, args.min_time,
+                                 log=print)
+        finally:
+            suite.cleanup()
+        if args.output:
+            runner.save(results, args.output)
+        return 0
+    elif args.command == 'compare':
+        rows = runner.compare(runner.load(args.base),
+                              runner.load(args.head),
+                              args.time_threshold,
+                              args.memory_threshold)
+        print(runner.format_comparison(rows))
+        return 1 if any(flags for _, _, _, flags in rows) else 0
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
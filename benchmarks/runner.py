@@ -0,0 +1,188 @@
+"""Measurement, persistence and comparison of benchmark results."""
+import gc
+import json
+import time
+import platform
+import statistics
+import subprocess
+import tracemalloc
+
+
+#: Default regression thresholds (head/base ratios).
+TIME_THRESHOLD = 1.20
+MEMORY_THRESHOLD = 1.10
+
+
+def measure(fn, repeat=5, min_time=0.05):
+    """Measure callable `fn`.
+
+    The number of calls per repeat is chosen so that a repeat takes at
+    least `min_time` seconds. Returns a dict of:
+
+        time   : best time per call, s
+        median : median time per call, s
+        repeat : number of repeats
+        number : calls per repeat
+        peak   : peak memory allocated during one call, bytes
+        allocations : memory blocks allocated during one call and
+                 still held on return (e.g. by its result)
+    """
+    # Calibrate (and warm up)
+    number = 1
+    while True:
+        elapsed = _time(fn, number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed))
+
+    times = [_time(fn, number) / number for i in range(repeat)]
+    peak, allocations = _memory(fn)
+    return {'time': min(times),
+            'median': statistics.median(times),
+            'repeat': repeat,
+            'number': number,
+            'peak': peak,
+            'allocations': allocations}
+
+
+def run(benchmarks, repeat=5, min_time=0.05, log=None):
+    """Run benchmarks (name-keyed dict of setup functions).
+
+    Each setup function returns the callable to be measured; setup
+    cost is excluded. Returns results as a dict with `meta` and
+    name-keyed `results`.
+    """
+    results = {}
+    for name, setup in sorted(benchmarks.items()):
+        fn = setup()
+        results[name] = measure(fn, repeat, min_time)
+        if log is not None:
+            log(_format_result(name, results[name]))
+    return {'meta': _meta(), 'results': results}
+
+
+def compare(base, head, time_threshold=TIME_THRESHOLD,
+            memory_threshold=MEMORY_THRESHOLD):
+    """Compare two sets of results.
+
+    Returns a list of (name, time ratio, peak ratio, flags) for
+    benchmarks present in both, where flags is a (possibly empty)
+    list of the regressed measures ('time', 'peak').
+    """
+    rows = []
+    base, head = base['results'], head['results']
+    for name in sorted(set(base) & set(head)):
+        time_ratio = _ratio(head[name]['time'], base[name]['time'])
+        peak_ratio = _ratio(head[name]['peak'], base[name]['peak'])
+        flags = []
+        if time_ratio > time_threshold:
+            flags.append('time')
+        if peak_ratio > memory_threshold:
+            flags.append('peak')
+        rows.append((name, time_ratio, peak_ratio, flags))
+    return rows
+
+
+def format_comparison(rows):
+    """Format the output of `compare` as a table."""
+    spec = '{:<28}{:>10}{:>10}  {}'
+    lines = [spec.format('benchmark', 'time', 'peak', ''), '-' * 58]
+    for name, time_ratio, peak_ratio, flags in rows:
+        flag = 'REGRESSION ({})'.format(', '.join(flags)) if flags else ''
+        lines.append(spec.format(name,
+                                 '{:.2f}x'.format(time_ratio),
+                                 '{:.2f}x'.format(peak_ratio),
+                                 flag))
+    return '\n'.join(lines)
+
+
+def save(results, path):
+    """Write results to a JSON file."""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    """Read results from a JSON file."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _time(fn, number):
+    # Time `number` calls of fn with the garbage collector disabled
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for i in range(number):
+            fn()
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _memory(fn):
+    # Return (peak bytes, allocations) for a single call of fn;
+    # allocations are the blocks allocated during the call and still
+    # held on return (e.g. by its result), counted from the traces of
+    # tracemalloc so that blocks freed by the call don't offset them
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        result = None
+        tracemalloc.start()
+        try:
+            before = _snapshot()
+            start = tracemalloc.get_traced_memory()[0]
+            result = fn()
+            peak = tracemalloc.get_traced_memory()[1] - start
+            after = _snapshot()
+        finally:
+            tracemalloc.stop()
+        del result
+    finally:
+        if enabled:
+            gc.enable()
+    allocations = sum(max(stat.count_diff, 0) for stat in
+                      after.compare_to(before, 'lineno'))
+    return peak, allocations
+
+
+def _snapshot():
+    # Snapshot of the traced blocks, but those of tracemalloc itself
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def _ratio(a, b):
+    # a/b, tolerating zeros
+    if b == 0:
+        return 1.0 if a == 0 else float('inf')
+    return a / b
+
+
+def _format_result(name, result):
+    return '{:<28}{:>12.3e} s{:>12} B{:>8} allocations'.format(
+        name, result['time'], result['peak'], result['allocations']
+    )
+
+
+def _meta():
+    # Describe the environment and source revision
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL, universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
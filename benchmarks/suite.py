@@ -0,0 +1,366 @@
+"""Benchmark workloads.
+
+Each workload is a setup function registered with `benchmark`; it
+prepares inputs (not measured) and returns the callable that is
+measured. Workloads are fixed so that results are comparable between
+commits.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import itertools
+import subprocess
+import concurrent.futures
+
+import numpy as np
+
+from thermodata import (thermoinp, ceaout, convert, fit, packed,
+                        parallel, validate, vector)
+from thermodata.combustion import Combustion
+from thermodata.flow import Gas
+from thermodata.phases import Phases
+from thermodata.reaction import ReactionSet
+from thermodata.shared import SharedChemDB, SharedDB
+from thermodata.surrogate import Surrogate
+from thermodata.thermodata import ChemDB, Table
+
+
+BENCHMARKS = {}
+
+#: Species of the test data subsets and reference tables.
+SUBSET = tuple(name + '$' for name in ('O2', 'N2', 'Ar', 'CO2', 'C3H8',
+                                       'Air', 'Jet-A(L)', 'Jet-A(g)'))
+REFERENCE_SPECIES = ('CO2', 'C3H8', 'In(cr)', 'Air')
+
+#: Repository root (import path of the import benchmark).
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(thermoinp.__file__)))
+
+#: Reference CEA output.
+CAP_OUT = os.path.join(os.path.dirname(thermoinp.__file__),
+                       'tests', 'data', 'cap_out.txt')
+
+#: Temperature schedule of the reference CEA output (cap_out.txt).
+SCHEDULE = (200.0, 298.15) + tuple(float(T) for T in range(300, 20001, 100))
+
+#: Species and cell temperatures of a combustion CFD inner loop.
+CFD_SPECIES = ('N2', 'O2', 'H2O', 'CO2', 'CO', 'H2', 'OH', 'H', 'O', 'NO')
+CFD_RANGE = (250.0, 3000.0)
+CFD_CELLS = np.random.RandomState(0).uniform(CFD_RANGE[0], CFD_RANGE[1],
+                                             100000)
+
+#: Reactions between the CFD species.
+REACTIONS = ('H2 + 0.5 O2 = H2O', 'CO + 0.5 O2 = CO2', 'H2 = 2 H',
+             'O2 = 2 O', 'N2 + O2 = 2 NO', 'H2O = H + OH',
+             'CO + H2O = CO2 + H2', 'H2 + O2 = 2 OH')
+
+
+def benchmark(name):
+    """Register a workload setup function under `name`."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+# Shared inputs, created on first use
+_cache = {}
+
+def _db():
+    if 'db' not in _cache:
+        _cache['db'] = thermoinp.DB()
+    return _cache['db']
+
+def _chemdb():
+    if 'chemdb' not in _cache:
+        db = _cache['chemdb'] = ChemDB()
+        db.select(REFERENCE_SPECIES)
+    return _cache['chemdb']
+
+def _packed():
+    if 'packed' not in _cache:
+        _cache['packed'] = packed.PackedDB.from_db(_db())
+    return _cache['packed']
+
+def _tmpdir():
+    if 'tmpdir' not in _cache:
+        _cache['tmpdir'] = tempfile.mkdtemp(prefix='thermodata-bench-')
+    return _cache['tmpdir']
+
+
+def _shared():
+    if 'shared' not in _cache:
+        _cache['shared'] = SharedDB.publish(_packed())
+    return _cache['shared']
+
+def _pool(workers, processes):
+    key = 'pool', workers, processes
+    if key not in _cache:
+        if processes:
+            pool = concurrent.futures.ProcessPoolExecutor(workers)
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor(workers)
+        _cache[key] = pool
+    return _cache[key]
+
+
+def cleanup():
+    """Remove temporary files, pools and shared memory created by the
+    workloads."""
+    if 'tmpdir' in _cache:
+        shutil.rmtree(_cache.pop('tmpdir'))
+    for key in [k for k in _cache if k[0] == 'pool']:
+        _cache.pop(key).shutdown()
+    if 'shared' in _cache:
+        _cache.pop('shared').unlink()
+
+
+# --------------------------------------------------------------------
+# Loading
+# --------------------------------------------------------------------
+@benchmark('import.python')
+def import_python():
+    # Start-up of a fresh interpreter, the baseline of import.thermodata
+    command = [sys.executable, '-c', 'pass']
+    return lambda: subprocess.run(command, check=True)
+
+
+@benchmark('import.thermodata')
+def import_thermodata():
+    # A fresh interpreter per call; start-up included (see
+    # import.python)
+    command = [sys.executable, '-c', 'import thermodata.thermodata']
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return lambda: subprocess.run(command, env=env, check=True)
+
+
+@benchmark('db.load')
+def db_load():
+    return thermoinp.DB
+
+
+@benchmark('chemdb.load')
+def chemdb_load():
+    def load():
+        db = ChemDB()
+        db.select()
+        return db
+    return load
+
+
+# --------------------------------------------------------------------
+# Queries
+# --------------------------------------------------------------------
+@benchmark('db.lookup')
+def db_lookup():
+    db = _db()
+    return lambda: db.lookup('.*H2')
+
+
+@benchmark('db.subset')
+def db_subset():
+    db = _db()
+    return lambda: db.subset(SUBSET)
+
+
+@benchmark('chemdb.select')
+def chemdb_select():
+    source = _chemdb()
+    def select():
+        db = ChemDB.__new__(ChemDB)
+        db._source_dict = source._source_dict
+        db.select(REFERENCE_SPECIES)
+        return db
+    return select
+
+
+# --------------------------------------------------------------------
+# CEA output
+# --------------------------------------------------------------------
+@benchmark('ceaout.parse')
+def ceaout_parse():
+    return lambda: list(ceaout.read(CAP_OUT))
+
+
+# --------------------------------------------------------------------
+# Evaluation
+# --------------------------------------------------------------------
+@benchmark('thermo.T')
+def thermo_T():
+    thermo = _chemdb()['CO2'].thermo
+    def sweep():
+        for T in SCHEDULE:
+            thermo.T = T
+    return sweep
+
+
+@benchmark('table.tabulate')
+def table_tabulate():
+    table = Table(SCHEDULE, _chemdb()['CO2'])
+    return table._tabulate
+
+
+@benchmark('vector.evaluate')
+def vector_evaluate():
+    db = _packed()
+    return lambda: vector.evaluate(db, SCHEDULE)
+
+
+@benchmark('vector.derivatives')
+def vector_derivatives():
+    db = _packed()
+    return lambda: vector.evaluate(db, SCHEDULE, derivatives=True)
+
+
+@benchmark('vector.cells')
+def vector_cells():
+    db = _packed()
+    return lambda: vector.evaluate(db, CFD_CELLS, CFD_SPECIES)
+
+
+@benchmark('shared.attach')
+def shared_attach():
+    name = _shared().name
+    def load():
+        view = SharedDB(name)
+        SharedChemDB(view).select(CFD_SPECIES)
+        view.close()
+    return load
+
+
+def _parallel_evaluate(workers, processes=False):
+    # CFD cells x species (10^6 points) over a pool of `workers`
+    def setup():
+        db = _shared() if processes else _packed()
+        pool = _pool(workers, processes)
+        return lambda: parallel.evaluate(db, CFD_CELLS, CFD_SPECIES,
+                                         executor=pool)
+    return setup
+
+for workers in (1, 2, 4):
+    benchmark('parallel.threads.{}'.format(workers))(
+        _parallel_evaluate(workers))
+    benchmark('parallel.processes.{}'.format(workers))(
+        _parallel_evaluate(workers, processes=True))
+
+
+@benchmark('surrogate.cells')
+def surrogate_cells():
+    surrogate = Surrogate.fit(_packed(), CFD_SPECIES, CFD_RANGE)
+    return lambda: surrogate.evaluate(CFD_CELLS, CFD_SPECIES)
+
+
+@benchmark('surrogate.fit')
+def surrogate_fit():
+    db = _packed()
+    return lambda: Surrogate.fit(db, CFD_SPECIES, CFD_RANGE)
+
+
+@benchmark('surrogate.thermo.T')
+def surrogate_thermo_T():
+    surrogate = Surrogate.fit(_packed(), ['CO2'], (200.0, 20000.0))
+    thermo = surrogate.thermo('CO2')
+    def sweep():
+        for T in SCHEDULE:
+            thermo.T = T
+    return sweep
+
+
+@benchmark('flow.stagnation')
+def flow_stagnation():
+    air = Gas(_packed(), ('N2', 'O2', 'Ar'), X=(0.7809, 0.2095, 0.0096))
+    T, mach = np.meshgrid(np.linspace(200.0, 1000.0, 100),
+                          np.linspace(0.1, 3.0, 100))
+    def solve():
+        T0, ratio = air.stagnation(T, mach)
+        air.static(T0, mach)
+    return solve
+
+
+@benchmark('phases.evaluate')
+def phases_evaluate():
+    phases = Phases(_db())
+    return lambda: phases.evaluate(phases.names, SCHEDULE)
+
+
+@benchmark('reaction.evaluate')
+def reaction_evaluate():
+    reactions = ReactionSet(_packed(), REACTIONS)
+    return lambda: reactions.evaluate(SCHEDULE)
+
+
+@benchmark('combustion.grid')
+def combustion_grid():
+    flame = Combustion(['CH4', 'Air'], db=_db())
+    phi, T = np.meshgrid(np.linspace(0.5, 1.5, 100),
+                         np.linspace(300.0, 900.0, 100))
+    amounts = flame.equivalence(phi.ravel(), 'CH4', 'Air')
+    return lambda: flame.solve(amounts, T.ravel())
+
+
+@benchmark('combustion.warm')
+def combustion_warm():
+    flame = Combustion(['CH4', 'Air'], db=_db())
+    phi, T = np.meshgrid(np.linspace(0.5, 1.5, 100),
+                         np.linspace(300.0, 900.0, 100))
+    amounts = flame.equivalence(phi.ravel(), 'CH4', 'Air')
+    guess = flame.solve(amounts, T.ravel())
+    return lambda: flame.solve(amounts, T.ravel() + 10.0, guess=guess)
+
+
+@benchmark('validate.all')
+def validate_all():
+    db = _packed()
+    tables = list(validate.tabulate(db, SCHEDULE))
+    return lambda: validate.validate(db, tables)
+
+
+# --------------------------------------------------------------------
+# Export
+# --------------------------------------------------------------------
+@benchmark('db.format')
+def db_format():
+    subset = _db().subset(SUBSET)
+    return subset.format
+
+
+@benchmark('db.write')
+def db_write():
+    subset = _db().subset(SUBSET)
+    path = os.path.join(_tmpdir(), 'subset.inp')
+    def write():
+        with open(path, 'wb') as f:
+            subset.write(f)
+    return write
+
+
+@benchmark('convert.nasa7')
+def convert_nasa7():
+    db = _db().subset(SUBSET)
+    return lambda: convert.nasa7(db)
+
+
+@benchmark('convert.chemkin')
+def convert_chemkin():
+    fit = convert.nasa7(_db())
+    return lambda: ''.join(convert.chemkin(fit))
+
+
+@benchmark('fit.tables')
+def fit_tables():
+    T = np.arange(200.0, 6001.0, 50.0)
+    table = vector.evaluate(_packed(), T, CFD_SPECIES)
+    return lambda: fit.fit(CFD_SPECIES, T, table.Cp, table.H, table.S)
+
+
+@benchmark('chemdb.write')
+def chemdb_write():
+    db = _chemdb()
+    paths = (os.path.join(_tmpdir(), 'chemdb{}.xml'.format(i))
+             for i in itertools.count())
+    def write():
+        # ChemDB.write refuses to overwrite files
+        path = next(paths)
+        db.write(path)
+        os.remove(path)
+    return write
@@ -0,0 +1,172 @@
+"""Asyncio interface: database loading, batch evaluation and CEA runs.
+
+Parsing a database, evaluating a large sweep or running CEA blocks
+the thread doing it. The coroutines of this module run the work in an
+executor (default: the event loop's thread pool) so that an asyncio
+service keeps serving meanwhile, e.g. starts accepting traffic while
+its database loads:
+
+    >>> loading = asyncio.ensure_future(ChemDB.aload())
+    >>> server = await start()      # serving while the database loads
+    >>> db = await loading
+
+`ChemDB.aload` and `thermoinp.DB.aload` are shorthands for `call`,
+which runs any function so. Batch evaluations are split into chunks
+(see the `parallel` module) submitted to the executor and reassembled
+in order; CEA cases run as asyncio subprocesses, at most
+`max_workers` at once:
+
+    >>> result = await aio.evaluate(packed, T, names,
+    ...                             progress=print)  # 1 4, 2 4, ...
+    >>> outputs = await aio.run_cea(problems, db, progress=report)
+
+`progress(done, total)` is called in the event loop as chunks or
+cases complete. Cancelling a batch cancels its chunks not yet started
+(a chunk being evaluated completes in its worker, its result
+discarded) and kills the CEA processes running, removing their
+working directories. A cancelled `call` returns at once; the function
+runs to completion in its worker.
+"""
+import os
+import shutil
+import asyncio
+import functools
+import subprocess
+
+import numpy as np
+
+from thermodata import cea, parallel, vector
+
+
+async def call(function, *args, executor=None, **kwargs):
+    """Return function(*args, **kwargs), run in `executor` (default:
+    the event loop's)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(function, *args, **kwargs))
+
+
+async def apply(function, *arrays, chunksize=parallel.CHUNK,
+                executor=None, progress=None):
+    """Apply a function of independent points to arrays in chunks.
+
+    As parallel.apply; chunks are evaluated in `executor` (default:
+    the event loop's) and `progress(done, total)` is called with the
+    number of chunks done.
+    """
+    shape, chunks = parallel._chunks(arrays, chunksize)
+    loop = asyncio.get_running_loop()
+    futures = [loop.run_in_executor(executor, function, *args)
+               for args in zip(*chunks)]
+    try:
+        for done, future in enumerate(asyncio.as_completed(futures), 1):
+            await future
+            if progress is not None:
+                progress(done, len(futures))
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return parallel._assemble([future.result() for future in futures],
+                              shape)
+
+
+async def evaluate_pairs(packed, index, T, extrapolate=False,
+                         derivatives=False, chunksize=parallel.CHUNK,
+                         executor=None, progress=None):
+    """Evaluate (species, T) pairs in chunks.
+
+    As vector.evaluate_pairs; see `apply` for the other arguments.
+    Process executors receive `packed` with each chunk; pass a
+    shared.SharedDB to avoid copying it.
+    """
+    function = functools.partial(vector.evaluate_pairs, packed,
+                                 extrapolate=extrapolate,
+                                 derivatives=derivatives)
+    return await apply(function, index, T, chunksize=chunksize,
+                       executor=executor, progress=progress)
+
+
+async def evaluate(packed, T, names=None, extrapolate=False,
+                   derivatives=False, chunksize=parallel.CHUNK,
+                   executor=None, progress=None):
+    """Evaluate species `names` (default: all) at temperatures T in
+    chunks.
+
+    As vector.evaluate; see `evaluate_pairs` for the other arguments.
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    index = vector.species_index(packed, names)
+    result = await evaluate_pairs(packed, index[:, None], T[None, :],
+                                  extrapolate, derivatives, chunksize,
+                                  executor, progress)
+    if names is None:
+        names = packed.names
+    return vector.Properties(list(names), T, *result)
+
+
+async def run_cea(problems, db=None, executable=None, libs=(),
+                  tmpdir=None, timeout=None, max_workers=None,
+                  executor=None, progress=None):
+    """Run CEA problems concurrently.
+
+    As cea.run, the decks being generated in `executor` (default: the
+    event loop's) and at most `max_workers` cases (default: number of
+    CPUs) running at once; `progress(done, total)` is called with the
+    number of cases done. If a case fails, the others are cancelled.
+    """
+    decks = await call(cea._decks, list(problems), db, executor=executor)
+    semaphore = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
+    done = 0
+
+    async def case(text):
+        nonlocal done
+        async with semaphore:
+            output = await run_deck(text, executable, libs, tmpdir,
+                                    timeout)
+        done += 1
+        if progress is not None:
+            progress(done, len(decks))
+        return output
+
+    tasks = [asyncio.ensure_future(case(text)) for text in decks]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def run_deck(text, executable=None, libs=(), tmpdir=None,
+                   timeout=None):
+    """Run CEA on a deck (string) in a subprocess and return its
+    output.
+
+    As cea.run_deck; the process is killed if the coroutine is
+    cancelled.
+    """
+    executable = cea.find_executable(executable)
+    workdir = cea._workdir(text, libs, tmpdir)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            executable, cwd=workdir, stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate((cea.CASE + '\n').encode()), timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired([executable], timeout)
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode,
+                                                [executable],
+                                                stdout.decode(),
+                                                stderr.decode())
+        return cea._output(workdir, executable)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,122 @@
+"""Compact binary database format.
+
+The binary format stores the packed representation of the database
+(see the `packed` module) in a single file:
+
+    offset 0      header (64 bytes, little-endian)
+                    magic        4s  b'TDCB'
+                    version      u4
+                    nspecies     u8
+                    nrows        u8  (temperature intervals)
+                    table offset u8
+                    block offset u8
+                    (zero padding)
+    table offset  species table, nspecies x packed.species_dtype
+    block offset  coefficient block, nrows x packed.NCOLS float64
+
+Files are written from a `ChemDB` or `thermoinp.DB`:
+
+    >>> binary.write(thermoinp.DB(), 'thermo.tdcb')
+
+and opened via `numpy.memmap`:
+
+    >>> db = BinaryDB('thermo.tdcb')
+    >>> co2 = db['CO2']
+
+Opening a file reads the header only. The species table is sorted by
+name and searched by bisection, so the pages of the file which are
+read are those touched by the lookup and the species' coefficients.
+Any number of processes opening the same file share one page-cached
+copy.
+"""
+import struct
+
+import numpy as np
+
+from thermodata import packed
+from thermodata.packed import PackedDB
+
+
+MAGIC = b'TDCB'
+VERSION = 1
+
+_header = struct.Struct('<4sIQQQQ')
+HEADER_SIZE = 64
+
+
+class BinaryDB(PackedDB):
+    """Read-only database view of a memory-mapped binary file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            layout = _read_header(f.read(HEADER_SIZE), path)
+
+        # Both arrays share the one (lazily paged) mapping.
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        super(BinaryDB, self).__init__(*_views(raw, *layout))
+
+
+def write(db, path):
+    """Write database `db` to `path` in the binary format.
+
+    `db` may be a `ChemDB`, a `thermoinp.DB` or a `PackedDB`.
+    """
+    with open(path, 'wb') as f:
+        for data in _serialise(db):
+            f.write(data)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _read_header(data, path):
+    # Validate the header; returns (nspecies, nrows, table offset,
+    # block offset).
+    if len(data) < HEADER_SIZE:
+        raise ValueError("{} is not a binary database.".format(path))
+    magic, version, nspecies, nrows, toff, boff = _header.unpack(
+        data[:_header.size]
+    )
+    if magic != MAGIC:
+        raise ValueError("{} is not a binary database.".format(path))
+    if version != VERSION:
+        errmsg = "{}: unsupported format version {}.".format(path,
+                                                             version)
+        raise ValueError(errmsg)
+    return nspecies, nrows, toff, boff
+
+
+def _views(raw, nspecies, nrows, table_offset, block_offset):
+    # Return the (table, block) views on `raw` (uint8 array of the
+    # whole file) given the layout read from its header
+    table = raw[table_offset:
+                table_offset + nspecies * packed.species_dtype.itemsize]
+    block = raw[block_offset:
+                block_offset + nrows * packed.NCOLS * 8]
+    return (table.view(packed.species_dtype),
+            block.view('<f8').reshape(nrows, packed.NCOLS))
+
+
+def _serialise(db):
+    # Return the contents of the binary file of `db` as a list of
+    # byte strings (header, table, padding, block)
+    if not isinstance(db, PackedDB):
+        db = PackedDB.from_db(db)
+
+    table = np.ascontiguousarray(db.table, dtype=packed.species_dtype)
+    block = np.ascontiguousarray(db.block, dtype='<f8')
+    table_offset = HEADER_SIZE
+    block_offset = _align(table_offset + table.nbytes, 8)
+
+    header = _header.pack(MAGIC, VERSION, len(table), len(block),
+                          table_offset, block_offset)
+    return [header.ljust(HEADER_SIZE, b'\0'),
+            table.tobytes(),
+            b'\0' * (block_offset - table_offset - table.nbytes),
+            block.tobytes()]
+
+
+def _align(offset, n):
+    # Round offset up to a multiple of n
+    return -(-offset // n) * n
@@ -0,0 +1,286 @@
+"""Interface to the NASA Glenn CEA program.
+
+Problems are described by `Problem` (and its `Reactant`s) and written
+to CEA input files ("decks") by `deck`. Given a database, the deck
+starts with a thermo.inp subset so that CEA builds its thermodynamic
+library from the species of the problem only rather than from a
+precompiled `thermo.lib`.
+
+    >>> problem = Problem('tp', {'t,k': (1000, 2000), 'p,bar': 1.0},
+    ...                   reactants=(Reactant('fuel', 'C3H8', 100.0),
+    ...                              Reactant('oxid', 'Air', 100.0)),
+    ...                   only=('CO2', 'CO', 'H2O', 'N2', 'O2', 'Ar'))
+    >>> print(deck(problem, thermoinp.DB()))
+    thermo
+    ...
+    END REACTANTS
+    problem tp t,k=1000,2000 p,bar=1.0
+    react
+      fuel=C3H8 wt%=100.0
+      oxid=Air wt%=100.0
+    only CO2 CO H2O N2 O2 Ar
+    end
+
+Cases are run concurrently in a process pool by `run`, which returns
+the contents of the CEA output files:
+
+    >>> outputs = run(problems, thermoinp.DB(), executable='FCEA2')
+
+The CEA executable is the `executable` argument, else the
+`CEA_EXECUTABLE` environment variable, else 'FCEA2' (on the PATH).
+CEA reads and writes files named after the case in its working
+directory, so each case runs in its own temporary directory (under
+`tmpdir` if given, e.g. a tmpfs such as /dev/shm); the case name is
+passed to the program through a pipe to its standard input.
+"""
+import os
+import shutil
+import tempfile
+import itertools
+import subprocess
+import collections
+import concurrent.futures
+
+from thermodata import thermoinp
+
+
+#: Default executable name, used if CEA_EXECUTABLE is unset.
+EXECUTABLE = 'FCEA2'
+
+#: Case (file) name used in the working directories.
+CASE = 'case'
+
+
+_Reactant = collections.namedtuple('Reactant',
+                                   'role, name, amount, T, units')
+
+class Reactant(_Reactant):
+    """Reactant of a CEA problem.
+
+    Arguments
+    ---------
+
+        role : 'fuel', 'oxid' or 'name' (neither)
+        name : species name
+        amount : relative amount in `units`
+        T : temperature, K (optional)
+        units : 'wt%' (default) or 'mol%'
+    """
+    __slots__ = ()
+
+    def __new__(cls, role, name, amount, T=None, units='wt%'):
+        return super().__new__(cls, role, name, amount, T, units)
+
+    def format(self):
+        """Return the reactant as a line of the 'react' dataset."""
+        line = '  {}={} {}={}'.format(self.role, self.name,
+                                      self.units, self.amount)
+        if self.T is not None:
+            line += ' t,k={}'.format(self.T)
+        return line
+
+
+_Problem = collections.namedtuple('Problem',
+                                  'kind, parameters, reactants, '
+                                  'only, omit, output')
+
+class Problem(_Problem):
+    """CEA problem.
+
+    Arguments
+    ---------
+
+        kind : problem type, e.g. 'tp', 'hp' or 'rocket'
+        parameters : mapping of problem keywords (e.g. 't,k', 'p,bar',
+            'o/f') to a value or a sequence of values
+        reactants : sequence of Reactant
+        only : species names considered as products (optional)
+        omit : species names excluded from the products (optional)
+        output : output keywords, e.g. ('siunits', 'short')
+    """
+    __slots__ = ()
+
+    def __new__(cls, kind, parameters=None, reactants=(), only=(),
+                omit=(), output=()):
+        return super().__new__(cls, kind, dict(parameters or {}),
+                               tuple(reactants), tuple(only),
+                               tuple(omit), tuple(output))
+
+    @property
+    def species(self):
+        """Names of the reactant and `only` species."""
+        names = [reactant.name for reactant in self.reactants]
+        names.extend(self.only)
+        return tuple(collections.OrderedDict.fromkeys(names))
+
+    def format(self):
+        """Return the problem in the CEA input format."""
+        fields = ['problem', self.kind]
+        for keyword, value in self.parameters.items():
+            if isinstance(value, (list, tuple)):
+                value = ','.join(str(v) for v in value)
+            fields.append('{}={}'.format(keyword, value))
+        lines = [' '.join(fields), 'react']
+        lines.extend(reactant.format() for reactant in self.reactants)
+        if self.only:
+            lines.extend(_wrap('only', self.only))
+        if self.omit:
+            lines.extend(_wrap('omit', self.omit))
+        if self.output:
+            lines.append(' '.join(('output',) + self.output))
+        lines.append('end')
+        return '\n'.join(lines)
+
+
+def deck(problem, db=None):
+    """Return the CEA input file for a problem.
+
+    If a database (thermoinp.DB) is given, the deck includes its
+    subset for the problem; the species of the problem (reactants and
+    `only`) if `only` is specified, otherwise the whole database.
+    """
+    if db is None:
+        return problem.format() + '\n'
+    return '\n'.join((thermo_subset(db, problem), problem.format(), ''))
+
+
+def thermo_subset(db, problem):
+    """Return the thermo.inp dataset for a problem (see `deck`).
+
+    All datasets of each species are kept, including the repeated
+    datasets of condensed species with phase transitions.
+    """
+    if not problem.only:
+        return db.format()
+    names = set(problem.species)
+    records = sorted((r for r in db.all if r.name in names),
+                     key=lambda r: r.name)
+    return thermoinp.DB.from_records(records).format()
+
+
+def run(problems, db=None, executable=None, libs=(), tmpdir=None,
+        timeout=None, max_workers=None):
+    """Run CEA problems concurrently in a process pool.
+
+    Returns a list of the CEA outputs (text of the .out files) in the
+    order of `problems`.
+
+    Arguments
+    ---------
+
+        problems : iterable of Problem or of complete decks (strings)
+        db : thermoinp.DB from which the thermo.inp subsets of the
+            decks are generated (see `deck`); if None, CEA uses the
+            thermo.lib given in `libs`
+        executable : CEA executable (see module docstring)
+        libs : paths of files linked into each working directory,
+            e.g. thermo.lib and trans.lib
+        tmpdir : parent directory of the working directories
+        timeout : timeout per case, s
+        max_workers : number of processes (default: number of CPUs)
+    """
+    decks = _decks(problems, db)
+    executable = find_executable(executable)
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+        return list(pool.map(run_deck, decks,
+                             itertools.repeat(executable),
+                             itertools.repeat(libs),
+                             itertools.repeat(tmpdir),
+                             itertools.repeat(timeout)))
+
+
+def run_deck(text, executable=None, libs=(), tmpdir=None, timeout=None):
+    """Run CEA on a deck (string) and return its output.
+
+    The case runs in a new temporary directory which is removed
+    afterwards. Raises subprocess.CalledProcessError if the program
+    fails and IOError if it writes no output file.
+    """
+    executable = find_executable(executable)
+    workdir = _workdir(text, libs, tmpdir)
+    try:
+        subprocess.run([executable], input=CASE + '\n', cwd=workdir,
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                       universal_newlines=True, timeout=timeout,
+                       check=True)
+        return _output(workdir, executable)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def find_executable(executable=None):
+    """Return the CEA executable (see module docstring).
+
+    Paths to existing files are made absolute since cases run in
+    other directories; other names are left to the PATH lookup.
+    """
+    if executable is None:
+        executable = os.environ.get('CEA_EXECUTABLE', EXECUTABLE)
+    if os.path.isfile(executable):
+        executable = os.path.abspath(executable)
+    return executable
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _decks(problems, db):
+    # Decks of `problems` (see `run`)
+    decks = []
+    subsets = {}
+    for problem in problems:
+        if isinstance(problem, str):
+            decks.append(problem)
+            continue
+        if db is None:
+            decks.append(deck(problem))
+            continue
+        # Problems of the same species share one formatted subset
+        key = frozenset(problem.species) if problem.only else None
+        if key not in subsets:
+            subsets[key] = thermo_subset(db, problem)
+        decks.append('\n'.join((subsets[key], problem.format(), '')))
+    return decks
+
+
+def _workdir(text, libs, tmpdir):
+    # New working directory of a case with deck `text` and `libs`
+    workdir = tempfile.mkdtemp(prefix='cea-', dir=tmpdir)
+    try:
+        for path in libs:
+            _link(path, workdir)
+        with open(os.path.join(workdir, CASE + '.inp'), 'w') as f:
+            f.write(text)
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    return workdir
+
+
+def _output(workdir, executable):
+    # Output of the case run in `workdir`
+    try:
+        with open(os.path.join(workdir, CASE + '.out'), 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise IOError("{} wrote no output.".format(executable))
+
+
+def _wrap(keyword, names, width=79):
+    # Return lines of a species list dataset (e.g. 'only'); CEA reads
+    # continuation lines until the next keyword.
+    lines = [keyword]
+    for name in names:
+        if len(lines[-1]) + 1 + len(name) > width:
+            lines.append(' ')
+        lines[-1] += ' ' + name
+    return lines
+
+
+def _link(path, directory):
+    # Make file `path` available in `directory`
+    target = os.path.join(directory, os.path.basename(path))
+    try:
+        os.symlink(os.path.abspath(path), target)
+    except OSError:
+        shutil.copy(path, target)
@@ -0,0 +1,234 @@
+"""Parser for CEA (ThermoBuild) output files.
+
+The output of a thermodynamic properties run (e.g. the test data file
+`cap_out.txt`) is a sequence of cases, each with a list of species and
+a temperature schedule followed, for each species, by the fitted
+coefficients and the table of the thermodynamic functions calculated
+from them.
+
+`parse` reads such output incrementally and yields a `Case` at the
+start of each case followed by a `SpeciesTable` for each of its
+species. Table columns are NumPy arrays. Only the table being read is
+held in memory, so outputs of any size are processed in constant
+memory.
+
+    >>> for record in read('cap_out.txt'):
+    ...     if isinstance(record, SpeciesTable):
+    ...         print(record.name, len(record.T))
+    CO2 201
+    C3H8 73
+    InCl3(cr) 0
+    Air 0
+
+`parse_tables` reads plain tables, such as those of the ThermoBuild
+web interface, where each table is preceded by the species name.
+
+Units are those of the output: K, J/mol-K (Cp, S, -(G-H298)/T) and
+kJ/mol (H-H298, H, delta Hf). Values printed as INFINITE are `inf`;
+blank values (delta Hf and log K above the range of the reference
+elements) are `nan`.
+"""
+import collections
+
+import numpy as np
+
+
+#: Columns of the tables; see SpeciesTable.
+COLUMNS = ('T', 'Cp', 'HH298', 'S', 'GH298T', 'H', 'Hf', 'logK')
+
+#: Columns of abridged tables (T, Cp, H-H298, S, H).
+SHORT_COLUMNS = (0, 1, 2, 3, 5)
+
+
+_Case = collections.namedtuple('Case', 'species, options, schedule')
+
+class Case(_Case):
+    """CEA output case.
+
+    Arguments
+    ---------
+
+        species : tuple of the species names of the case
+        options : options line (string), e.g. 'joules'
+        schedule : temperature schedule, K (array)
+    """
+    __slots__ = ()
+
+
+def _column(index, doc):
+    # Property returning a column of the table data
+    return property(lambda self: self.data[:, index], doc=doc)
+
+
+_SpeciesTable = collections.namedtuple('SpeciesTable',
+                                       'name, case, dataset, data')
+
+class SpeciesTable(_SpeciesTable):
+    """Thermodynamic functions of a species.
+
+    Arguments
+    ---------
+
+        name : species name
+        case : the Case of the species
+        dataset : fitted coefficients as printed (thermo.inp format
+            with 'E' exponents; empty if the species wasn't found)
+        data : table, (n, 8) array with columns as COLUMNS
+
+    The columns are available as properties (views on `data`).
+    """
+    __slots__ = ()
+
+    T = _column(0, "Temperature, K")
+    Cp = _column(1, "Heat capacity, J/mol-K")
+    HH298 = _column(2, "H-H298, kJ/mol")
+    S = _column(3, "Entropy, J/mol-K")
+    GH298T = _column(4, "-(G-H298)/T, J/mol-K")
+    H = _column(5, "Enthalpy, kJ/mol")
+    Hf = _column(6, "Enthalpy of formation, kJ/mol")
+    logK = _column(7, "log10 of the equilibrium constant of formation")
+
+
+def read(path):
+    """Parse the CEA output file at `path`; see `parse`."""
+    with open(path, 'r') as f:
+        for record in parse(f):
+            yield record
+
+
+def parse(lines):
+    """Parse CEA output from an iterable of lines (e.g. a file).
+
+    Yields a Case at the start of each case, followed by a
+    SpeciesTable for each species of the case.
+    """
+    state = None
+    pending = []            # unrecognised lines, e.g. the species list
+    case = None
+    schedule = []
+    dataset = []
+    rows = []
+    name = None
+    index = 0
+
+    for line in lines:
+        stripped = line.strip()
+
+        if state == 'table':
+            if not stripped:
+                continue
+            row = _row(stripped)
+            if row is not None:
+                rows.append(row)
+                continue
+            if stripped.startswith(('T ', 'deg-K')):
+                continue
+            # End of the table
+            yield _table(name, case, dataset, rows)
+            state, dataset, rows = None, [], []
+
+        elif state == 'schedule':
+            if not stripped:
+                continue
+            try:
+                schedule.extend(float(T) for T in stripped.split())
+                continue
+            except ValueError:
+                case = Case(case.species, case.options,
+                            np.array(schedule))
+                yield case
+                state, schedule = None, []
+
+        elif state == 'coefficients':
+            if stripped.startswith('THERMODYNAMIC FUNCTIONS'):
+                name = stripped.rpartition(' FOR')[2].strip()
+                if not name and index < len(case.species):
+                    name = case.species[index]
+                index += 1
+                state = 'table'
+            elif stripped:
+                dataset.append(line.rstrip('\n'))
+            continue
+
+        # Section headings
+        if stripped.startswith('OPTIONS:'):
+            species = tuple(' '.join(pending).split())
+            options = stripped[len('OPTIONS:'):].strip()
+            case = Case(species, options, None)
+            pending, index = [], 0
+        elif stripped == 'TEMPERATURE SCHEDULE':
+            state = 'schedule'
+        elif stripped.startswith('COEFFICIENTS FOR FITTED'):
+            state = 'coefficients'
+            pending = []
+        elif stripped:
+            pending.append(stripped)
+
+    if state == 'table':
+        yield _table(name, case, dataset, rows)
+    elif state == 'schedule':
+        yield Case(case.species, case.options, np.array(schedule))
+
+
+def parse_tables(lines, name=None):
+    """Parse plain tables from an iterable of lines.
+
+    Each table is preceded by a line holding the species name (tables
+    before any such line are given `name`) and optionally the column
+    headings. Rows have the columns of CEA output or the abridged
+    columns (T, Cp, H-H298, S, H). Yields SpeciesTable without case
+    or dataset.
+    """
+    rows = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        row = _row(stripped)
+        if row is not None:
+            rows.append(row)
+        elif stripped.startswith(('T ', 'deg-K')):
+            continue
+        elif len(stripped.split()) == 1:
+            # Species name
+            if rows or name is not None:
+                yield _table(name, None, (), rows)
+            name, rows = stripped, []
+    if rows or name is not None:
+        yield _table(name, None, (), rows)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+_SPECIAL = {'INFINITE': np.inf, '-INFINITE': -np.inf}
+
+
+def _row(line):
+    # Return the values of a table row (padded with nan), or None if
+    # the line isn't a row.
+    fields = line.split()
+    try:
+        values = [float(field) for field in fields]
+    except ValueError:
+        try:
+            float(fields[0])
+            values = [_SPECIAL[field] if field in _SPECIAL
+                      else float(field) for field in fields]
+        except (ValueError, KeyError):
+            return None
+    if len(values) == len(SHORT_COLUMNS):
+        row = [np.nan] * len(COLUMNS)
+        for i, value in zip(SHORT_COLUMNS, values):
+            row[i] = value
+        return row
+    if not len(SHORT_COLUMNS) < len(values) <= len(COLUMNS):
+        return None
+    values.extend([np.nan] * (len(COLUMNS) - len(values)))
+    return values
+
+
+def _table(name, case, dataset, rows):
+    # Return a SpeciesTable of the rows
+    data = np.array(rows, dtype=float).reshape(-1, len(COLUMNS))
+    return SpeciesTable(name, case, '\n'.join(dataset), data)
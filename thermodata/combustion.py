@@ -0,0 +1,357 @@
+"""Batched chemical equilibrium and adiabatic flame temperatures.
+
+`Combustion` computes the equilibrium composition of ideal-gas
+products at constant pressure and either constant enthalpy (the
+adiabatic flame temperature; `solve`) or a given temperature
+(`equilibrate`). It uses the element-potential formulation of CEA
+(NASA RP-1311, chapter 2): Newton iterations on the element
+potentials, the total moles and the temperature, with the CEA step
+limits.
+
+All cases, e.g. a grid of equivalence ratios and inlet temperatures,
+are iterated at once; each iteration solves a small linear system per
+case with one batched `numpy.linalg.solve`. Converged cases are
+frozen while the others iterate. A previous result can warm start a
+solve of neighbouring cases:
+
+    >>> flame = Combustion(['Jet-A(L)', 'Air'])
+    >>> phi = np.linspace(0.5, 1.5, 101)
+    >>> amounts = flame.equivalence(phi, 'Jet-A(L)', 'Air')
+    >>> result = flame.solve(amounts, T=298.15)
+    >>> result.T[50]    # phi = 1
+    2269.3...
+    >>> hot = flame.solve(amounts, T=350.0, guess=result)
+
+Reactants are species of the database (thermoinp.DB); reactant-only
+entries without intervals (e.g. 'CH4(L)') have their assigned
+enthalpy, whatever the temperature given. Amounts are moles, so
+results are for the amounts given (e.g. result.n).
+
+Limitations: only gaseous products; no ions; the products must
+contain every element of the reactants.
+"""
+import numpy as np
+
+from thermodata import constants, thermoinp, vector
+from thermodata.packed import PackedDB
+
+
+#: Default products.
+PRODUCTS = ('Ar', 'CO', 'CO2', 'H', 'H2', 'H2O', 'HO2', 'N', 'N2', 'NO',
+            'NO2', 'O', 'O2', 'OH')
+
+#: Valences of the elements, for equivalence ratios (as CEA).
+VALENCES = {'H': 1, 'C': 4, 'N': 0, 'O': -2, 'F': -1, 'CL': -1, 'S': 4,
+            'AR': 0, 'HE': 0, 'NE': 0, 'KR': 0, 'XE': 0, 'B': 3,
+            'AL': 3, 'LI': 1, 'NA': 1, 'K': 1, 'BE': 2, 'MG': 2,
+            'SI': 4}
+
+#: Default convergence tolerance of the moles (relative) and T.
+TOL = 5e-6
+TOL_T = 1e-4
+
+#: Default maximum number of iterations.
+MAXITER = 50
+
+#: Initial temperature of adiabatic solves (as CEA), K.
+T_INITIAL = 3800.0
+
+# ln of the smallest mole fraction kept
+_LN_TRACE = np.log(1e-30)
+
+
+class Equilibrium(object):
+    """Equilibrium products of a set of cases.
+
+    Attributes
+    ----------
+
+        species : product species names
+        T : temperatures, K (ncases)
+        P : pressures, bar (ncases)
+        n : moles of the products (ncases, nspecies)
+        X : mole fractions of the products (ncases, nspecies)
+        b : moles of the elements (ncases, nelements)
+        converged : convergence flags (ncases)
+        iterations : number of iterations of each case
+    """
+    def __init__(self, species, T, P, n, b, converged, iterations):
+        self.species = species
+        self.T = T
+        self.P = P
+        self.n = n
+        self.b = b
+        self.converged = converged
+        self.iterations = iterations
+
+    @property
+    def X(self):
+        """Mole fractions of the products."""
+        return self.n / self.n.sum(axis=1, keepdims=True)
+
+    def __getitem__(self, name):
+        # Mole fractions of product `name`
+        return self.X[:, self.species.index(name)]
+
+
+class Combustion(object):
+    """Equilibrium of reactants to gaseous products.
+
+    Arguments
+    ---------
+
+        reactants : reactant species names
+        products : product species names (gases)
+        db : thermoinp.DB (default: the NASA Glenn database)
+
+    Attributes
+    ----------
+
+        reactants, products : species names
+        elements : element symbols (as formulas; e.g. 'AR')
+        A : moles of element per mole of product (nelements, nspecies)
+        B : moles of element per mole of reactant (nelements,
+            nreactants)
+    """
+    def __init__(self, reactants, products=PRODUCTS, db=None):
+        if db is None:
+            db = thermoinp.DB()
+        self.reactants = list(reactants)
+        self.products = list(products)
+        records = {name: db[name] for name in self.reactants +
+                   self.products}
+        for name in self.products:
+            if records[name].phase != 0:
+                raise ValueError("{} isn't gaseous.".format(name))
+            if not records[name].intervals:
+                raise ValueError("{} has no intervals.".format(name))
+
+        self.elements = sorted({element for name in self.products
+                                for element in records[name].elements})
+        self.A = _element_matrix(records, self.products, self.elements)
+        self.B = _element_matrix(records, self.reactants, self.elements)
+        missing = {element for name in self.reactants
+                   for element, count in records[name].elements.items()
+                   if count} - set(self.elements)
+        if missing:
+            raise ValueError("No products contain {}.".format(
+                ', '.join(sorted(missing))))
+
+        wanted = set(records)
+        self.packed = PackedDB.from_db(db.subset(
+            filt=lambda record: record.name in wanted))
+        self._products = vector.species_index(self.packed, self.products)
+        self._reactants = vector.species_index(self.packed,
+                                               self.reactants)
+        self._assigned = np.array([
+            np.nan if records[name].intervals
+            else records[name].h_assigned for name in self.reactants])
+
+        # Temperature range common to the products
+        table = self.packed.table[self._products]
+        start = table['start']
+        stop = start + table['nintervals'] - 1
+        self.bounds = (self.packed.block[start, 0].max(),
+                       self.packed.block[stop, 1].min())
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def equivalence(self, phi, fuel, oxidant):
+        """Return amounts (mol; len(phi) x nreactants) of mixtures of
+        `fuel` and one mole of `oxidant` at equivalence ratios phi.
+
+        Equivalence ratios are defined by the element valences (see
+        VALENCES) as in CEA.
+        """
+        phi = np.atleast_1d(np.asarray(phi, dtype=float))
+        valences = []
+        for name in (fuel, oxidant):
+            column = self.B[:, self.reactants.index(name)]
+            try:
+                valences.append(sum(VALENCES[element] * count
+                                    for element, count
+                                    in zip(self.elements, column)
+                                    if count))
+            except KeyError as e:
+                errmsg = "No valence for element {}.".format(e.args[0])
+                raise ValueError(errmsg)
+        stoichiometric = -valences[1] / valences[0]
+        amounts = np.zeros((len(phi), len(self.reactants)))
+        amounts[:, self.reactants.index(fuel)] = phi * stoichiometric
+        amounts[:, self.reactants.index(oxidant)] = 1.0
+        return amounts
+
+    def enthalpy(self, amounts, T):
+        """Return the enthalpies (J) of the reactants of each case.
+
+        T is the temperature of all reactants of each case (ncases) or
+        of each reactant (ncases x nreactants).
+        """
+        amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+        T = np.asarray(T, dtype=float)
+        if T.ndim < 2:
+            T = T.reshape(-1, 1)
+        T = np.broadcast_to(T, amounts.shape)
+        H = vector.evaluate_pairs(self.packed, self._reactants, T)[2]
+        H = np.where(np.isnan(self._assigned), H, self._assigned)
+        # Absent reactants don't count (e.g. out of range)
+        return np.sum(np.where(amounts != 0, amounts * H, 0.0), axis=1)
+
+    def solve(self, amounts, T=298.15, P=1.0, guess=None, tol=TOL,
+              maxiter=MAXITER):
+        """Adiabatic, constant pressure equilibrium.
+
+        Arguments
+        ---------
+
+            amounts : moles of the reactants (ncases x nreactants)
+            T : reactant temperatures, K (see `enthalpy`)
+            P : pressure, bar (scalar or ncases)
+            guess : an Equilibrium to start from (e.g. of neighbouring
+                cases)
+            tol : convergence tolerance of the moles (relative)
+            maxiter : maximum number of iterations
+
+        Returns an Equilibrium; T is the flame temperature.
+        """
+        amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+        return self._solve(amounts, self.enthalpy(amounts, T), None, P,
+                           guess, tol, maxiter)
+
+    def equilibrate(self, amounts, T, P=1.0, guess=None, tol=TOL,
+                    maxiter=MAXITER):
+        """Equilibrium at temperatures T (K; scalar or ncases) and
+        pressure P; see `solve`."""
+        amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+        T = np.broadcast_to(np.asarray(T, dtype=float),
+                            (len(amounts),)).copy()
+        return self._solve(amounts, None, T, P, guess, tol, maxiter)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _solve(self, amounts, h0, T, P, guess, tol, maxiter):
+        # Newton iterations of all cases (RP-1311 equations 2.24,
+        # 2.26 and 2.28 for Delta ln T where h0 is given).
+        A = self.A
+        nel, ns = A.shape
+        ncases = len(amounts)
+        P = np.broadcast_to(np.asarray(P, dtype=float), (ncases,))
+        b0 = amounts @ self.B.T
+
+        # Elements absent from a case, and the products containing them
+        scale = b0.max(axis=1, keepdims=True)
+        absent = b0 <= 1e-12 * scale
+        excluded = (absent.astype(float) @ (A > 0)) > 0
+
+        # Initial estimates
+        if guess is not None:
+            ratio = b0.sum(axis=1) / guess.b.sum(axis=1)
+            n = guess.n * ratio[:, None]
+            n = np.maximum(n, 1e-20 * n.sum(axis=1, keepdims=True))
+            lnT = np.log(guess.T) if T is None else np.log(T)
+        else:
+            n = np.repeat(amounts.sum(axis=1, keepdims=True) / ns, ns,
+                          axis=1)
+            lnT = np.log(np.full(ncases, T_INITIAL) if T is None else T)
+        lnn = np.log(n)
+        lnN = np.log(n.sum(axis=1))
+        adiabatic = h0 is not None
+        fixed_T = T
+        lnTmin, lnTmax = np.log(self.bounds[0]), np.log(self.bounds[1])
+
+        converged = np.zeros(ncases, dtype=bool)
+        iterations = np.zeros(ncases, dtype=int)
+        m = nel + 2
+        identity = np.eye(m)
+        for iteration in range(maxiter):
+            active = ~converged
+            if not active.any():
+                break
+            iterations[active] += 1
+
+            T = np.exp(lnT)
+            rows = vector.rows(self.packed, self._products[None, :],
+                               T[:, None], extrapolate=True)
+            cp, h, s = vector.dimensionless(self.packed, rows, T[:, None])
+            nj = np.where(excluded, 0.0, np.exp(lnn))
+            mu = np.where(excluded, 0.0,
+                          h - s + lnn - lnN[:, None] + np.log(P)[:, None])
+
+            # Reduced Newton system (ncases, m, m)
+            An = A[None, :, :] * nj[:, None, :]        # a_ij n_j
+            Anh = An * h[:, None, :]
+            M = np.zeros((ncases, m, m))
+            rhs = np.zeros((ncases, m))
+            M[:, :nel, :nel] = An @ A.T
+            M[:, :nel, nel] = M[:, nel, :nel] = An.sum(axis=2)
+            M[:, :nel, nel + 1] = M[:, nel + 1, :nel] = Anh.sum(axis=2)
+            M[:, nel, nel] = nj.sum(axis=1) - np.exp(lnN)
+            M[:, nel, nel + 1] = M[:, nel + 1, nel] = (nj * h).sum(axis=1)
+            M[:, nel + 1, nel + 1] = (nj * (cp + h * h)).sum(axis=1)
+            rhs[:, :nel] = b0 - An.sum(axis=2) + (An * mu[:, None, :]).sum(
+                axis=2)
+            rhs[:, nel] = (np.exp(lnN) - nj.sum(axis=1)
+                           + (nj * mu).sum(axis=1))
+            if adiabatic:
+                rhs[:, nel + 1] = (h0 / (constants.R_CEA * T)
+                                   - (nj * h).sum(axis=1)
+                                   + (nj * h * mu).sum(axis=1))
+
+            # Absent elements (and T if fixed) drop out
+            fixed = np.concatenate([absent, np.zeros((ncases, 1), bool),
+                                    np.full((ncases, 1), not adiabatic)],
+                                   axis=1)
+            M = np.where(fixed[:, :, None] | fixed[:, None, :], 0.0, M)
+            M += identity * fixed[:, :, None]
+            rhs = np.where(fixed, 0.0, rhs)
+            x = np.linalg.solve(M, rhs[:, :, None])[:, :, 0]
+            pi, dlnN, dlnT = x[:, :nel], x[:, nel], x[:, nel + 1]
+            dlnn = (-mu + pi @ A + dlnN[:, None] + h * dlnT[:, None])
+            dlnn = np.where(excluded, 0.0, dlnn)
+
+            # Step limits (RP-1311 section 3.3)
+            lnx = lnn - lnN[:, None]
+            major = lnx > np.log(1e-8)
+            largest = np.max(np.where(major, np.abs(dlnn), 0.0), axis=1)
+            largest = np.maximum(largest, 5.0 * np.maximum(np.abs(dlnT),
+                                                           np.abs(dlnN)))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = np.minimum(1.0, 2.0 / largest)
+                rising = ~major & (dlnn - dlnN[:, None] > 0)
+                minor = np.abs((-lnx + np.log(1e-4))
+                               / (dlnn - dlnN[:, None]))
+                step = np.minimum(step, np.min(np.where(
+                    rising, minor, np.inf), axis=1))
+            step = np.where(active, step, 0.0)
+
+            lnn = lnn + step[:, None] * dlnn
+            lnN = lnN + step * dlnN
+            lnT = np.clip(lnT + step * dlnT, lnTmin, lnTmax)
+            lnn = np.maximum(lnn, lnN[:, None] + _LN_TRACE)
+
+            # Convergence (RP-1311 section 3.6)
+            total = nj.sum(axis=1)
+            done = ((np.max(nj * np.abs(dlnn), axis=1) <= tol * total)
+                    & (np.exp(lnN) * np.abs(dlnN) <= tol * total)
+                    & (np.abs(dlnT) <= TOL_T))
+            converged |= active & done
+
+        n = np.where(excluded, 0.0, np.exp(lnn))
+        T = np.exp(lnT) if adiabatic else fixed_T
+        return Equilibrium(self.products, T, P.copy(), n, b0, converged,
+                           iterations)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _element_matrix(records, names, elements):
+    # Moles of element per mole of species (nelements, nspecies)
+    matrix = np.zeros((len(elements), len(names)))
+    for j, name in enumerate(names):
+        for element, count in records[name].elements.items():
+            if element in elements:
+                matrix[elements.index(element), j] = count
+    return matrix
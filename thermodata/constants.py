@@ -7,6 +7,9 @@ constants:
     R_CEA : Molar gas constant defined by Gordon and McBride
     M	  : Molar mass constant, kg/mol 
 
+The values are read from `data/constants.xml` the first time any of
+them is accessed.
+
 Note:
 
 The molar gas constant, R, is given by the CODATA 2010 
@@ -31,20 +34,51 @@ References
 
 """
 import os
-from xml.etree import ElementTree as ET
+
+
+# Module attributes and the names of the constants they are loaded
+# from. The XML tree is parsed on first access to any of them.
+_names = {'M': 'molar mass constant',                 # kg/mol
+          'R': 'molar gas constant',                  # J/mol-K
+          'R_CEA': 'cea molar gas constant'}          # J/mol-K
+
+_values = None
+
 
 def fetch_value(name):
     """Return physical constant value from the XML tree"""
-    tree = ET.parse(os.path.join(os.path.dirname(__file__), 
+    global _values
+    if _values is None:
+        _values = _parse()
+    return _values[name]
+
+
+def _parse():
+    # Parse the XML tree into a name-keyed dict of values
+    from xml.etree import ElementTree as ET
+
+    tree = ET.parse(os.path.join(os.path.dirname(__file__),
                                  'data',
                                  'constants.xml'
                                  )
                     )
     root = tree.getroot()
-    xpath = "./PhysicalConstant[@name='{}']/value".format(name)
-    text = root.find(xpath).text
-    return float(text)
+    return {node.get('name'): float(node.find('value').text)
+            for node in root.iterfind('./PhysicalConstant')}
+
+
+def __getattr__(name):
+    # Lazily evaluate the module constants (M, R and R_CEA); once
+    # evaluated they are ordinary module attributes.
+    try:
+        value = fetch_value(_names[name])
+    except KeyError:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        )
+    globals()[name] = value
+    return value
+
 
-M = fetch_value('molar mass constant') 			# kg/mol
-R = fetch_value('molar gas constant') 			# J/mol-K
-R_CEA = fetch_value('cea molar gas constant')	# J/mol-K
+def __dir__():
+    return sorted(set(globals()) | set(_names))
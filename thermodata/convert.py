@@ -0,0 +1,561 @@
+"""Conversion to and from the Chemkin and Cantera formats.
+
+Chemkin THERMO data are 7-coefficient (NASA-7) polynomials over two
+temperature ranges, so the 9-coefficient intervals of the database
+are refitted: `nasa7` fits the heat capacity of all species at once
+by linear least squares (continuous at the common temperature), and
+the enthalpy and entropy constants to the database values, reporting
+the maximum errors of each fit. Species whose fits are worse than
+`max_error` (e.g. across lambda transitions) are written as comments:
+
+    >>> fit = nasa7(thermoinp.DB())
+    >>> fit.error[fit.index['CO2']]     # Cp/R, H/RT, S/R
+    array([0.0262..., 0.0132..., 0.0059...])
+    >>> with open('therm.dat', 'w') as f:
+    ...     f.writelines(chemkin(fit))
+
+Cantera reads the 9-coefficient intervals as they are (NASA9), so
+`cantera` converts exactly; or writes the NASA-7 fits (`model`):
+
+    >>> with open('species.yaml', 'w') as f:
+    ...     f.writelines(cantera(thermoinp.DB(), ('CO2', 'H2O')))
+
+`chemkin` and `cantera` generate the output one species at a time.
+Data in either format are read back as SpeciesRecord (see the
+`thermoinp` module; NASA-7 polynomials are 9-coefficient polynomials
+with a1 = a2 = 0) by `read_chemkin` and `read_cantera`, the latter
+requiring PyYAML:
+
+    >>> hf = {r.name: r.h_formation for r in thermoinp.DB().all}
+    >>> records = read_chemkin(open('therm.dat'), h_formation=hf)
+    >>> db = thermoinp.DB.from_records(records)
+
+Neither format gives molar masses; they are calculated from the
+compositions, with atomic masses taken from the molar masses of a
+database (`db`; default: the NASA Glenn database).
+Formation enthalpies are those at 298.15 K of the polynomials, or
+given by name (`h_formation`); they are required for species without
+data at 298.15 K (e.g. AL(L), 0.0 in the NASA Glenn database) and
+ValueError is raised if not given.
+
+Species are those of a thermoinp.DB or of the selection of a ChemDB
+(whose compositions are those of the NASA Glenn database), except
+species without intervals. Species whose compositions Chemkin can't
+represent (fractional atoms, more than 5 elements) are written as
+comments.
+"""
+import json
+import math
+import itertools
+
+import numpy as np
+
+from thermodata import constants, poly, thermoinp, vector
+from thermodata.packed import PackedDB
+
+
+#: Default common and maximum temperatures of NASA-7 fits, K.
+T_MID = 1000.0
+T_HIGH = 6000.0
+
+#: Fitted points per temperature range.
+NPOINTS = 64
+
+#: Default largest error (any of Cp/R, H/RT, S/R) of written fits.
+MAX_ERROR = 1.0
+
+#: Exponents of the 9-coefficient polynomials.
+EXPONENTS = (-2.0, -1.0, 0.0, 1.0, 2.0, 3.0, 4.0, 0.0)
+
+# Temperature scale of the least-squares problems (conditioning)
+_SCALE = 1000.0
+
+# Least fraction of a species' temperature range in either range of
+# its NASA-7 fit
+_MARGIN = 0.1
+
+
+class NASA7(object):
+    """NASA-7 fits of species (see `nasa7`).
+
+    Attributes
+    ----------
+
+        names : species names
+        index : dict of {name: species index}
+        records : SpeciesRecord of each species
+        T : array (nspecies, 3); low, common and high temperatures, K
+        low, high : arrays (nspecies, 7); coefficients of the low
+            and high temperature ranges
+        error : array (nspecies, 3); maximum absolute errors of
+            Cp/R, H/RT and S/R
+    """
+    def __init__(self, records, T, low, high, error):
+        self.records = records
+        self.names = [record.name for record in records]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.T = T
+        self.low = low
+        self.high = high
+        self.error = error
+
+    def __len__(self):
+        return len(self.names)
+
+    def dimensionless(self, T):
+        """Return (Cp/R, H/RT, S/R) of the fits at temperatures T
+        (broadcast against the species, e.g. shape (nspecies, n))."""
+        T = np.asarray(T, dtype=float)
+        upper = T > self.T[:, 1:2]
+        a = np.where(upper[..., None], self.high[:, None],
+                     self.low[:, None])
+        return _nasa7(a, T)
+
+
+def nasa7(db, names=None, T_mid=T_MID, T_high=T_HIGH, npoints=NPOINTS):
+    """Fit NASA-7 polynomials to species of a database.
+
+    The ranges of each species are from its lowest temperature to
+    `T_mid` and from `T_mid` to its highest temperature or `T_high`,
+    whichever is lower; or from the middle of the range where `T_mid`
+    is outside it or near its ends (within a tenth of the range). Heat
+    capacity is fitted at `npoints` temperatures per range.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB or ChemDB
+        names : species names (default: all with intervals)
+
+    Returns NASA7.
+    """
+    records = _records(db, names)
+    packed = PackedDB.from_db(thermoinp.DB.from_records(records))
+    index = vector.species_index(packed, [r.name for r in records])
+    lower = np.array([r.intervals[0].lim[0] for r in records])
+    upper = np.array([min(r.intervals[-1].lim[1], T_high)
+                      for r in records])
+    margin = _MARGIN * (upper - lower)
+    middle = np.where((lower + margin <= T_mid) & (T_mid <= upper - margin),
+                      T_mid, (lower + upper) / 2.0)
+
+    # Fit and check temperatures of each range
+    u = np.linspace(0.0, 1.0, npoints)
+    T = np.concatenate([_spaced(lower, middle, u),
+                        _spaced(middle, upper, u)], axis=1)
+    v = np.linspace(0.0, 1.0, 4 * npoints)
+    check = np.concatenate([_spaced(lower, middle, v),
+                            _spaced(middle, upper, v)], axis=1)
+
+    cp, h, s = _source(packed, index, T)
+    low, high = _fit_cp(T / _SCALE, middle / _SCALE, cp, npoints)
+    _fit_constants(low, high, T, middle, h * T, s, npoints)
+
+    fit = NASA7(records, np.stack([lower, middle, upper], axis=1),
+                low, high, None)
+    expected = _source(packed, index, check)
+    fit.error = np.stack([np.abs(x - y).max(axis=1) for x, y in
+                          zip(fit.dimensionless(check), expected)],
+                         axis=1)
+    return fit
+
+
+def chemkin(db, names=None, max_error=MAX_ERROR, **options):
+    """Generate a Chemkin THERMO block.
+
+    Arguments
+    ---------
+
+        db : NASA7 fits, or thermoinp.DB or ChemDB to fit (see
+            `nasa7`, to which `options` are passed)
+        names : species names (default: all with intervals)
+        max_error : largest error of written fits (NASA7.error);
+            species above it are written as comments
+
+    Yields the lines of the block, species by species.
+    """
+    fit = db if isinstance(db, NASA7) else nasa7(db, names, **options)
+    yield 'THERMO ALL\n'
+    yield '{:10.3f}{:10.3f}{:10.3f}\n'.format(fit.T[:, 0].min(),
+                                              np.median(fit.T[:, 1]),
+                                              fit.T[:, 2].max())
+    for i, record in enumerate(fit.records):
+        try:
+            _check_error(fit, i, max_error)
+            yield _chemkin_entry(record, fit.T[i], fit.low[i],
+                                 fit.high[i])
+        except ValueError as error:
+            yield '! {} skipped: {}\n'.format(record.name, error)
+    yield 'END\n'
+
+
+def cantera(db, names=None, model='NASA9', max_error=MAX_ERROR,
+            **options):
+    """Generate Cantera YAML species entries.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB or ChemDB, or NASA7 fits
+        names : species names (default: all with intervals)
+        model : 'NASA9' (exact) or 'NASA7' (fits; see `nasa7`, to
+            which `options` are passed)
+        max_error : largest error of written NASA7 fits; species
+            above it are written as comments
+
+    Yields the lines of a 'species' list, species by species.
+    """
+    if isinstance(db, NASA7):
+        model, fit, records = 'NASA7', db, db.records
+    elif model == 'NASA7':
+        fit = nasa7(db, names, **options)
+        records = fit.records
+    elif model == 'NASA9':
+        records = _records(db, names)
+    else:
+        raise ValueError("Unknown model: {}".format(model))
+
+    yield 'species:\n'
+    for i, record in enumerate(records):
+        if model == 'NASA7':
+            try:
+                _check_error(fit, i, max_error)
+            except ValueError as error:
+                yield '# {} skipped: {}\n'.format(record.name, error)
+                continue
+            ranges = fit.T[i].tolist()
+            data = [fit.low[i].tolist(), fit.high[i].tolist()]
+        else:
+            ranges = ([x.lim[0] for x in record.intervals] +
+                      [record.intervals[-1].lim[1]])
+            data = [list(x.a) + list(x.b) for x in record.intervals]
+        lines = ['- name: {}'.format(json.dumps(record.name)),
+                 '  composition: {{{}}}'.format(', '.join(
+                     '{}: {}'.format(_symbol(element), _number(count))
+                     for element, count in record.elements.items())),
+                 '  thermo:',
+                 '    model: {}'.format(model),
+                 '    temperature-ranges: [{}]'.format(
+                     ', '.join(map(_number, ranges))),
+                 '    data:']
+        lines.extend('    - [{}]'.format(', '.join(map(repr, row)))
+                     for row in data)
+        if record.comments.strip():
+            lines.append('  note: {}'.format(
+                json.dumps(record.comments.strip())))
+        yield '\n'.join(lines) + '\n'
+
+
+def read_chemkin(lines, db=None, h_formation=None):
+    """Read species from a Chemkin THERMO block (or file of entries).
+
+    Arguments
+    ---------
+
+        lines : iterable of lines, e.g. a file
+        db : thermoinp.DB of the atomic masses (default: the NASA
+            Glenn database)
+        h_formation : dict of {name: enthalpy of formation at 298.15
+            K, J/mol}; required for species without data at 298.15 K
+
+    Yields SpeciesRecord.
+    """
+    masses = _masses(db)
+    T_mid = T_MID
+    entry = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.lstrip().startswith('!'):
+            continue
+        keyword = line.split()[0].upper()
+        if keyword.startswith('THERMO'):
+            continue
+        if keyword == 'END':
+            break
+        if not entry and _chemkin_ranges(line):
+            T_mid = float(line[10:20])
+            continue
+        entry.append(line)
+        if len(entry) == 4:
+            yield _read_chemkin_entry(entry, T_mid, masses,
+                                      h_formation or {})
+            entry = []
+    if entry:
+        raise ValueError("Incomplete entry: {}".format(entry[0]))
+
+
+def read_cantera(stream, db=None, h_formation=None):
+    """Read species from Cantera YAML (NASA7 or NASA9 models).
+
+    Arguments
+    ---------
+
+        stream : YAML document (string or file) with a 'species' list
+            (or a list of species)
+        db : thermoinp.DB of the atomic masses (default: the NASA
+            Glenn database)
+        h_formation : dict of {name: enthalpy of formation at 298.15
+            K, J/mol}; required for species without data at 298.15 K
+
+    Yields SpeciesRecord. Requires PyYAML.
+    """
+    import yaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    document = yaml.load(stream, Loader=loader)
+    if isinstance(document, dict):
+        document = document.get('species', [])
+    masses = _masses(db)
+    h_formation = h_formation or {}
+    for species in document:
+        thermo = species.get('thermo', {})
+        model = thermo.get('model')
+        ranges = thermo.get('temperature-ranges', [])
+        data = thermo.get('data', [])
+        if model == 'NASA7':
+            # The high temperature range is second
+            data = [[0.0, 0.0] + list(a[:5]) + list(a[5:7]) for a in data]
+        elif model != 'NASA9':
+            raise ValueError("{}: unsupported model {}".format(
+                species['name'], model))
+        if len(ranges) != len(data) + 1:
+            raise ValueError("{}: ranges don't match the data".format(
+                species['name']))
+        elements = {element.upper(): float(count) for element, count
+                    in species['composition'].items()}
+        intervals = [(ranges[i:i + 2], a[:7], a[7:9])
+                     for i, a in enumerate(data)]
+        yield _record(species['name'], elements, intervals, masses,
+                      h_formation, comments=species.get('note', ''))
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _records(db, names):
+    # SpeciesRecord of `names` (default: all with intervals) of a
+    # thermoinp.DB or the selection of a ChemDB
+    if not hasattr(db, 'all'):
+        names = list(db) if names is None else names
+        db = thermoinp.DB()
+    if names is None:
+        names = list({r.name: None for r in db.all if r.intervals})
+    records = [db[name] for name in names]
+    for record in records:
+        if not record.intervals:
+            raise ValueError("{} has no intervals.".format(record.name))
+    return records
+
+
+def _spaced(lower, upper, u):
+    # Temperatures at fractions `u` of the ranges (lower, upper)
+    return lower[:, None] + (upper - lower)[:, None] * u
+
+
+def _source(packed, index, T):
+    # (Cp/R, H/RT, S/R) of the database at temperatures T (extended to
+    # the bounds of the ranges)
+    rows = vector.rows(packed, index[:, None], T, extrapolate=True)
+    return vector.dimensionless(packed, rows, T)
+
+
+def _fit_cp(t, tm, cp, npoints):
+    # Least-squares coefficients (low, high) of Cp/R at scaled
+    # temperatures t, continuous at tm; the first `npoints` are of
+    # the low range. Unknowns: the low coefficients and the high
+    # coefficients but the first, given by continuity.
+    powers = np.arange(5)
+    tk = t[..., None] ** powers
+    mk = tm[:, None, None] ** powers
+    A = np.concatenate([tk, np.zeros_like(tk[..., 1:])], axis=2)
+    A[:, npoints:, :5] = mk
+    A[:, npoints:, 5:] = tk[:, npoints:, 1:] - mk[..., 1:]
+    x = np.einsum('sij,sj->si', np.linalg.pinv(A), cp)
+
+    scale = _SCALE ** -powers
+    low = x[:, :5]
+    high = np.concatenate([low[:, :1] + np.sum((low[:, 1:] - x[:, 5:]) *
+                                               mk[:, 0, 1:], axis=1)[:, None],
+                           x[:, 5:]], axis=1)
+    low = np.concatenate([low * scale, np.zeros((len(t), 2))], axis=1)
+    high = np.concatenate([high * scale, np.zeros((len(t), 2))], axis=1)
+    return low, high
+
+
+def _fit_constants(low, high, T, Tm, H, S, npoints):
+    # Fit the integration constants (a6, a7) of both ranges to H/R
+    # and S/R at temperatures T, continuous at Tm (in place)
+    for k, target, integral in ((5, H, _h_integral),
+                                (6, S, _s_integral)):
+        jump = integral(low, Tm) - integral(high, Tm)
+        residual = np.concatenate(
+            [target[:, :npoints] - integral(low, T[:, :npoints]),
+             target[:, npoints:] - integral(high, T[:, npoints:])
+             - jump[:, None]], axis=1)
+        low[:, k] = residual.mean(axis=1)
+        high[:, k] = low[:, k] + jump
+
+
+def _h_integral(a, T):
+    # H/R of NASA-7 coefficients `a` (rows) but the constant
+    T = np.asarray(T, dtype=float)
+    a = a[:, None] if T.ndim == 2 else a
+    return sum(a[..., k] * T ** (k + 1) / (k + 1) for k in range(5))
+
+
+def _s_integral(a, T):
+    # S/R of NASA-7 coefficients `a` (rows) but the constant
+    T = np.asarray(T, dtype=float)
+    a = a[:, None] if T.ndim == 2 else a
+    return a[..., 0] * np.log(T) + sum(a[..., k] * T ** k / k
+                                       for k in range(1, 5))
+
+
+def _check_error(fit, i, max_error):
+    # Raise ValueError if the fit of species i is worse than max_error
+    error = fit.error[i].max()
+    if error > max_error:
+        raise ValueError("fit error {:.3g} above {:.3g}".format(
+            error, max_error))
+
+
+def _nasa7(a, T):
+    # (Cp/R, H/RT, S/R) of NASA-7 coefficients a[..., 0:7]
+    cp = sum(a[..., k] * T ** k for k in range(5))
+    h = (sum(a[..., k] * T ** k / (k + 1) for k in range(5))
+         + a[..., 5] / T)
+    s = (a[..., 0] * np.log(T) + sum(a[..., k] * T ** k / k
+                                     for k in range(1, 5)) + a[..., 6])
+    return cp, h, s
+
+
+def _chemkin_entry(record, T, low, high):
+    # The four lines of a Chemkin THERMO entry
+    if len(record.name) > 18:
+        raise ValueError("name longer than 18 characters")
+    counts = list(record.elements.items())
+    if len(counts) > 5:
+        raise ValueError("more than 5 elements")
+    if any(count != round(count) for _, count in counts):
+        raise ValueError("fractional composition")
+    fields = ['{:<2s}{:3d}'.format(element, int(round(count)))
+              for element, count in counts]
+    fields += [' ' * 5] * (5 - len(fields))
+    phase = 'G' if record.phase == 0 else (
+        'L' if record.name.endswith('(L)') else 'S')
+    first = '{:<18s}{:<6s}{}{}{:10.3f}{:10.3f}{:8.3f}{}'.format(
+        record.name, record.refcode[:6], ''.join(fields[:4]), phase,
+        T[0], T[2], T[1], fields[4])
+    values = ['{:15.8E}'.format(x) for x in itertools.chain(high, low)]
+    lines = [first, ''.join(values[0:5]), ''.join(values[5:10]),
+             ''.join(values[10:14]) + ' ' * 15]
+    return ''.join('{:<79s}{:d}\n'.format(line, i)
+                   for i, line in enumerate(lines, 1))
+
+
+def _chemkin_ranges(line):
+    # Is `line` the record of default temperature ranges?
+    try:
+        return len([float(x) for x in line.split()]) == 3
+    except ValueError:
+        return False
+
+
+def _read_chemkin_entry(lines, T_mid, masses, h_formation):
+    # SpeciesRecord of the four lines of a Chemkin THERMO entry
+    first = lines[0].ljust(80)
+    name = first[:18].split()[0]
+    fields = [first[i:i + 5] for i in range(24, 44, 5)]
+    # A fifth element follows the common temperature, which otherwise
+    # often overruns its columns (e.g. '  1000.000')
+    if first[73:75].strip().isalpha():
+        fields.append(first[73:78])
+        middle = first[65:73]
+    else:
+        middle = first[65:75]
+    elements = {}
+    for field in fields:
+        element, count = field[:2].strip(), field[2:].strip()
+        if element and count and float(count) != 0.0:
+            elements[element.upper()] = float(count)
+    T_low, T_high = float(first[45:55]), float(first[55:65])
+    if middle.strip():
+        T_mid = float(middle)
+    values = [float(line[i:i + 15]) for line in lines[1:]
+              for i in range(0, 75, 15) if line[i:i + 15].strip()]
+    high, low = values[0:7], values[7:14]
+    intervals = [((T_low, T_mid), [0.0, 0.0] + low[:5], low[5:7]),
+                 ((T_mid, T_high), [0.0, 0.0] + high[:5], high[5:7])]
+    return _record(name, elements, intervals, masses, h_formation,
+                   phase=0 if first[44] in 'Gg' else 1,
+                   refcode=first[18:24].strip())
+
+
+def _record(name, elements, intervals, masses, h_formation, phase=0,
+            refcode='', comments=''):
+    # SpeciesRecord of intervals ((Tmin, Tmax), a1..a7, (b1, b2)); the
+    # enthalpy of formation from `h_formation` (by name) or at 298.15 K
+    polys = [poly.NASAPoly(tuple(map(float, lim)), tuple(map(float, a)),
+                           tuple(map(float, b)), 7, EXPONENTS, 0.0)
+             for lim, a, b in intervals]
+    try:
+        molwt = sum(masses[element] * count
+                    for element, count in elements.items())
+    except KeyError as error:
+        raise ValueError("{}: unknown element {}".format(name,
+                                                         error.args[0]))
+    if name in h_formation:
+        hf = h_formation[name]
+    else:
+        hf = _enthalpy(polys, 298.15)
+        if hf is None:
+            raise ValueError("{}: h_formation required; no data at "
+                             "298.15 K.".format(name))
+    return thermoinp.SpeciesRecord.create(
+        name, elements, phase, molwt, polys, h_formation=hf,
+        comments=comments, refcode=refcode)
+
+
+def _enthalpy(intervals, T):
+    # Molar enthalpy (J/mol) at T; None outside the intervals
+    for x in intervals:
+        if x.lim[0] <= T <= x.lim[1]:
+            a, b = x.a, x.b
+            h = (-a[0] / T**2 + (a[1] * math.log(T) + b[0]) / T + a[2]
+                 + a[3] * T / 2.0 + a[4] * T**2 / 3.0 + a[5] * T**3 / 4.0
+                 + a[6] * T**4 / 5.0)
+            return constants.R_CEA * T * h
+    return None
+
+
+def _masses(db=None):
+    # Atomic masses (kg/kmol) by element of a thermoinp.DB; those of
+    # its monatomic neutral gases (and electron) where it has them,
+    # else the least-squares solution of the molar masses of its
+    # species
+    if db is None:
+        db = thermoinp.DB()
+    records = [r for r in db.all if r.elements]
+    elements = sorted({e for r in records for e in r.elements})
+    column = {element: j for j, element in enumerate(elements)}
+    A = np.zeros((len(records), len(elements)))
+    for i, record in enumerate(records):
+        for element, count in record.elements.items():
+            A[i, column[element]] = count
+    molwt = np.array([r.molwt for r in records])
+    masses = dict(zip(elements, np.linalg.lstsq(A, molwt, rcond=None)[0]))
+    for record, counts in zip(records, A):
+        if (record.phase == 0 and counts.sum() == 1.0 and
+                (record.name[-1] not in '+-' or record.name == 'e-')):
+            masses[elements[int(counts.argmax())]] = record.molwt
+    return masses
+
+
+def _symbol(element):
+    # Element symbol as capitalised by Cantera, e.g. 'AL' -> 'Al'
+    return element[0] + element[1:].lower()
+
+
+def _number(value):
+    # Number as YAML; integers without a decimal point
+    value = float(value)
+    return str(int(value)) if value == int(value) else repr(value)
@@ -0,0 +1,274 @@
+"""Fitting of 9-coefficient NASA polynomials to tabulated data.
+
+Species not in the database are added from tables of their heat
+capacity, enthalpy and entropy; `fit` determines, for many species at
+once, the 2002-spec intervals (coefficients a1..a7 and integration
+constants b1, b2) that best fit the tabulated Cp/R, H/RT and S/R in
+the least-squares sense, with Cp, H and S continuous at the interval
+bounds:
+
+    >>> T = np.arange(200.0, 6001.0, 100.0)
+    >>> result = fit(['XO2', 'XO'], T, Cp, H, S)
+    >>> result.error[result.index['XO2']]     # Cp/R, H/RT, S/R
+    >>> result.intervals('XO2')               # poly.NASAPoly
+
+Intervals are bounded by the first and last tabulated temperatures of
+a species and the `breaks` (default: those of the NASA Glenn database)
+between them, except breaks which would leave an interval with fewer
+than `min_points` tabulated temperatures. Enthalpies are those of the
+database convention; the enthalpy of formation at 298.15 K plus the
+sensible enthalpy, H(T) - H(298.15).
+
+Fitted species become SpeciesRecords (see the `thermoinp` module),
+e.g. for an overlay of the NASA Glenn database:
+
+    >>> records = [result.record('XO2', {'X': 1, 'O': 2}),
+    ...            result.record('XO', {'X': 1, 'O': 1})]
+    >>> with open('custom.inp', 'w') as f:
+    ...     thermoinp.DB.from_records(records).write(f)
+    >>> db = thermoinp.DB(sources=(thermoinp.SOURCE, 'custom.inp'))
+
+Tables of different lengths (or with missing values) are passed as
+arrays padded with NaN; NaN temperatures are ignored, as are NaN
+values of Cp, H or S alone (a temperature without values is
+ignored).
+"""
+import numpy as np
+
+from thermodata import constants, convert, poly, thermoinp
+
+
+#: Default interval bounds within the tabulated ranges, K.
+BREAKS = (1000.0, 6000.0)
+
+#: Least number of tabulated temperatures per interval.
+MIN_POINTS = 5
+
+#: Exponents of the 9-coefficient polynomials.
+EXPONENTS = convert.EXPONENTS
+
+# Temperature scale of the least-squares problems (conditioning)
+_SCALE = 1000.0
+
+# Scale factors of the fitted unknowns (a1..a7, b1, b2)
+_UNSCALE = np.append(_SCALE ** -np.array(EXPONENTS[:7]), [_SCALE, 1.0])
+
+
+class Fit(object):
+    """9-coefficient fits of species (see `fit`).
+
+    The intervals are stored as in packed.Coefficients; the rows of
+    species i are offsets[i]:offsets[i+1].
+
+    Attributes
+    ----------
+
+        names : species names
+        index : dict of {name: species index}
+        offsets : array (nspecies + 1,) of row offsets
+        bounds : array (nintervals, 2); Tmin and Tmax, K
+        coeffs : array (nintervals, 7); a1..a7
+        consts : array (nintervals, 2); b1, b2
+        error : array (nspecies, 3); maximum absolute errors of
+            Cp/R, H/RT and S/R at the tabulated temperatures
+    """
+    def __init__(self, names, offsets, bounds, coeffs, consts, error):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.offsets = offsets
+        self.bounds = bounds
+        self.coeffs = coeffs
+        self.consts = consts
+        self.error = error
+        self._masses = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def intervals(self, name, cls=poly.NASAPoly, dh=0.0):
+        """Return the intervals of a species.
+
+        Arguments
+        ---------
+
+            cls : poly.NASAPoly (or subclass) or thermoinp.Interval
+            dh : H(298.15) - H(0) of the species, J/mol
+        """
+        i = self.index[name]
+        polys = []
+        for row in range(self.offsets[i], self.offsets[i + 1]):
+            bounds = tuple(self.bounds[row].tolist())
+            coeffs = tuple(self.coeffs[row].tolist())
+            consts = tuple(self.consts[row].tolist())
+            if issubclass(cls, poly.NASAPoly):
+                args = bounds, coeffs, consts, 7, EXPONENTS, dh
+            else:
+                args = bounds, 7, EXPONENTS, dh, coeffs, consts
+            polys.append(cls(*args))
+        return tuple(polys)
+
+    def record(self, name, elements, phase=0, molwt=None, dh=0.0,
+               **fields):
+        """Return the SpeciesRecord of a species.
+
+        Arguments
+        ---------
+
+            elements : dict of element counts (up to 5 elements)
+            phase : 0 for gases, else condensed
+            molwt : molar mass, kg/kmol (default: calculated from the
+                atomic masses of the NASA Glenn database)
+            dh : H(298.15) - H(0), J/mol
+
+        Other fields (comments, refcode, h_formation, isproduct) are
+        passed to SpeciesRecord.create; h_formation defaults to the
+        enthalpy of the fit at 298.15 K. Fits not including 298.15 K
+        require h_formation, the enthalpy of formation at 298.15 K
+        recorded by the database (e.g. 0.0 for AL(L), a phase of an
+        element); ValueError is raised if it is not given.
+        """
+        intervals = self.intervals(name, dh=dh)
+        if 'h_formation' not in fields:
+            fields['h_formation'] = convert._enthalpy(intervals, 298.15)
+            if fields['h_formation'] is None:
+                raise ValueError("{}: h_formation required; the fit "
+                                 "excludes 298.15 K.".format(name))
+        if molwt is None:
+            if self._masses is None:
+                self._masses = convert._masses()
+            molwt = sum(self._masses[element] * count
+                        for element, count in elements.items())
+        return thermoinp.SpeciesRecord.create(name, elements, phase,
+                                              molwt, intervals, **fields)
+
+
+def fit(names, T, Cp, H, S, breaks=BREAKS, min_points=MIN_POINTS):
+    """Fit 9-coefficient polynomials to tabulated data.
+
+    Arguments
+    ---------
+
+        names : species names
+        T : temperatures, K; array (npoints,) common to the species
+            or (nspecies, npoints)
+        Cp : heat capacities, J/mol-K; array (nspecies, npoints)
+        H : enthalpies, J/mol; array (nspecies, npoints)
+        S : entropies, J/mol-K; array (nspecies, npoints)
+        breaks : interval bounds, K
+        min_points : least number of temperatures per interval
+
+    Returns Fit.
+    """
+    names = list(names)
+    Cp, H, S = (np.atleast_2d(np.asarray(x, dtype=float))
+                for x in (Cp, H, S))
+    T = np.broadcast_to(np.asarray(T, dtype=float), Cp.shape)
+    if Cp.shape[0] != len(names) or not Cp.shape == H.shape == S.shape:
+        raise ValueError("Tables don't match the species.")
+    with np.errstate(invalid='ignore', divide='ignore'):
+        target = np.stack([Cp, H / T, S], axis=2) / constants.R_CEA
+    weight = np.isfinite(target) & np.isfinite(T)[..., None]
+    valid = weight.any(axis=2)
+    if (valid.sum(axis=1) < min_points).any():
+        raise ValueError("Fewer than {} temperatures tabulated."
+                         .format(min_points))
+    target = np.where(weight, target, 0.0)
+    T = np.where(valid, T, np.nan)
+
+    lower, upper = np.nanmin(T, axis=1), np.nanmax(T, axis=1)
+    kept = _breaks(T, lower, upper, sorted(breaks), min_points)
+
+    nspecies = len(names)
+    nintervals = np.array([len(k) + 1 for k in kept])
+    offsets = np.zeros(nspecies + 1, dtype=np.int64)
+    np.cumsum(nintervals, out=offsets[1:])
+    x = np.empty((offsets[-1], 9))
+    error = np.empty((nspecies, 3))
+
+    # Species with the same breaks share the constraints
+    groups = {}
+    for i, key in enumerate(kept):
+        groups.setdefault(key, []).append(i)
+    for key, members in groups.items():
+        members = np.array(members)
+        coeffs, residual = _fit(T[members], target[members],
+                                weight[members], key)
+        rows = (offsets[members][:, None] +
+                np.arange(len(key) + 1)).ravel()
+        x[rows] = coeffs.reshape(-1, 9)
+        error[members] = np.abs(residual).max(axis=1)
+
+    edges = [(lower[i],) + kept[i] + (upper[i],) for i in range(nspecies)]
+    bounds = np.array([(e[j], e[j + 1]) for e in edges
+                       for j in range(len(e) - 1)], dtype=float)
+    x = x * _UNSCALE
+    return Fit(names, offsets, bounds.reshape(-1, 2),
+               np.ascontiguousarray(x[:, :7]),
+               np.ascontiguousarray(x[:, 7:]), error)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _breaks(T, lower, upper, breaks, min_points):
+    # Interval bounds of each species within its range; breaks leaving
+    # fewer than `min_points` temperatures on either side are dropped
+    previous = np.full(len(T), -np.inf)
+    kept = [[] for _ in range(len(T))]
+    with np.errstate(invalid='ignore'):
+        for b in breaks:
+            below = ((T > previous[:, None]) & (T <= b)).sum(axis=1)
+            above = (T > b).sum(axis=1)
+            keep = ((lower < b) & (b < upper) & (below >= min_points) &
+                    (above >= min_points))
+            for i in np.flatnonzero(keep):
+                kept[i].append(b)
+            previous = np.where(keep, b, previous)
+    return [tuple(k) for k in kept]
+
+
+def _fit(T, target, weight, breaks):
+    # Scaled coefficients (nspecies, nintervals, 9) of species with
+    # the same breaks, and the residuals (nspecies, npoints, 3) of
+    # the fit. The least-squares problems are solved in the null
+    # space of the continuity constraints.
+    m = len(breaks) + 1
+    C = np.zeros((3 * (m - 1), 9 * m))
+    for j, b in enumerate(breaks):
+        D = _design(np.array(b))
+        C[3 * j:3 * j + 3, 9 * j:9 * j + 9] = D
+        C[3 * j:3 * j + 3, 9 * j + 9:9 * j + 18] = -D
+    if len(C):
+        _, sv, vt = np.linalg.svd(C)
+        Z = vt[np.count_nonzero(sv > sv[0] * 1e-12):].T
+    else:
+        Z = np.eye(9)
+
+    # Design matrix; the rows of each point in its interval's columns
+    ns, npoints = T.shape
+    interval = np.searchsorted(np.array(breaks), np.nan_to_num(T),
+                               side='left')
+    onehot = interval[..., None] == np.arange(m)
+    D = np.nan_to_num(_design(T)) * weight[..., None]
+    A = (D[:, :, :, None, :] * onehot[:, :, None, :, None]).reshape(
+        ns, 3 * npoints, 9 * m)
+    b = target.reshape(ns, 3 * npoints)
+    AZ = A @ Z
+    y = np.einsum('sij,sj->si', np.linalg.pinv(AZ), b)
+    residual = (np.einsum('sij,sj->si', AZ, y) - b).reshape(ns, npoints, 3)
+    return (y @ Z.T).reshape(ns, m, 9), residual
+
+
+def _design(T):
+    # Cp/R, H/RT and S/R per unit scaled coefficient (..., 3, 9), at
+    # temperatures T (see _UNSCALE)
+    t = T / _SCALE
+    lnT = np.log(T)
+    one, zero = np.ones_like(t), np.zeros_like(t)
+    cp = [t**-2, 1 / t, one, t, t**2, t**3, t**4, zero, zero]
+    h = [-t**-2, lnT / t, one, t / 2, t**2 / 3, t**3 / 4, t**4 / 5,
+         1 / t, zero]
+    s = [-t**-2 / 2, -1 / t, lnT, t, t**2 / 2, t**3 / 3, t**4 / 4,
+         zero, one]
+    return np.stack([np.stack(cp, -1), np.stack(h, -1), np.stack(s, -1)],
+                    axis=-2)
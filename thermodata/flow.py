@@ -0,0 +1,232 @@
+"""Compressible-flow functions of thermally perfect gases.
+
+A `Gas` is a species, or an ideal mixture of species of fixed
+(frozen) composition, whose heat capacity varies with temperature as
+given by the polynomial data. Its methods take arrays of any shape
+and evaluate all points at once with the vectorised engine (see the
+`vector` module):
+
+    >>> air = Gas(packed, ('N2', 'O2', 'Ar'), X=(0.7809, 0.2095, 0.0096))
+    >>> air.gamma([300.0, 1500.0])
+    array([1.4000..., 1.3108...])
+    >>> air.isentropic_T(300.0, 20.0)      # compression, P2/P1 = 20
+    array(692.8...)
+    >>> T0, ratio = air.stagnation(220.0, 2.0)    # T0, P0/P
+
+Temperatures are found by Newton iteration from the enthalpy and
+entropy functions, so results are accurate to the polynomial data
+rather than to a constant-gamma approximation. Points outside the
+temperature range of the data are NaN.
+
+Units are SI; specific (per kg) properties.
+"""
+import numpy as np
+
+from thermodata import constants, vector
+from thermodata.packed import PackedDB
+
+
+#: Relative tolerance and maximum iterations of the temperature
+#: inversions.
+TOL = 1e-10
+MAXITER = 30
+
+_STALL = 1e-6
+
+
+class Gas(object):
+    """A thermally perfect gas.
+
+    Arguments
+    ---------
+
+        packed : packed.PackedDB (or binary.BinaryDB)
+        names : species names
+        X : mole fractions (default: a single species)
+
+    Attributes
+    ----------
+
+        names, X : species and mole fractions
+        M : molar mass, kg/mol
+        R : specific gas constant, J/kg-K
+    """
+    def __init__(self, packed, names, X=None):
+        if isinstance(names, str):
+            names = (names,)
+        self.names = list(names)
+        if X is None:
+            if len(self.names) != 1:
+                raise ValueError("Mole fractions required for mixtures")
+            X = (1.0,)
+        self.X = np.asarray(X, dtype=float)
+        if self.X.shape != (len(self.names),):
+            raise ValueError("One mole fraction per species required")
+        self.packed = packed
+        self._index = vector.species_index(packed, self.names)
+        # Temperature range common to the species
+        start = packed.table['start'][self._index].astype(np.intp)
+        count = packed.table['nintervals'][self._index].astype(np.intp)
+        if (count == 0).any():
+            raise ValueError("Species without intervals")
+        self._range = (packed.block[start, 0].max(),
+                       packed.block[start + count - 1, 1].min())
+        molwt = packed.table['molwt'][self._index]
+        self.M = constants.M * float(self.X @ molwt)
+        self.R = constants.R_CEA / self.M
+        # Entropy of mixing, J/kg-K
+        present = self.X > 0
+        self._mixing = -self.R * float(
+            self.X[present] @ np.log(self.X[present]))
+
+    @classmethod
+    def from_species(cls, species):
+        """Return the Gas of a thermodata.Species."""
+        return cls(PackedDB.from_db({species.name: species}),
+                   species.name)
+
+    # ----------------------------------------------------------------
+    # State functions
+    # ----------------------------------------------------------------
+    def cp(self, T):
+        """Specific heat capacity at constant pressure, J/kg-K."""
+        return self._evaluate(T)[0]
+
+    def h(self, T):
+        """Specific enthalpy, J/kg."""
+        return self._evaluate(T)[1]
+
+    def s(self, T, P=None):
+        """Specific entropy at pressure P (bar; default: standard),
+        J/kg-K."""
+        s = self._evaluate(T)[2]
+        if P is not None:
+            s = s - self.R * np.log(P)
+        return s
+
+    def gamma(self, T):
+        """Ratio of specific heats, cp/cv."""
+        cp = self.cp(T)
+        return cp / (cp - self.R)
+
+    def a(self, T):
+        """Speed of sound, m/s."""
+        return np.sqrt(self.gamma(T) * self.R * np.asarray(T))
+
+    # ----------------------------------------------------------------
+    # Isentropic relations
+    # ----------------------------------------------------------------
+    def pressure_ratio(self, T1, T2):
+        """Return P2/P1 of an isentropic change from T1 to T2."""
+        return np.exp((self.s(T2) - self.s(T1)) / self.R)
+
+    def isentropic_T(self, T1, ratio):
+        """Return T2 of an isentropic change from T1 to pressure ratio
+        P2/P1 = ratio."""
+        T1, ratio = np.broadcast_arrays(np.asarray(T1, dtype=float),
+                                        np.asarray(ratio, dtype=float))
+        cp, h, s = self._evaluate(T1)
+        target = s + self.R * np.log(ratio)
+        # Start from constant gamma (that of T1)
+        T = T1 * ratio ** (self.R / cp)
+        def residual(T):
+            cp, h, s = self._evaluate(T, extrapolate=True)
+            # ds/dT = cp/T
+            return s - target, cp / T
+        return self._defined(_newton(residual, T))
+
+    def stagnation(self, T, mach):
+        """Return (T0, P0/P) of static temperature T at Mach number
+        mach."""
+        T, mach = np.broadcast_arrays(np.asarray(T, dtype=float),
+                                      np.asarray(mach, dtype=float))
+        cp, h, s = self._evaluate(T)
+        gamma = cp / (cp - self.R)
+        target = h + 0.5 * mach**2 * gamma * self.R * T
+        def residual(T0):
+            cp, h0, s0 = self._evaluate(T0, extrapolate=True)
+            return h0 - target, cp
+        T0 = self._defined(
+            _newton(residual, T * (1.0 + 0.5 * (gamma - 1.0) * mach**2)))
+        return T0, self.pressure_ratio(T, T0)
+
+    def static(self, T0, mach):
+        """Return (T, P/P0) of stagnation temperature T0 at Mach number
+        mach."""
+        T0, mach = np.broadcast_arrays(np.asarray(T0, dtype=float),
+                                       np.asarray(mach, dtype=float))
+        cp0, h0, s0 = self._evaluate(T0)
+        gamma0 = cp0 / (cp0 - self.R)
+        R, M2 = self.R, mach**2
+        def residual(T):
+            # h + M^2 gamma R T / 2 = h0
+            cp, h, s, dcp = self._evaluate(T, derivatives=True,
+                                           extrapolate=True)
+            cv = cp - R
+            gamma = cp / cv
+            dgamma = -R * dcp / cv**2
+            f = h + 0.5 * M2 * gamma * R * T - h0
+            return f, cp + 0.5 * M2 * R * (gamma + T * dgamma)
+        T = self._defined(
+            _newton(residual, T0 / (1.0 + 0.5 * (gamma0 - 1.0) * M2)))
+        return T, self.pressure_ratio(T0, T)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _evaluate(self, T, derivatives=False, extrapolate=False):
+        # Specific cp, h, s (and dcp/dT) of the gas at T (any shape)
+        T = np.asarray(T, dtype=float)
+        result = vector.evaluate_pairs(self.packed, self._index[:, None],
+                                       T.reshape(1, -1),
+                                       extrapolate=extrapolate,
+                                       derivatives=derivatives)
+        values = [_weighted(self.X, values).reshape(T.shape) / self.M
+                  for values in result[1:]]
+        values[2] = values[2] + self._mixing
+        return values
+
+    def _defined(self, T):
+        # T, NaN outside the temperature range of the data (to within
+        # the solution tolerance; solutions are iterated with
+        # extrapolation so as not to stall at the bounds)
+        Tmin, Tmax = self._range
+        with np.errstate(invalid='ignore'):
+            outside = ((T < Tmin * (1.0 - TOL)) | (T > Tmax * (1.0 + TOL))
+                       | np.isnan(T))
+        return np.where(outside, np.nan, T)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _weighted(X, values):
+    # Sum of X[i] * values[i]; elementwise (unlike a matrix product,
+    # whose rounding depends on the number of columns)
+    total = X[0] * values[0]
+    for x, row in zip(X[1:], values[1:]):
+        total += x * row
+    return total
+
+
+def _newton(residual, T):
+    # Solve residual(T) = 0 from T; residual returns (f, df/dT). Points
+    # stop once converged, so that each result is independent of the
+    # others solved with it. Points also stop where the steps stall
+    # close to a root: where the data are discontinuous (at interval
+    # bounds) there is none, and Newton alternates across the bound.
+    T = np.array(T, dtype=float)
+    active = np.ones(T.shape, dtype=bool)
+    previous = np.inf
+    for iteration in range(MAXITER):
+        f, df = residual(T)
+        step = f / df
+        T = np.where(active, T - step, T)
+        step = np.abs(step)
+        with np.errstate(invalid='ignore'):
+            stalled = (step >= 0.5 * previous) & (step < _STALL * T)
+            active &= (step > TOL * T) & ~stalled
+        if not active.any():
+            break
+        previous = step
+    return T
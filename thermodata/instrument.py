@@ -0,0 +1,171 @@
+"""Opt-in instrumentation of the hot paths.
+
+Counters (calls) and timers (total, min and max wall time) are kept for
+the following functions:
+
+    thermoinp._read_categories          source file splitting
+    thermoinp.DB._parse_category        category parsing
+    thermoinp.SpeciesRecord.from_dataset  species dataset parsing
+    thermodata.Thermo._select_interval  interval selection
+    thermodata._dimless_heat_capacity   polynomial evaluation
+    thermodata._dimless_enthalpy
+    thermodata._dimless_entropy
+    thermodata.ChemDB.select            database selection
+
+Instrumentation is disabled by default. Enabling it replaces these
+functions with timing wrappers and disabling it restores the
+originals, so there is no overhead at all while it is disabled.
+
+    >>> from thermodata import instrument
+    >>> instrument.enable()
+    >>> db = ChemDB()
+    >>> instrument.snapshot()['thermoinp.DB._parse_category']
+    {'calls': 2, 'total': 0.051, 'min': 0.003, 'max': 0.048}
+    >>> instrument.disable()
+
+Callbacks receive every event as (name, elapsed time in seconds), e.g.
+to forward them to a metrics pipeline:
+
+    >>> instrument.add_callback(lambda name, t: statsd.timing(name, t))
+
+or, for a block of code:
+
+    >>> with instrument.enabled():
+    ...     db.select(('CO2',))
+"""
+import time
+import functools
+import importlib
+import threading
+import contextlib
+
+
+# (module, class or None, attribute) of the instrumented functions
+TARGETS = (
+    ('thermodata.thermoinp', None, '_read_categories'),
+    ('thermodata.thermoinp', 'DB', '_parse_category'),
+    ('thermodata.thermoinp', 'SpeciesRecord', 'from_dataset'),
+    ('thermodata.thermodata', 'Thermo', '_select_interval'),
+    ('thermodata.thermodata', None, '_dimless_heat_capacity'),
+    ('thermodata.thermodata', None, '_dimless_enthalpy'),
+    ('thermodata.thermodata', None, '_dimless_entropy'),
+    ('thermodata.thermodata', 'ChemDB', 'select'),
+)
+
+_lock = threading.Lock()
+_stats = {}
+_callbacks = []
+_originals = {}
+
+
+def enable():
+    """Instrument the target functions (no-op if enabled)."""
+    with _lock:
+        if _originals:
+            return
+        for module, cls, attr in TARGETS:
+            owner, name = _resolve(module, cls)
+            original = owner.__dict__[attr]
+            _originals[(owner, attr)] = original
+            name = '{}.{}'.format(name, attr)
+            if isinstance(original, classmethod):
+                wrapper = classmethod(_wrap(name, original.__func__))
+            else:
+                wrapper = _wrap(name, original)
+            setattr(owner, attr, wrapper)
+
+
+def disable():
+    """Restore the original functions (no-op if disabled)."""
+    with _lock:
+        for (owner, attr), original in _originals.items():
+            setattr(owner, attr, original)
+        _originals.clear()
+
+
+def is_enabled():
+    """Return True if instrumentation is enabled."""
+    return bool(_originals)
+
+
+@contextlib.contextmanager
+def enabled():
+    """Context manager enabling instrumentation for a block."""
+    was_enabled = is_enabled()
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def snapshot():
+    """Return a copy of the statistics.
+
+    A dict keyed by instrumented function name with values of dicts
+    of `calls`, `total`, `min` and `max` (times in seconds). Functions
+    that haven't been called are absent.
+    """
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def reset():
+    """Clear the statistics."""
+    with _lock:
+        _stats.clear()
+
+
+def add_callback(callback):
+    """Call `callback(name, elapsed)` for every instrumented call."""
+    _callbacks.append(callback)
+
+
+def remove_callback(callback):
+    """Remove a callback added via `add_callback`."""
+    _callbacks.remove(callback)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _resolve(module, cls):
+    # Return the object owning an instrumented function and its
+    # qualified name prefix (module relative to the package).
+    owner = importlib.import_module(module)
+    name = module.rpartition('.')[2]
+    if cls is not None:
+        owner = getattr(owner, cls)
+        name = '{}.{}'.format(name, cls)
+    return owner, name
+
+
+def _wrap(name, fn):
+    # Return a timing wrapper for function fn
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def _record(name, elapsed):
+    # Update the statistics and notify callbacks
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            _stats[name] = {'calls': 1, 'total': elapsed,
+                            'min': elapsed, 'max': elapsed}
+        else:
+            stats['calls'] += 1
+            stats['total'] += elapsed
+            if elapsed < stats['min']:
+                stats['min'] = elapsed
+            if elapsed > stats['max']:
+                stats['max'] = elapsed
+    for callback in _callbacks:
+        callback(name, elapsed)
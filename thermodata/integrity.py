@@ -0,0 +1,180 @@
+"""Integrity checks of the species datasets.
+
+`scan` checks every dataset of a database for:
+
+    order     : intervals with Tmin >= Tmax
+    gap       : a gap between consecutive intervals (Tmin > Tmax of
+                the previous interval)
+    overlap   : overlapping consecutive intervals
+    Cp, H, S  : discontinuities of Cp/R, H/RT or S/R at a bound shared
+                by consecutive intervals
+    formation : H(298.15 K) differing from the enthalpy of formation
+
+The checks are vectorised over the packed representation (see the
+`packed` module), so the whole database is scanned in milliseconds
+and a scan can follow every change of the sources:
+
+    >>> db.reload_source('custom.inp')
+    >>> report = scan(db)
+    >>> print(report.formatted())
+    species         check       interval           T        value
+    -------------------------------------------------------------
+    ALN(L)          Cp                 0      2700.0    1.013e+00
+    ...
+
+Thermo selects the first interval with T <= Tmax, so temperatures in
+a gap are silently evaluated with the following interval.
+"""
+import collections
+
+import numpy as np
+
+from thermodata import vector
+from thermodata.packed import PackedDB
+
+
+#: Checks, in report order.
+CHECKS = ('order', 'gap', 'overlap', 'Cp', 'H', 'S', 'formation')
+
+#: Default tolerance of the dimensionless discontinuities.
+TOL = 1e-2
+
+#: Default tolerance of H(298.15 K) - enthalpy of formation, J/mol.
+FORMATION_TOL = 1.0
+
+#: Reference temperature, K.
+T_REF = 298.15
+
+
+Issue = collections.namedtuple('Issue', 'name, check, interval, T, value')
+Issue.__doc__ = """An integrity issue of a species dataset.
+
+    check : one of CHECKS
+    interval : index of the interval (the lower of a pair)
+    T : temperature of the issue (bound or 298.15 K), K
+    value : size of the issue; the gap/overlap width (K), the
+        discontinuity (dimensionless) or the enthalpy difference
+        (J/mol); Tmax - Tmin for 'order'
+"""
+
+
+class Report(object):
+    """Integrity scan report.
+
+    Attributes
+    ----------
+
+        issues : list of Issue sorted by species, interval and check
+        ndatasets : number of datasets scanned
+    """
+    def __init__(self, issues, ndatasets):
+        self.issues = issues
+        self.ndatasets = ndatasets
+
+    def counts(self):
+        """Return {check: number of issues}."""
+        counts = collections.OrderedDict((check, 0) for check in CHECKS)
+        for issue in self.issues:
+            counts[issue.check] += 1
+        return counts
+
+    def species(self):
+        """Return the names of the species with issues."""
+        return sorted({issue.name for issue in self.issues})
+
+    def formatted(self):
+        """Format the report as a table."""
+        spec = '{:<16}{:<10}{:>10}{:>12}{:>13}'
+        lines = [spec.format('species', 'check', 'interval', 'T',
+                             'value'),
+                 '-' * 61]
+        for issue in self.issues:
+            lines.append(spec.format(issue.name, issue.check,
+                                     issue.interval,
+                                     '{:.1f}'.format(issue.T),
+                                     '{:.3e}'.format(issue.value)))
+        return '\n'.join(lines)
+
+    def __bool__(self):
+        # True if there are issues
+        return bool(self.issues)
+
+
+def scan(db, names=None, tol=TOL, formation_tol=FORMATION_TOL):
+    """Scan the datasets of a database.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB (all datasets, including repeated names),
+            ChemDB or PackedDB
+        names : restrict the scan to these species (e.g. those of an
+            overlay)
+        tol : tolerance of the discontinuities of Cp/R, H/RT and S/R
+        formation_tol : tolerance of H(298.15 K), J/mol
+
+    Returns a Report.
+    """
+    if not isinstance(db, PackedDB):
+        db = PackedDB.from_db(db, unique=False)
+    table, block = db.table, db.block
+    species = np.arange(len(table))
+    if names is not None:
+        encoded = [name.encode('ascii') for name in names]
+        species = species[np.isin(table['name'], encoded)]
+
+    # Block rows of the selected datasets and their position
+    count = table['nintervals'][species].astype(np.intp)
+    owner = np.repeat(species, count)
+    offset = np.repeat(np.cumsum(count) - count, count)
+    position = np.arange(len(owner)) - offset
+    rows = table['start'][owner].astype(np.intp) + position
+
+    found = []
+    def report(check, mask, index, interval, T, value):
+        # Add issues where mask
+        found.append((np.full(np.count_nonzero(mask), CHECKS.index(check)),
+                      index[mask], interval[mask], T[mask], value[mask]))
+
+    # Interval order
+    Tmin, Tmax = block[rows, 0], block[rows, 1]
+    report('order', Tmin >= Tmax, owner, position, Tmin, Tmax - Tmin)
+
+    # Consecutive intervals
+    paired = position < np.repeat(count, count) - 1
+    left, right = rows[paired], rows[paired] + 1
+    pair_owner, pair_position = owner[paired], position[paired]
+    upper, lower = block[left, 1], block[right, 0]
+    report('gap', lower > upper, pair_owner, pair_position, upper,
+           lower - upper)
+    report('overlap', lower < upper, pair_owner, pair_position, upper,
+           upper - lower)
+
+    shared = lower == upper
+    values_left = vector.dimensionless(db, left, upper)
+    values_right = vector.dimensionless(db, right, upper)
+    for check, l, r in zip(('Cp', 'H', 'S'), values_left, values_right):
+        jump = np.abs(r - l)
+        report(check, shared & (jump > tol), pair_owner, pair_position,
+               upper, jump)
+
+    # Enthalpy of formation
+    hf = table['h_formation'][species]
+    interval, Cp, H, S = vector.evaluate_pairs(db, species, T_REF)
+    difference = H - hf
+    with np.errstate(invalid='ignore'):
+        mask = np.abs(difference) > formation_tol
+    report('formation', mask, species, interval,
+           np.full(len(species), T_REF), difference)
+
+    # Collect
+    checks, index, interval, T, value = (np.concatenate(column)
+                                         for column in zip(*found))
+    order = np.lexsort((checks, interval, index))
+    issues = [Issue(table['name'][i].decode('ascii'), CHECKS[c], k, t, v)
+              for c, i, k, t, v in zip(checks[order].tolist(),
+                                       index[order].tolist(),
+                                       interval[order].tolist(),
+                                       T[order].tolist(),
+                                       value[order].tolist())]
+    return Report(issues, len(species))
@@ -0,0 +1,268 @@
+"""Packed (array) representation of the coefficient data.
+
+The species datasets parsed by `thermoinp` (or mapped into `ChemDB`)
+are reduced to two flat NumPy arrays:
+
+  - A species table; a structured array with one row per species,
+    sorted by name so that a species can be found by bisection.
+  - A coefficient block; a C-contiguous float64 array with one row per
+    temperature interval. The rows for a species are contiguous and
+    start at the `start` field of its table entry.
+
+The columns of the coefficient block are:
+
+    Tmin, Tmax, a1, a2, a3, a4, a5, a6, a7, b1, b2
+
+where `a1..a7` are the coefficients of the 2002-spec polynomial for
+dimensionless heat capacity and `b1`, `b2` the integration constants
+for enthalpy and entropy respectively. Undefined scalar fields (e.g.
+the formation enthalpy of a species with an assigned enthalpy) are
+stored as NaN.
+
+    >>> packed = PackedDB.from_db(thermoinp.DB())
+    >>> packed.rows('CO2')[:, :2]
+    array([[  200.,  1000.],
+           [ 1000.,  6000.],
+           [ 6000., 20000.]])
+
+This representation underpins the binary database format (see the
+`binary` module) and is the preferred input for array-based
+evaluation.
+
+External codes (e.g. CFD solvers) take the coefficients of a selection
+of species, in the order of selection, from `export`; C-contiguous
+float64 arrays which may be passed on through the buffer protocol
+(`memoryview`, `ndarray.ctypes`) without copying:
+
+    >>> coefficients = export(chemdb)   # or export(db, names)
+    >>> i = coefficients.index['CO2']
+    >>> rows = slice(*coefficients.offsets[i:i + 2])
+    >>> coefficients.coeffs[rows]       # a1..a7 of each interval
+"""
+import numpy as np
+
+from thermodata.thermodata import Species, Interval
+
+
+#: Column labels of the coefficient block.
+COLUMNS = ('Tmin', 'Tmax',
+           'a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7',
+           'b1', 'b2')
+NCOLS = len(COLUMNS)
+
+#: Maximum length of a species name (bytes).
+NAMELEN = 24
+
+#: Record layout of the species table.
+species_dtype = np.dtype([('name', 'S{}'.format(NAMELEN)),
+                          ('phase', '<i4'),
+                          ('nintervals', '<i4'),
+                          ('start', '<i8'),
+                          ('molwt', '<f8'),
+                          ('h_formation', '<f8'),
+                          ('h_assigned', '<f8'),
+                          ('T_reference', '<f8')])
+
+
+class PackedDB(object):
+    """Species table and coefficient block (see module docstring).
+
+    Instances are normally created via `from_db` or by opening a
+    binary database file (`binary.BinaryDB`). The arrays may be
+    ordinary in-memory arrays or views on a memory-mapped file;
+    nothing here reads more of them than the species being accessed.
+
+        >>> packed = PackedDB.from_db(chemdb)
+        >>> co2 = packed['CO2'] # thermodata.Species
+
+    """
+    def __init__(self, table, block):
+        self.table = table
+        self.block = block
+
+    @classmethod
+    def from_db(cls, db, unique=True):
+        """Pack a `ChemDB` or `thermoinp.DB` instance.
+
+        Species names repeated in a `thermoinp.DB` (e.g. the datasets
+        of condensed species with phase transitions) are resolved as
+        in `DB.__getitem__` unless `unique` is False, in which case
+        every dataset is packed (and `index` finds the first).
+        """
+        records = sorted(_records(db, unique), key=lambda r: r[0])
+        table = np.zeros(len(records), dtype=species_dtype)
+        rows = []
+        for i, (name, phase, molwt, hf, ha, Tref, intervals) in (
+                enumerate(records)):
+            encoded = name.encode('ascii')
+            if len(encoded) > NAMELEN:
+                errmsg = "{} exceeds {} characters.".format(name,
+                                                            NAMELEN)
+                raise ValueError(errmsg)
+            table[i] = (encoded, phase, len(intervals), len(rows),
+                        molwt, _nan(hf), _nan(ha), _nan(Tref))
+            rows.extend(tuple(bounds) + tuple(a) + tuple(b)
+                        for bounds, a, b in intervals)
+
+        block = np.array(rows, dtype='<f8').reshape(-1, NCOLS)
+        return cls(table, np.ascontiguousarray(block))
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    @property
+    def names(self):
+        """Species names (sorted)."""
+        return [name.decode('ascii') for name in self.table['name']]
+
+    def index(self, name):
+        """Return the table index of species `name`.
+
+        Raises KeyError if the species is not present.
+        """
+        names = self.table['name']
+        key = np.array(name.encode('ascii'), dtype=names.dtype)
+        i = int(np.searchsorted(names, key))
+        if i == len(names) or names[i] != key:
+            raise KeyError(name)
+        return i
+
+    def rows(self, name):
+        """Return the coefficient block rows for species `name`."""
+        entry = self.table[self.index(name)]
+        start = int(entry['start'])
+        return self.block[start:start + int(entry['nintervals'])]
+
+    def species(self, name):
+        """Return species `name` as a thermodata.Species instance."""
+        entry = self.table[self.index(name)]
+        intervals = [Interval((row[0], row[1]),
+                              tuple(row[2:9]),
+                              tuple(row[9:]))
+                     for row in self.rows(name).tolist()]
+        inst = Species(name,
+                       float(entry['molwt']),
+                       _none(entry['h_formation']),
+                       intervals)
+        inst.phase = int(entry['phase'])
+        return inst
+
+    # ----------------------------------------------------------------
+    # Magic methods
+    # ----------------------------------------------------------------
+    def __getitem__(self, name):
+        return self.species(name)
+
+    def __contains__(self, name):
+        try:
+            self.index(name)
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return iter(self.names)
+
+
+class Coefficients(object):
+    """Coefficients of species in C-contiguous arrays (see `export`).
+
+    The intervals of species `i` are rows `offsets[i]` to
+    `offsets[i + 1]` (exclusive) of `bounds`, `coeffs` and `consts`,
+    in increasing order of temperature. All arrays are row-major
+    (C-contiguous) and little-endian.
+
+    Attributes
+    ----------
+
+        names : species names
+        index : dict of {name: species index}
+        offsets : int64 array (nspecies + 1,) of row offsets
+        bounds : float64 array (nrows, 2); Tmin, Tmax, K
+        coeffs : float64 array (nrows, 7); a1..a7 of the
+            dimensionless heat capacity polynomial
+        consts : float64 array (nrows, 2); integration constants b1
+            (enthalpy) and b2 (entropy)
+        molwt : float64 array (nspecies,); molar mass, g/mol
+    """
+    def __init__(self, names, offsets, bounds, coeffs, consts, molwt):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.offsets = offsets
+        self.bounds = bounds
+        self.coeffs = coeffs
+        self.consts = consts
+        self.molwt = molwt
+
+    def __len__(self):
+        return len(self.names)
+
+
+def export(db, names=None):
+    """Export the coefficients of species `names` as Coefficients.
+
+    Arguments
+    ---------
+
+        db : ChemDB, thermoinp.DB or PackedDB
+        names : species names, in the order of the export (default:
+            the selection of a ChemDB, else every species by name)
+
+    Raises KeyError for names not in the database.
+    """
+    packed = db if isinstance(db, PackedDB) else PackedDB.from_db(db)
+    if names is None:
+        names = list(db) if isinstance(db, dict) else packed.names
+    entries = packed.table[[packed.index(name) for name in names]]
+    counts = entries['nintervals'].astype('<i8')
+    offsets = np.zeros(len(names) + 1, dtype='<i8')
+    np.cumsum(counts, out=offsets[1:])
+    rows = np.repeat(entries['start'] - offsets[:-1], counts)
+    rows += np.arange(offsets[-1])
+    block = packed.block[rows]
+    return Coefficients(list(names), offsets,
+                        np.ascontiguousarray(block[:, 0:2]),
+                        np.ascontiguousarray(block[:, 2:9]),
+                        np.ascontiguousarray(block[:, 9:11]),
+                        np.ascontiguousarray(entries['molwt']))
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _records(db, unique=True):
+    # Yield (name, phase, molwt, h_formation, h_assigned, T_reference,
+    # intervals) for every species in a ChemDB or thermoinp.DB where
+    # intervals is a sequence of (bounds, coeffs, consts).
+    if hasattr(db, 'all'):
+        # thermoinp.DB; SpeciesRecord with NASAPoly intervals. Names
+        # repeated across categories resolve as in DB.__getitem__.
+        records = {s.name: s for s in db.all}.values() if unique else db.all
+        for s in records:
+            intervals = [(i.lim, i.a, i.b) for i in s.intervals or ()]
+            yield (s.name, s.phase, s.molwt, s.h_formation,
+                   s.h_assigned, s.T_reference, intervals)
+    else:
+        # ChemDB; Species with thermodata.Interval intervals
+        for s in db.values():
+            if s.thermo is None:
+                intervals = []
+            else:
+                intervals = [(i.bounds, i.coeffs, i.integration_consts)
+                             for i in s.thermo.intervals]
+            yield (s.name, getattr(s, 'phase', 0), s.Mr, s.Hf,
+                   None, None, intervals)
+
+
+def _nan(value):
+    # Map undefined values to NaN
+    return np.nan if value is None else value
+
+
+def _none(value):
+    # Map NaN to undefined values
+    value = float(value)
+    return None if value != value else value
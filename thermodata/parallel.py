@@ -0,0 +1,148 @@
+"""Parallel evaluation of large sweeps.
+
+Inputs are broadcast, flattened and split into chunks of `chunksize`
+points which are evaluated concurrently by a pool of workers, threads
+(the default; the NumPy kernels of the vectorised engine release the
+GIL) or processes. Results are reassembled in order, so they are
+identical to those of a single call whatever the number of workers
+or the chunk size:
+
+    >>> result = parallel.evaluate(packed, T, ('N2', 'O2', 'H2O'),
+    ...                            max_workers=8)
+
+`apply` does the same for any function of independent points (arrays
+in, arrays of the same shape out), e.g. the temperature inversions of
+the `flow` module:
+
+    >>> T0, ratio = parallel.apply(air.stagnation, T, mach)
+
+Process workers receive the function and chunks by pickling. For
+`evaluate` and `evaluate_pairs` the packed database is published to
+shared memory for the duration of the call (see the `shared` module)
+so the coefficient arrays aren't copied to each worker; functions
+given to `apply` should refer to a `shared.SharedDB` likewise. An
+existing executor may be passed (`executor`) to avoid starting a pool
+per call, in which case databases are passed as they are.
+"""
+import os
+import functools
+import contextlib
+import concurrent.futures
+
+import numpy as np
+
+from thermodata import vector
+from thermodata.shared import SharedDB
+
+
+#: Default number of points per task.
+CHUNK = 1 << 16
+
+
+def apply(function, *arrays, max_workers=None, processes=False,
+          chunksize=CHUNK, executor=None):
+    """Apply a function of independent points to arrays in parallel.
+
+    `function` is called with 1-d chunks of the broadcast and
+    flattened `arrays` and returns an array, or a tuple of arrays, of
+    the length of the chunks. Returns the results of all chunks
+    reshaped to the broadcast shape.
+
+    Arguments
+    ---------
+
+        function : function of chunks (picklable for processes)
+        arrays : arrays broadcast against each other
+        max_workers : number of workers (default: number of CPUs)
+        processes : use a process pool rather than a thread pool
+        chunksize : number of points per task
+        executor : concurrent.futures.Executor to use (overrides
+            `max_workers` and `processes`)
+    """
+    shape, chunks = _chunks(arrays, chunksize)
+    results = _map(function, chunks, max_workers, processes, executor)
+    return _assemble(results, shape)
+
+
+def evaluate_pairs(packed, index, T, extrapolate=False, derivatives=False,
+                   max_workers=None, processes=False, chunksize=CHUNK,
+                   executor=None):
+    """Evaluate (species, T) pairs in parallel.
+
+    As vector.evaluate_pairs; see `apply` for the other arguments.
+    """
+    with _sharing(packed, processes and executor is None) as packed:
+        function = functools.partial(vector.evaluate_pairs, packed,
+                                     extrapolate=extrapolate,
+                                     derivatives=derivatives)
+        return apply(function, index, T, max_workers=max_workers,
+                     processes=processes, chunksize=chunksize,
+                     executor=executor)
+
+
+def evaluate(packed, T, names=None, extrapolate=False, derivatives=False,
+             max_workers=None, processes=False, chunksize=CHUNK,
+             executor=None):
+    """Evaluate species `names` (default: all) at temperatures T in
+    parallel.
+
+    As vector.evaluate; see `apply` for the other arguments.
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    index = vector.species_index(packed, names)
+    result = evaluate_pairs(packed, index[:, None], T[None, :],
+                            extrapolate, derivatives, max_workers,
+                            processes, chunksize, executor)
+    if names is None:
+        names = packed.names
+    return vector.Properties(list(names), T, *result)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _chunks(arrays, chunksize):
+    # Broadcast shape of `arrays` and their flattened chunks (one list
+    # of chunks per array)
+    arrays = np.broadcast_arrays(*[np.asarray(a) for a in arrays])
+    flat = [a.ravel() for a in arrays]
+    starts = range(0, max(flat[0].size, 1), chunksize)
+    return arrays[0].shape, [[a[i:i + chunksize] for i in starts]
+                             for a in flat]
+
+
+def _assemble(results, shape):
+    # Results of the chunks (arrays or tuples of arrays) concatenated
+    # and reshaped
+    if isinstance(results[0], tuple):
+        return tuple(np.concatenate(values).reshape(shape)
+                     for values in zip(*results))
+    return np.concatenate(results).reshape(shape)
+
+
+def _map(function, chunks, max_workers, processes, executor):
+    # Results of function(*args) for the args of `chunks` (one list of
+    # chunks per argument), in order
+    if executor is not None:
+        return list(executor.map(function, *chunks))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1 or len(chunks[0]) == 1:
+        return list(map(function, *chunks))
+    if processes:
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers)
+    else:
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers)
+    with pool:
+        return list(pool.map(function, *chunks))
+
+
+@contextlib.contextmanager
+def _sharing(packed, publish):
+    # Yield the database for the workers; published to shared memory
+    # for the duration if `publish` (and not already shared)
+    if not publish or isinstance(packed, SharedDB):
+        yield packed
+        return
+    with SharedDB.publish(packed) as shared:
+        yield shared
@@ -0,0 +1,169 @@
+"""Stable phases of condensed species.
+
+The database splits condensed species into one dataset per phase
+(e.g. 'AL(cr)' and 'AL(L)', or 'Fe(a)', 'Fe(c)', 'Fe(d)' and
+'Fe(L)'), the phase transitions being at the bounds of their
+temperature intervals. `Phases` groups the datasets of each species
+by formula (and name, keeping isomers apart) and evaluates the
+properties of the stable phase, that of minimum Gibbs energy, for all
+species and temperatures at once with the vectorised engine (see the
+`vector` module):
+
+    >>> phases = Phases(thermoinp.DB())
+    >>> result = phases.evaluate(['AL', 'H2O'], [300.0, 1000.0])
+    >>> result.phase
+    array([['AL(cr)', 'AL(L)'],
+           ['H2O(L)', None]], dtype=object)
+    >>> result.Cp
+    array([[24.23..., 31.74...],
+           [75.35...,      nan]])
+
+Species are named by any of their datasets or by the name common to
+them (the dataset names without the phase suffix, e.g. 'AL' or
+'Fe(CO)5'). Where datasets overlap (e.g. 'SrCL2(a)' and 'SrCL2(b)'
+from 900 to 990 K) the phase of lower Gibbs energy is taken;
+properties are NaN where no dataset applies.
+"""
+import re
+import collections
+
+import numpy as np
+
+from thermodata import thermoinp, vector
+from thermodata.packed import PackedDB
+
+
+_SUFFIX = re.compile(r'\([^()]*\)$')
+
+
+class StableProperties(vector.Properties):
+    """State functions of the stable phases of species (rows) at
+    temperatures (columns).
+
+    As vector.Properties, `interval` indexing the intervals of the
+    stable phases' datasets.
+
+    Attributes
+    ----------
+
+        phase : names of the stable phases' datasets (None where
+            undefined)
+        G : molar Gibbs energy, J/mol
+    """
+    def __init__(self, names, T, phase, interval, Cp, H, S, dCp=None):
+        super(StableProperties, self).__init__(names, T, interval, Cp, H,
+                                               S, dCp)
+        self.phase = phase
+
+    @property
+    def G(self):
+        """Molar Gibbs energy, J/mol."""
+        return self.H - self.T * self.S
+
+
+class Phases(object):
+    """Condensed species resolved by phase.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB (default: the NASA Glenn database)
+
+    Attributes
+    ----------
+
+        packed : packed.PackedDB of the condensed datasets
+        names : species names
+        datasets : dict of {species name: [table indexes of its
+            datasets in `packed`]}
+    """
+    def __init__(self, db=None):
+        if db is None:
+            db = thermoinp.DB()
+        records = [s for s in db.allcondensed if s.nintervals > 0]
+        condensed = thermoinp.DB.from_records(records)
+        self.packed = PackedDB.from_db(condensed, unique=False)
+
+        # Datasets sharing a name are packed adjacently, in order
+        groups = collections.OrderedDict()
+        repeats = collections.Counter()
+        for record in condensed.all:
+            index = self.packed.index(record.name) + repeats[record.name]
+            repeats[record.name] += 1
+            key = (tuple(sorted(record.elements.items())),
+                   _base(record.name))
+            groups.setdefault(key, []).append((record.name, index))
+
+        self.names = []
+        self.datasets = collections.OrderedDict()
+        self._lookup = {}
+        for (formula, name), members in groups.items():
+            self.names.append(name)
+            self.datasets[name] = [index for _, index in members]
+            for alias in [name] + [member for member, _ in members]:
+                self._lookup.setdefault(alias, name)
+        self._names = np.array(self.packed.names + [None], dtype=object)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._lookup
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def species(self, name):
+        """Return the species name of dataset or species `name`.
+
+        Raises KeyError if there is no such condensed species.
+        """
+        return self._lookup[name]
+
+    def evaluate(self, names, T, derivatives=False):
+        """Evaluate the stable phases of species `names` at
+        temperatures T.
+
+        Returns StableProperties with arrays of shape (len(names),
+        len(T)).
+        """
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        species = [self.species(name) for name in names]
+        candidates = _pad([self.datasets[name] for name in species])
+
+        # Every candidate dataset at every temperature; the stable
+        # phase minimises the Gibbs energy over the candidates axis.
+        result = vector.evaluate_pairs(self.packed,
+                                       np.maximum(candidates, 0)[..., None],
+                                       T, derivatives=derivatives)
+        H, S = result[2:4]
+        G = np.where((candidates[..., None] < 0) | np.isnan(H), np.inf,
+                     H - T * S)
+        choice = np.argmin(G, axis=1)[:, None]
+        undefined = np.isinf(np.take_along_axis(G, choice, axis=1)[:, 0])
+        phase = np.take_along_axis(candidates[..., None],
+                                   choice, axis=1)[:, 0]
+        phase = np.where(undefined, -1, phase)
+        values = [np.take_along_axis(values, choice, axis=1)[:, 0]
+                  for values in result]
+        return StableProperties(list(names), T, self._names[phase],
+                                *values)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _base(name):
+    # Dataset name without its phase suffix, e.g. 'AL(OH)3(a)' ->
+    # 'AL(OH)3'
+    return _SUFFIX.sub('', name) or name
+
+
+def _pad(groups):
+    # Table indexes of each group's datasets as rows of an array,
+    # padded with -1
+    width = max(len(group) for group in groups) if groups else 0
+    candidates = np.full((len(groups), width), -1, dtype=int)
+    for i, group in enumerate(groups):
+        candidates[i, :len(group)] = group
+    return candidates
@@ -0,0 +1,201 @@
+"""Reaction thermochemistry: Gibbs energies and equilibrium constants.
+
+A `ReactionSet` holds the stoichiometric coefficients of a set of
+reactions as a matrix (reactions x species; products positive,
+reactants negative). Changes of enthalpy, entropy and Gibbs energy
+and the equilibrium constants of all reactions at all temperatures
+are then one matrix product with the species properties evaluated by
+the vectorised engine (see the `vector` module):
+
+    >>> db = ChemDB()
+    >>> db.select(('H2', 'O2', 'H2O', 'CO', 'CO2'))
+    >>> reactions = ReactionSet(db, ['H2 + 0.5 O2 = H2O',
+    ...                              'CO + H2O <=> CO2 + H2'])
+    >>> result = reactions.evaluate([298.15, 1000.0, 2000.0])
+    >>> result.logK
+    array([[40.045..., 10.059...,  3.540...],
+           [ 5.014...,  0.156..., -0.660...]])
+
+Reactions are equation strings (see `parse`) or {species:
+coefficient} mappings. Equilibrium constants are in terms of partial
+pressures in bar (the standard pressure of the database, 100 kPa).
+"""
+import re
+import collections
+
+import numpy as np
+
+from thermodata import constants, vector
+from thermodata.packed import PackedDB
+
+
+_ARROW = re.compile(r'\s+(?:<=>|<->|=>|->|=)\s+')
+_PLUS = re.compile(r'\s+\+\s+')
+_TERM = re.compile(r'^(\d+(?:\.\d*)?|\.\d+)?\s*\*?\s*([^\d\s.*]\S*)$')
+
+
+def parse(equation):
+    """Parse a reaction equation into {species: coefficient}.
+
+    Reactant coefficients are negative. Terms are separated by ' + '
+    (spaces required, as species names such as 'AL+' include '+') and
+    the sides by one of '=', '<=>', '=>', '<->' or '->' (spaces
+    required). Coefficients precede names, optionally separated by a
+    space or '*'; e.g. '2 H2', '2H2' or '2*H2' (names don't start with
+    a digit). A species on both sides is netted.
+
+        >>> parse('CH4 + 2 O2 => CO2 + 2 H2O')
+        OrderedDict([('CH4', -1.0), ('O2', -2.0), ('CO2', 1.0),
+                     ('H2O', 2.0)])
+    """
+    sides = _ARROW.split(equation.strip())
+    if len(sides) != 2:
+        errmsg = "Invalid equation (one arrow expected): {}"
+        raise ValueError(errmsg.format(equation))
+    coefficients = collections.OrderedDict()
+    for sign, side in zip((-1.0, 1.0), sides):
+        for term in _PLUS.split(side.strip()):
+            match = _TERM.match(term.strip())
+            if match is None:
+                errmsg = "Invalid term {!r} in equation: {}"
+                raise ValueError(errmsg.format(term, equation))
+            number, name = match.groups()
+            value = float(number) if number else 1.0
+            coefficients[name] = coefficients.get(name, 0.0) + sign * value
+    return coefficients
+
+
+class ReactionProperties(object):
+    """Reaction properties (rows) at temperatures (columns).
+
+    Attributes
+    ----------
+
+        equations : reaction equations
+        T : temperatures, K
+        species : vector.Properties of the species
+        G_RT : dimensionless Gibbs energies of the species, G/RT
+        dH : enthalpies of reaction, J/mol
+        dS : entropies of reaction, J/mol-K
+        dG : Gibbs energies of reaction, J/mol
+        logK : log10 of the equilibrium constants, Kp (bar)
+
+    Values are NaN where a species of the reaction is undefined.
+    """
+    def __init__(self, equations, T, species, G_RT, dH, dS, dG, logK):
+        self.equations = equations
+        self.T = T
+        self.species = species
+        self.G_RT = G_RT
+        self.dH = dH
+        self.dS = dS
+        self.dG = dG
+        self.logK = logK
+
+
+class ReactionSet(object):
+    """A set of reactions between species of a database.
+
+    Arguments
+    ---------
+
+        db : ChemDB (the reaction species must be selected),
+            thermoinp.DB or packed.PackedDB
+        reactions : sequence of equation strings (see `parse`) or
+            {species: coefficient} mappings (reactants negative)
+
+    Attributes
+    ----------
+
+        species : species names, in order of first appearance
+        matrix : stoichiometric coefficients (reactions x species)
+        equations : reaction equations (formatted if not given)
+        packed : packed.PackedDB of the species
+    """
+    def __init__(self, db, reactions):
+        parsed = [parse(r) if isinstance(r, str)
+                  else collections.OrderedDict(r) for r in reactions]
+        self.species = list(collections.OrderedDict.fromkeys(
+            name for coefficients in parsed for name in coefficients))
+        column = {name: j for j, name in enumerate(self.species)}
+        self.matrix = np.zeros((len(parsed), len(self.species)))
+        for i, coefficients in enumerate(parsed):
+            for name, value in coefficients.items():
+                self.matrix[i, column[name]] = value
+        self.equations = [r if isinstance(r, str) else _format(c)
+                          for r, c in zip(reactions, parsed)]
+        self.packed = _pack(db, self.species)
+        self._index = vector.species_index(self.packed, self.species)
+
+    def gibbs(self, T):
+        """Return G/RT of the species (species x T)."""
+        return _gibbs(self._properties(T))
+
+    def evaluate(self, T):
+        """Evaluate all reactions at temperatures T.
+
+        Returns ReactionProperties with arrays of shape
+        (len(reactions), len(T)).
+        """
+        species = self._properties(T)
+        T = species.T
+        RT = constants.R_CEA * T
+        G_RT = _gibbs(species)
+        dH = self.matrix @ species.H
+        dS = self.matrix @ species.S
+        dG = RT * (self.matrix @ G_RT)
+        logK = -dG / (RT * np.log(10.0))
+        return ReactionProperties(self.equations, T, species, G_RT, dH,
+                                  dS, dG, logK)
+
+    def __len__(self):
+        return len(self.matrix)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _properties(self, T):
+        # Species properties (species x T)
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        interval, Cp, H, S = vector.evaluate_pairs(
+            self.packed, self._index[:, None], T[None, :])
+        return vector.Properties(self.species, T, interval, Cp, H, S)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _pack(db, names):
+    # PackedDB of species `names` of a database
+    if isinstance(db, PackedDB):
+        packed = db
+    elif hasattr(db, 'all'):
+        wanted = set(names)
+        packed = PackedDB.from_db(db.subset(
+            filt=lambda record: record.name in wanted))
+    else:
+        packed = PackedDB.from_db({name: db[name] for name in names
+                                   if name in db})
+    missing = [name for name in names if name not in packed]
+    if missing:
+        raise KeyError("Not in database: {}".format(', '.join(missing)))
+    return packed
+
+
+def _gibbs(species):
+    # G/RT of species Properties
+    R = constants.R_CEA
+    return species.H / (R * species.T) - species.S / R
+
+
+def _format(coefficients):
+    # Equation string of {species: coefficient}
+    def side(sign):
+        terms = []
+        for name, value in coefficients.items():
+            value *= sign
+            if value > 0:
+                terms.append(name if value == 1 else
+                             '{:g} {}'.format(value, name))
+        return ' + '.join(terms)
+    return '{} = {}'.format(side(-1), side(1))
@@ -0,0 +1,482 @@
+"""Local property-evaluation server.
+
+The server loads a database once and answers requests for species
+properties from other processes over a Unix socket or a localhost TCP
+port. Requests and responses are JSON objects, one per line:
+
+    {"id": 1, "op": "properties", "species": ["CO2", "H2O"],
+     "T": [300.0, 1000.0]}
+    {"id": 1, "result": {"Cp": [[37.2, 54.3], [33.6, 41.3]],
+                         "H": [...], "S": [...]},
+     "latency": {"queued": 0.0021, "evaluate": 0.0003,
+                 "total": 0.0024, "batch": 12}}
+
+    {"id": 2, "op": "temperature", "species": "N2", "H": [0.0, 2.0e4]}
+    {"id": 2, "result": {"T": [298.15, 955.1]}, "latency": {...}}
+
+Operations:
+
+    properties  : Cp (J/mol-K), H (J/mol) and S (J/mol-K) of
+                  `species` (rows) at temperatures `T` (columns)
+    temperature : temperatures at which `species` have enthalpies `H`
+                  (J/mol) or entropies `S` (J/mol-K) (see
+                  vector.temperature); one species name applies
+                  to every value, a list of species to the rows
+                  (first axis) of the values
+
+Undefined values are null. Failed requests are answered with an
+"error" message instead of a result. The `id` of a request (any JSON
+value) is returned with its response; responses on a connection may
+be out of order.
+
+Requests arriving within `window` seconds of each other, on any
+connections, are evaluated together in one call of the vectorised
+engine per operation (micro-batching). Latencies are in seconds: the
+time queued for the batch, the evaluation time of the batch and the
+total time since receipt, with the number of requests in the batch.
+A request failing in a batch is answered with its error; the others
+of the batch are answered with their results. Lines are limited to
+`limit` bytes; longer requests are answered with an error and skipped.
+
+    >>> server = await Server(db).start(path='/tmp/thermodata.sock')
+    >>> client = await Client.connect(path='/tmp/thermodata.sock')
+    >>> response = await client.properties(['CO2'], [300.0, 1000.0])
+    >>> response['result']['Cp']
+
+From the command line:
+
+    python -m thermodata.server --unix /tmp/thermodata.sock
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+
+import numpy as np
+
+from thermodata import vector
+from thermodata.packed import PackedDB
+
+
+#: Default batching window (s) and maximum requests per batch.
+WINDOW = 0.002
+MAX_BATCH = 1024
+
+#: Default maximum length of request and response lines, bytes.
+LIMIT = 2 ** 26
+
+OPERATIONS = ('properties', 'temperature')
+
+
+class Server(object):
+    """Property-evaluation server (see module docstring).
+
+    Arguments
+    ---------
+
+        db : database; packed.PackedDB, ChemDB or thermoinp.DB
+            (default: ChemDB with every species selected)
+        window : batching window, s
+        max_batch : maximum number of requests per batch
+        limit : maximum length of a request line, bytes
+
+    Attributes
+    ----------
+
+        packed : packed.PackedDB evaluated
+        address : socket path or (host, port) once started
+    """
+    def __init__(self, db=None, window=WINDOW, max_batch=MAX_BATCH,
+                 limit=LIMIT):
+        if db is None:
+            from thermodata.thermodata import ChemDB
+            db = ChemDB()
+            db.select()
+        if not isinstance(db, PackedDB):
+            db = PackedDB.from_db(db)
+        self.packed = db
+        self.window = window
+        self.max_batch = max_batch
+        self.limit = limit
+        self.address = None
+        self._server = None
+        self._queue = None
+        self._batcher = None
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        """Listen on Unix socket `path`, else on `host`:`port` (default:
+        a free port). Returns the server."""
+        self._queue = asyncio.Queue()
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._serve, path, limit=self.limit)
+            self.address = path
+        else:
+            self._server = await asyncio.start_server(
+                self._serve, host, port, limit=self.limit)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        self._batcher = asyncio.ensure_future(self._batch())
+        return self
+
+    async def serve_forever(self):
+        """Serve until cancelled."""
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and batching."""
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+
+    def evaluate(self, requests):
+        """Evaluate parsed requests (see `parse`) together; returns
+        their results (dicts), in order."""
+        results = [None] * len(requests)
+
+        # One evaluation of the (species, T) pairs of all requests
+        group = [i for i, r in enumerate(requests) if r.op == 'properties']
+        if group:
+            values = _concatenate(requests, group)
+            Cp, H, S = vector.evaluate_pairs(self.packed, *values)[1:]
+            for i, part in zip(group, _split(requests, group, Cp, H, S)):
+                results[i] = dict(zip(('Cp', 'H', 'S'), part))
+
+        # One inversion per property
+        for prop in ('H', 'S'):
+            group = [i for i, r in enumerate(requests)
+                     if r.op == 'temperature' and r.prop == prop]
+            if group:
+                index, values = _concatenate(requests, group)
+                T = vector.temperature(self.packed, index, prop, values)
+                for i, part in zip(group, _split(requests, group, T)):
+                    results[i] = {'T': part[0]}
+        return results
+
+    def parse(self, request):
+        """Return a request (dict) as a `Request`.
+
+        Raises ValueError for invalid requests and KeyError for
+        species not in the database.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Request object expected")
+        op = request.get('op')
+        if op not in OPERATIONS:
+            raise ValueError("Unknown operation: {}".format(op))
+        species = request.get('species')
+        if isinstance(species, str):
+            species = [species]
+        if (not isinstance(species, list) or
+                not all(isinstance(name, str) for name in species)):
+            raise ValueError("Species name or list of names expected")
+        index = np.array([self.packed.index(name) for name in species],
+                         dtype=int)
+
+        if op == 'properties':
+            T = _array(request, 'T')
+            if T.ndim != 1:
+                raise ValueError("T: list of numbers expected")
+            index, values = np.broadcast_arrays(index[:, None], T[None, :])
+            return Request(request.get('id'), op, None, index, values)
+
+        props = [prop for prop in ('H', 'S') if prop in request]
+        if len(props) != 1:
+            raise ValueError("One of H or S expected")
+        values = _array(request, props[0])
+        if isinstance(request['species'], str):
+            index = index[0]
+        elif values.ndim > 1:
+            index = index.reshape((-1,) + (1,) * (values.ndim - 1))
+        try:
+            index, values = np.broadcast_arrays(index, values)
+        except ValueError:
+            raise ValueError("Values don't match the species")
+        return Request(request.get('id'), op, props[0], index, values)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    async def _serve(self, reader, writer):
+        # Queue the requests of a connection; errors are answered here
+        try:
+            while True:
+                request = None
+                try:
+                    line = await _readline(reader)
+                    if not line:
+                        break
+                    received = time.perf_counter()
+                    request = json.loads(line.decode('utf-8'))
+                    parsed = self.parse(request)
+                except ConnectionError:
+                    raise
+                except Exception as error:
+                    ident = (request.get('id')
+                             if isinstance(request, dict) else None)
+                    _respond(writer, {'id': ident, 'error': _message(error)})
+                    continue
+                await self._queue.put((parsed, received, writer))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _each(self, requests):
+        # Results of requests evaluated one at a time; the exception
+        # of a failed request
+        results = []
+        for request in requests:
+            try:
+                results.extend(self.evaluate([request]))
+            except Exception as error:
+                results.append(error)
+        return results
+
+    async def _batch(self):
+        # Evaluate the queued requests in batches
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            started = time.perf_counter()
+            requests = [request for request, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self.evaluate,
+                                                     requests)
+            except Exception:
+                # Isolate the failing requests
+                results = await loop.run_in_executor(None, self._each,
+                                                     requests)
+            finished = time.perf_counter()
+
+            for (request, received, writer), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    response = {'id': request.id, 'error': _message(result)}
+                else:
+                    response = {'id': request.id,
+                                'result': {key: _tolist(values)
+                                           for key, values in result.items()}}
+                response['latency'] = {'queued': started - received,
+                                       'evaluate': finished - started,
+                                       'total': finished - received,
+                                       'batch': len(batch)}
+                _respond(writer, response)
+            for writer in {writer for _, _, writer in batch}:
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+
+class Request(object):
+    """Parsed request; (species index, value) pairs of an operation.
+
+    Attributes
+    ----------
+
+        id : request id
+        op : operation
+        prop : property inverted (temperature)
+        index, values : broadcast arrays of table indexes and
+            temperatures (properties) or property values (temperature)
+    """
+    __slots__ = ('id', 'op', 'prop', 'index', 'values')
+
+    def __init__(self, id, op, prop, index, values):
+        self.id = id
+        self.op = op
+        self.prop = prop
+        self.index = index
+        self.values = values
+
+
+class Client(object):
+    """Client of a Server; requests on one connection are concurrent.
+
+        >>> client = await Client.connect(port=port)
+        >>> response = await client.temperature('N2', H=[0.0, 2.0e4])
+        >>> response['result']['T'], response['latency']['total']
+
+    Requests return the response (dict) or raise ValueError with the
+    error message of a failed request.
+    """
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, path=None, host='127.0.0.1', port=None,
+                      limit=LIMIT):
+        """Connect to the server on Unix socket `path`, else on
+        `host`:`port`; responses are limited to `limit` bytes."""
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(
+                path, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(
+                host, port, limit=limit)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        """Send a request of operation `op` and return the response."""
+        ident = next(self._ids)
+        future = asyncio.get_event_loop().create_future()
+        self._pending[ident] = future
+        fields.update(id=ident, op=op)
+        self._writer.write(json.dumps(fields).encode('utf-8') + b'\n')
+        await self._writer.drain()
+        response = await future
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response
+
+    async def properties(self, species, T):
+        """Request Cp, H and S of `species` at temperatures T."""
+        return await self.request('properties', species=species,
+                                  T=list(map(float, T)))
+
+    async def temperature(self, species, H=None, S=None):
+        """Request the temperatures of `species` at enthalpies H or
+        entropies S."""
+        if (H is None) == (S is None):
+            raise ValueError("One of H or S expected")
+        prop, values = ('H', H) if H is not None else ('S', S)
+        return await self.request('temperature', species=species,
+                                  **{prop: np.asarray(values).tolist()})
+
+    async def close(self):
+        """Close the connection."""
+        self._writer.close()
+        self._receiver.cancel()
+        try:
+            await self._receiver
+        except asyncio.CancelledError:
+            pass
+
+    async def _receive(self):
+        # Resolve pending requests from the responses
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line.decode('utf-8'))
+                future = self._pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            error = ConnectionError("Connection closed")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m thermodata.server')
+    parser.add_argument('--unix', help='Unix socket path')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--window', type=float, default=WINDOW,
+                        help='batching window, s')
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = await Server(window=args.window).start(args.unix,
+                                                        args.host,
+                                                        args.port)
+        print('Serving on {}'.format(server.address), flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _array(request, key):
+    # Field `key` of a request as a float array
+    try:
+        return np.asarray(request[key], dtype=float)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("{}: number or list of numbers expected".format(
+            key))
+
+
+def _concatenate(requests, group):
+    # Flattened index and value pairs of the requests in `group`
+    return (np.concatenate([requests[i].index.ravel() for i in group]),
+            np.concatenate([requests[i].values.ravel() for i in group]))
+
+
+async def _readline(reader):
+    # Next line of a stream (b'' at its end); ValueError if longer
+    # than the limit of the stream, the line being skipped
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        consumed = error.consumed
+    while True:
+        try:
+            await reader.readexactly(consumed)
+            await reader.readuntil(b'\n')
+            break
+        except asyncio.IncompleteReadError:
+            break
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+    raise ValueError("Line longer than the limit")
+
+
+def _split(requests, group, *arrays):
+    # Parts of flattened arrays of the requests in `group`, reshaped
+    # as the requests
+    offset = 0
+    for i in group:
+        shape = requests[i].values.shape
+        size = requests[i].values.size
+        yield [values[offset:offset + size].reshape(shape)
+               for values in arrays]
+        offset += size
+
+
+def _tolist(values):
+    # Array as (nested) lists with NaN as None (null)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def _message(error):
+    # Error message of an exception (KeyError quotes its argument)
+    if isinstance(error, KeyError):
+        return "Not in database: {}".format(error.args[0])
+    return str(error)
+
+
+def _respond(writer, response):
+    # Write response (dict) as a JSON line
+    writer.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Packed databases in shared memory.
+
+A database is published once into a block of shared memory (see
+`multiprocessing.shared_memory`), laid out as a binary database file
+(see the `binary` module), and attached by name by any number of
+processes. The species table and coefficient block of an attached
+`SharedDB` are read-only views on the one shared copy:
+
+    >>> db = SharedDB.publish(thermoinp.DB())
+    >>> db.name
+    'psm_...'
+    >>> # ... in another process
+    >>> db = attach(name)
+    >>> vector.evaluate(db, T, ('CO2', 'H2O'))
+
+A SharedDB pickles as its name, so passing one to the workers of a
+process pool (or pickling anything referencing it) attaches rather
+than copying the arrays. Attachments are cached per process.
+
+Worker processes which would each construct a `ChemDB` (e.g. those of
+a pre-forking server) can share one published database instead,
+through the ChemDB-compatible `SharedChemDB`; no parsing and no copy
+of the data:
+
+    >>> db = SharedChemDB(name)
+    >>> db.select(('CO2', 'H2O'))
+    >>> db['CO2'].thermo
+
+The block lives until the publishing process unlinks it (`unlink`, or
+leaving the `with` block of the published database); attached views
+remain valid until closed.
+"""
+import sys
+import collections.abc
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from thermodata import binary
+from thermodata.packed import PackedDB
+from thermodata.thermodata import ChemDB
+
+
+# Attachments of this process by name
+_attached = {}
+
+
+class SharedDB(PackedDB):
+    """Read-only database view of a block of shared memory.
+
+    Instances are created by `publish` (the owner of the block) or
+    attached by `name` (see module docstring).
+    """
+    def __init__(self, name):
+        self._memory = _attach_memory(name)
+        self._owner = False
+        self._open(self._memory)
+
+    @classmethod
+    def publish(cls, db, name=None):
+        """Publish database `db` (`ChemDB`, `thermoinp.DB` or
+        `PackedDB`) into a new block of shared memory.
+
+        The block is named `name` (default: a unique name chosen by
+        the system).
+        """
+        data = binary._serialise(db)
+        memory = shared_memory.SharedMemory(
+            name, create=True, size=sum(len(part) for part in data))
+        offset = 0
+        for part in data:
+            memory.buf[offset:offset + len(part)] = part
+            offset += len(part)
+        inst = cls.__new__(cls)
+        inst._memory = memory
+        inst._owner = True
+        inst._open(memory)
+        return inst
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    @property
+    def name(self):
+        """Name of the shared memory block."""
+        return self._memory.name
+
+    def close(self):
+        """Close this view of the block.
+
+        Arrays taken from the table or block must have been released.
+        """
+        if _attached.get(self.name) is self:
+            del _attached[self.name]
+        self.table = self.block = None
+        self._memory.close()
+
+    def unlink(self):
+        """Close and destroy the block (publisher only)."""
+        if not self._owner:
+            raise ValueError("Only the publisher may unlink {}".format(
+                self.name))
+        self.close()
+        self._memory.unlink()
+
+    # ----------------------------------------------------------------
+    # Magic methods
+    # ----------------------------------------------------------------
+    def __reduce__(self):
+        return attach, (self.name,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _open(self, memory):
+        # Read-only table and block views on the block
+        raw = np.ndarray(memory.size, dtype=np.uint8, buffer=memory.buf)
+        raw.flags.writeable = False
+        layout = binary._read_header(bytes(raw[:binary.HEADER_SIZE]),
+                                     memory.name)
+        super(SharedDB, self).__init__(*binary._views(raw, *layout))
+
+
+class SharedChemDB(ChemDB):
+    """ChemDB view of a packed database (a SharedDB, or a mapped
+    binary file as binary.BinaryDB).
+
+    Species are selected as from ChemDB, without parsing the source
+    database; each is created from the shared arrays on first access.
+
+        >>> db = SharedChemDB(name) # name of a published block
+        >>> db.select(('Air',))
+        >>> air = db['Air']
+
+    Arguments
+    ---------
+
+        source : packed.PackedDB or name of a shared memory block
+    """
+    def __init__(self, source):
+        if isinstance(source, str):
+            source = attach(source)
+        self.packed = source
+        self._source_dict = _SpeciesMap(source)
+
+
+def attach(name):
+    """Return the (cached) SharedDB of the block `name`."""
+    try:
+        return _attached[name]
+    except KeyError:
+        db = _attached[name] = SharedDB(name)
+        return db
+
+
+# --------------------------------------------------------------------
+# Internal classes and functions
+# --------------------------------------------------------------------
+class _SpeciesMap(collections.abc.Mapping):
+    # Species of a packed database by name, created on first access
+    def __init__(self, packed):
+        self._packed = packed
+        self._species = {}
+
+    def __getitem__(self, name):
+        try:
+            return self._species[name]
+        except KeyError:
+            species = self._species[name] = self._packed.species(name)
+            return species
+
+    def __iter__(self):
+        return iter(self._packed.names)
+
+    def __len__(self):
+        return len(self._packed)
+
+
+def _attach_memory(name):
+    # Attach to block `name`. Before Python 3.13 attachments register
+    # with the resource tracker, which destroys the block when this
+    # process exits; unless the tracker is the publisher's (inherited
+    # by its child processes), so only a tracker started here is told
+    # to forget the block.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    tracker = getattr(resource_tracker, '_resource_tracker', None)
+    running = getattr(tracker, '_fd', None) is not None
+    memory = shared_memory.SharedMemory(name)
+    if not running:
+        resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
@@ -0,0 +1,317 @@
+"""SQLite-backed species store.
+
+The source database can be exported to a local SQLite file once and
+then queried by any number of tools and processes without parsing
+`thermo.inp`:
+
+    >>> sqlstore.export(thermoinp.DB(), 'thermo.sqlite')
+    >>> db = SQLiteDB('thermo.sqlite')
+    >>> db['CO2']                       # SpeciesRecord
+    >>> db.lookup('.*H2')               # as thermoinp.DB.lookup
+    >>> db.subset(('C3H8$', 'Air$'))    # thermoinp.DB instance
+    >>> db.query(elements=('C', 'H'), phase=0, molwt=(10, 50))
+
+The file holds three tables:
+
+    species   : the SpeciesRecord fields, the category flag and the
+                source (thermo.inp formatted) dataset
+    elements  : parsed element counts, one row per (species, element)
+    intervals : interval bounds, coefficients and integration
+                constants, one row per temperature interval
+
+with indexes on species name, phase and molecular weight and on
+element. Records hydrated by the reader are kept in a small LRU cache.
+"""
+import os
+import re
+import sqlite3
+import pathlib
+import collections
+
+from thermodata import poly, thermoinp
+
+
+_SCHEMA = """
+CREATE TABLE species (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    comments TEXT,
+    nintervals INTEGER,
+    refcode TEXT,
+    formula TEXT,
+    phase INTEGER,
+    molwt REAL,
+    h_formation REAL,
+    h_assigned REAL,
+    T_reference REAL,
+    isproduct INTEGER,
+    formatted TEXT
+);
+CREATE TABLE elements (
+    species_id INTEGER REFERENCES species(id),
+    element TEXT,
+    count REAL
+);
+CREATE TABLE intervals (
+    species_id INTEGER REFERENCES species(id),
+    position INTEGER,
+    Tmin REAL, Tmax REAL,
+    ncoeff INTEGER,
+    exponents TEXT,
+    deltah REAL,
+    a1 REAL, a2 REAL, a3 REAL, a4 REAL, a5 REAL, a6 REAL, a7 REAL,
+    b1 REAL, b2 REAL
+);
+CREATE INDEX species_phase ON species(phase);
+CREATE INDEX species_molwt ON species(molwt);
+CREATE INDEX elements_element ON elements(element, species_id);
+CREATE INDEX elements_species ON elements(species_id);
+CREATE INDEX intervals_species ON intervals(species_id, position);
+"""
+
+_SPECIES_FIELDS = ('name', 'comments', 'nintervals', 'refcode',
+                   'formula', 'phase', 'molwt', 'h_formation',
+                   'h_assigned', 'T_reference')
+
+
+def export(db, path):
+    """Write the species in `db` (a thermoinp.DB) to SQLite file `path`.
+
+    An existing database at `path` is replaced.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            conn.executescript(
+                'DROP TABLE IF EXISTS intervals;'
+                'DROP TABLE IF EXISTS elements;'
+                'DROP TABLE IF EXISTS species;'
+            )
+            conn.executescript(_SCHEMA)
+            # Repeated names resolve as in DB.__getitem__
+            records = {s.name: s for s in db.all}.values()
+            for species_id, record in enumerate(records):
+                _insert(conn, species_id, record)
+    finally:
+        conn.close()
+
+
+class SQLiteDB(object):
+    """Read-only, thermoinp.DB-compatible view of an exported store.
+
+    Arguments
+    ---------
+
+        path : exported SQLite file
+        polytype : as thermoinp.DB
+        cache_size : number of hydrated records retained
+    """
+
+    def __init__(self, path, polytype='', cache_size=128):
+        self.path = path
+        self._polytype = polytype
+        self.polytype = getattr(poly,
+                                'NASAPoly{}'.format(polytype.upper()))
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        # Read-only; the path quoted as a URI ('?', '#', '%' etc.)
+        uri = pathlib.Path(os.path.abspath(path)).as_uri() + '?mode=ro'
+        self._conn = sqlite3.connect(uri, uri=True)
+        self._conn.create_function('REGEXP', 2, _regexp)
+
+    def close(self):
+        """Close the underlying connection."""
+        self._conn.close()
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def list_species(self):
+        """List species names in the store."""
+        return [name for name, in self._conn.execute(
+            'SELECT name FROM species ORDER BY name')]
+
+    def lookup(self, string):
+        """Query the store for species names matching `string`.
+
+        Same semantics as thermoinp.DB.lookup; returns a list of
+        SpeciesRecord sorted by name. Patterns starting with literal
+        characters are narrowed by a range scan on the name index.
+        """
+        string = string.replace('(', r'\(').replace(')', r'\)')
+        sql = 'SELECT name FROM species WHERE name REGEXP ?'
+        args = [string]
+        prefix = _literal_prefix(string)
+        if prefix:
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            sql += ' AND name >= ? AND name < ?'
+            args.extend((prefix, upper))
+        names = [name for name, in self._conn.execute(sql, args)]
+        return [self[name] for name in sorted(names)]
+
+    def query(self, phase=None, elements=(), molwt=None):
+        """Return SpeciesRecords matching indexed criteria.
+
+        Arguments
+        ---------
+
+            phase : phase code (0 for gases)
+            elements : element symbols (as in the formula, e.g. 'AR')
+                all of which the species must contain
+            molwt : (min, max) molecular weight, kg/kmol
+        """
+        clauses, args = [], []
+        if phase is not None:
+            clauses.append('phase = ?')
+            args.append(phase)
+        if molwt is not None:
+            clauses.append('molwt BETWEEN ? AND ?')
+            args.extend(molwt)
+        for element in elements:
+            clauses.append('id IN (SELECT species_id FROM elements '
+                           'WHERE element = ?)')
+            args.append(element)
+
+        sql = 'SELECT name FROM species'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY name'
+        return [self[name] for name, in self._conn.execute(sql, args)]
+
+    def subset(self, species=(), filt=None):
+        """Create a subset of the store as a thermoinp.DB instance.
+
+        Arguments as thermoinp.DB.subset.
+        """
+        if isinstance(species, str):
+            species = (species,)
+        if filt is None:
+            filt = lambda obj: True
+
+        if species:
+            records = {}
+            for string in species:
+                records.update((s.name, s) for s in self.lookup(string))
+            records = records.values()
+        else:
+            records = self._hydrate_all()
+
+        records = sorted(filter(filt, records), key=lambda o: o.name)
+        return thermoinp.DB.from_records(records, self._polytype)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _hydrate(self, row):
+        # Create a SpeciesRecord from a species table row
+        species_id, isproduct, formatted = row[0], row[-2], row[-1]
+        fields = list(row[1:-2])
+        intervals = tuple(
+            _interval(interval, self.polytype)
+            for interval in self._conn.execute(
+                'SELECT * FROM intervals WHERE species_id = ? '
+                'ORDER BY position', (species_id,))
+        )
+        inst = thermoinp.SpeciesRecord(*fields,
+                                       intervals=intervals or None)
+        inst._formatted = formatted
+        inst._isproduct = bool(isproduct)
+        return inst
+
+    def _hydrate_all(self):
+        # Hydrate every record without disturbing the cache
+        rows = self._conn.execute('SELECT * FROM species').fetchall()
+        return [self._hydrate(row) for row in rows]
+
+    # ----------------------------------------------------------------
+    # Magic methods
+    # ----------------------------------------------------------------
+    def __getitem__(self, key):
+        """Retrieve SpeciesRecord by species name (dict-like)."""
+        try:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        row = self._conn.execute('SELECT * FROM species WHERE name = ?',
+                                 (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+
+        inst = self._cache[key] = self._hydrate(row)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return inst
+
+    def __contains__(self, key):
+        return self._conn.execute('SELECT 1 FROM species WHERE name = ?',
+                                  (key,)).fetchone() is not None
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM species'
+                                  ).fetchone()[0]
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _insert(conn, species_id, record):
+    # Insert a SpeciesRecord into the species, elements and intervals
+    # tables.
+    values = [species_id]
+    values.extend(getattr(record, field) for field in _SPECIES_FIELDS)
+    values.extend((int(record.isproduct), record.formatted))
+    conn.execute('INSERT INTO species VALUES ({})'.format(
+        ', '.join('?' * len(values))), values)
+
+    conn.executemany('INSERT INTO elements VALUES (?, ?, ?)',
+                     [(species_id, element, count)
+                      for element, count in record.elements.items()])
+
+    rows = []
+    for position, interval in enumerate(record.intervals or ()):
+        row = [species_id, position]
+        row.extend(interval.lim)
+        row.extend((interval.n,
+                    ' '.join(repr(e) for e in interval.exp),
+                    interval.dh))
+        row.extend(interval.a)
+        row.extend(interval.b)
+        rows.append(row)
+    conn.executemany('INSERT INTO intervals VALUES ({})'.format(
+        ', '.join('?' * 16)), rows)
+
+
+def _interval(row, cls):
+    # Create a NASAPoly* instance from an intervals table row
+    lim = row[2], row[3]
+    n, exp, dh = row[4], tuple(map(float, row[5].split())), row[6]
+    return cls(lim, tuple(row[7:14]), tuple(row[14:16]), n, exp, dh)
+
+
+def _regexp(pattern, string):
+    # SQLite REGEXP function; re.match semantics as DB.lookup
+    return re.match(pattern, string) is not None
+
+
+def _literal_prefix(pattern):
+    # Return the literal characters any match of `pattern` (re.match)
+    # must start with, or '' if they can't be determined simply.
+    if '|' in pattern:
+        return ''
+    prefix = []
+    i = 1 if pattern.startswith('^') else 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and pattern[i+1:i+2] in ('(', ')'):
+            literal, i = pattern[i+1], i + 2
+        elif char in '.^$*+?{}[]()|\\':
+            break
+        else:
+            literal, i = char, i + 1
+        if pattern[i:i+1] and pattern[i] in '*?{':
+            # Optional repetition; the literal may not be present
+            break
+        prefix.append(literal)
+    return ''.join(prefix)
@@ -0,0 +1,353 @@
+"""Piecewise polynomial surrogates of the state functions.
+
+The NASA polynomials need a logarithm, negative powers and an
+interval search per evaluation. A surrogate replaces them, over a
+chosen temperature range, with low-order polynomials in a scaled
+temperature on short segments:
+
+    Cp/R, H/RT, S/R = p((T - Tmid) / half-width)
+
+Segments never straddle a bound of the NASA intervals. They are found
+by bisection of each interval until the error of all three functions,
+checked at `check` points per segment (segment ends included), is
+within half of `tol`; the other half is a margin for the error between
+the check points. The tolerance is thus empirical, not a proven bound:
+the error is only known at the check points, and the margin covers
+that between them for the smooth NASA polynomials. It applies to the
+dimensionless functions; e.g. tol=1e-6 is an error of H of 8.3e-6 * T
+J/mol.
+
+    >>> packed = PackedDB.from_db(thermoinp.DB())
+    >>> fast = Surrogate.fit(packed, ('N2', 'O2', 'H2O'), (250, 3000))
+    >>> fast.evaluate(T, ('N2', 'O2')).Cp # as vector.evaluate
+    >>> thermo = fast.thermo('N2')        # as Thermo
+    >>> thermo.T = 1200.0
+    >>> thermo.Cp, thermo.H, thermo.S
+
+Segments are found without a search; each species has a table of
+uniform cells no wider than its narrowest segment, holding the
+segment at the start of each cell, so that a point is either in that
+segment or the next.
+
+Temperatures outside the range of a surrogate give NaN (vector
+evaluation) or ValueError (`thermo`).
+"""
+import bisect
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from thermodata import constants, vector
+
+
+#: Default polynomial degree, tolerance and check points per segment.
+DEGREE = 3
+TOL = 1e-6
+CHECK = 32
+
+# Maximum depth of segment bisection
+_MAX_DEPTH = 16
+
+# Fraction of the tolerance allowed at the check points (the rest is
+# an empirical margin for the error between them)
+_MARGIN = 0.5
+
+
+class Surrogate(object):
+    """Piecewise polynomial surrogate of a set of species.
+
+    Instances are created by `fit`.
+
+    Attributes
+    ----------
+
+        names : species names
+        Trange : (Tmin, Tmax) of the fit, K
+        tol : error tolerance of Cp/R, H/RT and S/R (checked at
+            sample points; see the module documentation)
+        offsets : segments of species i are offsets[i]:offsets[i+1]
+        edges : (nsegments, 2) segment bounds, K
+        coeffs : (nsegments, 3, degree + 1) power series coefficients
+            of Cp/R, H/RT and S/R in the scaled temperature
+    """
+    def __init__(self, names, Trange, tol, offsets, edges, coeffs):
+        self.names = list(names)
+        self.Trange = Trange
+        self.tol = tol
+        self.offsets = offsets
+        self.edges = edges
+        self.coeffs = coeffs
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+        # Segment arrays end with a NaN sentinel segment (the segment
+        # of species without segments).
+        padded = np.vstack([edges, np.full((1, 2), np.nan)])
+        self._upper_edge = padded[:, 1]
+        self._mid = padded.mean(axis=1)
+        self._scale = 2.0 / (padded[:, 1] - padded[:, 0])
+        # Coefficient rows (function * (degree + 1) + power) by segment
+        flat = coeffs.reshape(len(coeffs), -1)
+        self._coeffs = np.ascontiguousarray(np.concatenate(
+            [flat, np.full((1, flat.shape[1]), np.nan)]).T)
+
+        first, stop = offsets[:-1], offsets[1:]
+        empty = stop == first
+        self._lower = np.where(empty, np.nan, padded[first, 0])
+        self._upper = np.where(empty, np.nan, padded[stop - 1, 1])
+        self._cells(first, stop)
+
+    @classmethod
+    def fit(cls, packed, names=None, Trange=(200.0, 6000.0), tol=TOL,
+            degree=DEGREE, check=CHECK):
+        """Fit species `names` (default: all) of a PackedDB.
+
+        The range of each species is the intersection of `Trange` and
+        the range of its intervals. Raises ValueError if the tolerance
+        can't be met.
+        """
+        if names is None:
+            names = packed.names
+        Tlo, Thi = float(Trange[0]), float(Trange[1])
+        index = vector.species_index(packed, names)
+
+        # Block rows of the species, clipped to the range
+        count = packed.table['nintervals'][index].astype(np.intp)
+        owner = np.repeat(np.arange(len(index)), count)
+        position = np.arange(len(owner)) - np.repeat(np.cumsum(count)
+                                                     - count, count)
+        rows = packed.table['start'][index[owner]] + position
+        lo = np.maximum(packed.block[rows, 0], Tlo)
+        hi = np.minimum(packed.block[rows, 1], Thi)
+        keep = lo < hi
+        owner, rows, lo, hi = owner[keep], rows[keep], lo[keep], hi[keep]
+
+        owner, lo, hi, coeffs = _fit(packed, owner, rows, lo, hi, tol,
+                                     degree, check)
+        order = np.lexsort((lo, owner))
+        offsets = np.searchsorted(owner[order], np.arange(len(index) + 1))
+        edges = np.column_stack([lo[order], hi[order]])
+        return cls(names, (Tlo, Thi), tol, offsets, edges, coeffs[order])
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def index(self, name):
+        """Return the index of species `name` (KeyError if absent)."""
+        return self._index[name]
+
+    def segments(self, index, T):
+        """Return the segments of (species, T) pairs.
+
+        `index` and `T` are broadcast against each other. Segments are
+        indexes of `edges`; len(edges) (a NaN segment) where T is
+        outside the range of the species.
+        """
+        index, T = np.broadcast_arrays(np.asarray(index),
+                                       np.asarray(T, dtype=float))
+        lower = self._lower[index]
+        defined = (T >= lower) & (T <= self._upper[index])
+        cell = np.where(defined, (T - lower) * self._cell_scale[index],
+                        0.0).astype(np.intp)
+        cell = np.minimum(cell, self._cell_count[index] - 1)
+        segment = self._cell_segment[self._cell_start[index] + cell]
+        # The next segment if T is beyond the cell's segment (as
+        # Thermo, the lower segment at a shared bound)
+        segment += T > self._upper_edge[segment]
+        return np.where(defined, segment, len(self.edges))
+
+    def dimensionless(self, index, T):
+        """Return (segment, Cp/R, H/RT, S/R) for (species, T) pairs.
+
+        `index` and `T` are broadcast against each other; segment is
+        the segment index within each species (-1 and NaN values
+        outside its range).
+        """
+        T = np.asarray(T, dtype=float)
+        segment = self.segments(index, T)
+        x = (T - self._mid[segment]) * self._scale[segment]
+        c = np.take(self._coeffs, segment, axis=1)
+        n = len(self._coeffs) // 3
+        values = []
+        for k in range(3):
+            # Horner's scheme
+            y = c[k * n + n - 1].copy()
+            for j in range(n - 2, -1, -1):
+                y *= x
+                y += c[k * n + j]
+            values.append(y)
+        first = self.offsets[np.minimum(index, len(self.names) - 1)]
+        undefined = segment == len(self.edges)
+        return (np.where(undefined, -1, segment - first),) + tuple(values)
+
+    def evaluate_pairs(self, index, T):
+        """As vector.evaluate_pairs; returns (segment, Cp, H, S)."""
+        T = np.asarray(T, dtype=float)
+        segment, cp, h, s = self.dimensionless(index, T)
+        R = constants.R_CEA
+        return segment, cp * R, h * R * T, s * R
+
+    def evaluate(self, T, names=None):
+        """As vector.evaluate; returns vector.Properties.
+
+        The `interval` attribute holds segment indexes.
+        """
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        if names is None:
+            names = self.names
+        index = np.array([self.index(name) for name in names],
+                         dtype=np.intp)
+        segment, Cp, H, S = self.evaluate_pairs(index[:, None],
+                                                T[None, :])
+        return vector.Properties(list(names), T, segment, Cp, H, S)
+
+    def thermo(self, name, R=None):
+        """Return a SurrogateThermo for species `name`.
+
+        `R` is the specific gas constant (J/kg-K) of the species,
+        needed for the specific properties only.
+        """
+        return SurrogateThermo(self, self.index(name), R)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _cells(self, first, stop):
+        # Build the cell tables (see module docstring)
+        width = self.edges[:, 1] - self.edges[:, 0]
+        nspecies = len(first)
+        count = np.ones(nspecies, dtype=np.intp)
+        scale = np.zeros(nspecies)
+        for i in np.flatnonzero(stop > first).tolist():
+            narrowest = width[first[i]:stop[i]].min()
+            span = self._upper[i] - self._lower[i]
+            count[i] = int(np.ceil(span / narrowest)) + 1
+            scale[i] = (count[i] - 1) / span
+        start = np.cumsum(count) - count
+        segment = np.full(count.sum(), len(self.edges), dtype=np.intp)
+        for i in np.flatnonzero(stop > first).tolist():
+            x = self._lower[i] + np.arange(count[i]) / scale[i]
+            # Last segment with lower bound < x (or the first)
+            lower = self.edges[first[i]:stop[i], 0]
+            k = np.maximum(np.searchsorted(lower, x, 'left') - 1, 0)
+            segment[start[i]:start[i] + count[i]] = first[i] + k
+        self._cell_start = start
+        self._cell_count = count
+        self._cell_scale = scale
+        self._cell_segment = segment
+
+
+class SurrogateThermo(object):
+    """Thermo-like scalar evaluation of a surrogate.
+
+    Setting `T` evaluates the state functions, available as the
+    properties of Thermo (Cp, cp, H, h, S, s).
+    """
+    __slots__ = ('_lower', '_segments', 'R', 'bounds',
+                 '_T', '_cp_nodim', '_h_nodim', '_s_nodim')
+
+    def __init__(self, surrogate, index, R=None):
+        i, j = surrogate.offsets[index], surrogate.offsets[index + 1]
+        if i == j:
+            raise ValueError("{} has no segments in {}".format(
+                surrogate.names[index], surrogate.Trange))
+        edges = surrogate.edges[i:j].tolist()
+        self._lower = [lower for lower, upper in edges]
+        self._segments = [
+            (mid, scale) + tuple(tuple(c[::-1]) for c in coeffs)
+            for mid, scale, coeffs in zip(surrogate._mid[i:j].tolist(),
+                                          surrogate._scale[i:j].tolist(),
+                                          surrogate.coeffs[i:j].tolist())
+        ]
+        self.R = R
+        self.bounds = (edges[0][0], edges[-1][1])
+
+    @property
+    def T(self):
+        """Temperature, K"""
+        return self._T
+    @T.setter
+    def T(self, T):
+        if not self.bounds[0] <= T <= self.bounds[1]:
+            raise ValueError("Temperature out of bounds")
+        k = bisect.bisect_left(self._lower, T) - 1
+        mid, scale, cp, h, s = self._segments[k if k > 0 else 0]
+        x = (T - mid) * scale
+        values = []
+        for c in (cp, h, s):
+            # Horner's scheme; coefficients from the highest power
+            y = 0.0
+            for coeff in c:
+                y = y * x + coeff
+            values.append(y)
+        self._T = T
+        self._cp_nodim, self._h_nodim, self._s_nodim = values
+
+    @property
+    def Cp(self):
+        """Molar heat capacity at constant pressure, J/mol-K."""
+        return self._cp_nodim * constants.R_CEA
+
+    @property
+    def cp(self):
+        """Specific heat capacity at constant pressure, J/kg-K."""
+        return self._cp_nodim * self.R
+
+    @property
+    def H(self):
+        """Molar enthalpy, J/mol"""
+        return self._h_nodim * constants.R_CEA * self._T
+
+    @property
+    def h(self):
+        """Specific enthalpy, J/kg"""
+        return self._h_nodim * self.R * self._T
+
+    @property
+    def S(self):
+        """Molar entropy, J/mol-K"""
+        return self._s_nodim * constants.R_CEA
+
+    @property
+    def s(self):
+        """Specific entropy, J/kg-K"""
+        return self._s_nodim * self.R
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _fit(packed, owner, rows, lo, hi, tol, degree, check):
+    # Fit block rows on [lo, hi], bisecting all segments out of
+    # tolerance at once. Returns (owner, lo, hi, coeffs) of the
+    # accepted segments.
+    nodes = chebyshev.chebpts2(degree + 1)
+    # Interpolating power series coefficients from values at the nodes
+    solve = np.linalg.inv(np.vander(nodes, degree + 1, increasing=True))
+    x = np.linspace(-1.0, 1.0, check)
+    powers = np.vander(x, degree + 1, increasing=True)
+
+    def exact(mid, half, x):
+        T = mid[:, None] + half[:, None] * x
+        R = np.broadcast_to(rows[:, None], T.shape)
+        return np.stack(vector.dimensionless(packed, R, T), axis=1)
+
+    accepted = []
+    for depth in range(_MAX_DEPTH + 1):
+        if not len(rows):
+            break
+        mid, half = (lo + hi) / 2.0, (hi - lo) / 2.0
+        coeffs = exact(mid, half, nodes) @ solve.T
+        error = np.abs(coeffs @ powers.T - exact(mid, half, x))
+        ok = error.max(axis=(1, 2)) <= _MARGIN * tol
+        accepted.append((owner[ok], lo[ok], hi[ok], coeffs[ok]))
+        # Bisect the others
+        bad = ~ok
+        owner = np.repeat(owner[bad], 2)
+        rows = np.repeat(rows[bad], 2)
+        lo, hi, mid = lo[bad], hi[bad], mid[bad]
+        lo, hi = (np.column_stack([lo, mid]).ravel(),
+                  np.column_stack([mid, hi]).ravel())
+    if len(rows):
+        raise ValueError("Tolerance {} not met on [{}, {}]".format(
+            tol, lo[0], hi[0]))
+    return tuple(np.concatenate(column) for column in zip(*accepted))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Stand-in for the CEA executable (tests).
+
+Like CEA, reads a case name from standard input and `<case>.inp` from
+the working directory and writes `<case>.out`. The output echoes the
+working directory, its files and the input deck.
+
+The behaviour is scripted by comment lines in the deck:
+
+    # stub: sleep 0.5    sleep before writing output
+    # stub: exit 3       exit with status 3 (no output)
+    # stub: no-output    exit normally without writing output
+"""
+import os
+import sys
+import time
+
+
+def main():
+    case = sys.stdin.readline().strip()
+    with open(case + '.inp') as f:
+        text = f.read()
+
+    for line in text.splitlines():
+        if not line.startswith('# stub:'):
+            continue
+        command, _, arg = line[len('# stub:'):].strip().partition(' ')
+        if command == 'sleep':
+            time.sleep(float(arg))
+        elif command == 'exit':
+            return int(arg)
+        elif command == 'no-output':
+            return 0
+
+    with open(case + '.out', 'w') as f:
+        f.write(' CEA STUB\n')
+        f.write(' CWD {}\n'.format(os.getcwd()))
+        f.write(' FILES {}\n'.format(' '.join(sorted(os.listdir('.')))))
+        f.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
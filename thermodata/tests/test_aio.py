@@ -0,0 +1,137 @@
+import os
+import re
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+import subprocess
+import concurrent.futures
+
+import numpy as np
+
+from thermodata import aio, cea, packed, thermoinp, vector
+from thermodata.thermodata import ChemDB
+
+
+STUB = os.path.join(os.path.dirname(__file__), 'data', 'cea_stub.py')
+
+
+class TestLoad(unittest.IsolatedAsyncioTestCase):
+
+    async def test_db(self):
+        """The event loop runs while the database is parsed."""
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(tick())
+        try:
+            db = await thermoinp.DB.aload()
+        finally:
+            ticker.cancel()
+        self.assertGreater(ticks, 1)
+        self.assertEqual([s.name for s in db.all],
+                         [s.name for s in thermoinp.DB().all])
+
+    async def test_chemdb(self):
+        db = await ChemDB.aload()
+        self.assertIsInstance(db, ChemDB)
+        db.select(('CO2',))
+        self.assertEqual(list(db), ['CO2'])
+
+
+class TestEvaluate(unittest.IsolatedAsyncioTestCase):
+    packed = packed.PackedDB.from_db(thermoinp.DB())
+
+    async def test_evaluate(self):
+        T = np.linspace(200.0, 6000.0, 50)
+        calls = []
+        result = await aio.evaluate(self.packed, T, chunksize=1000,
+                                    progress=lambda *a: calls.append(a))
+        expected = vector.evaluate(self.packed, T)
+        for prop in ('interval', 'Cp', 'H', 'S'):
+            np.testing.assert_array_equal(getattr(result, prop),
+                                          getattr(expected, prop))
+        n = -(-len(self.packed) * len(T) // 1000)
+        self.assertEqual(calls, [(i, n) for i in range(1, n + 1)])
+
+    async def test_cancel(self):
+        """Chunks not yet started are cancelled."""
+        started = []
+
+        def slow(x):
+            started.append(x[0])
+            time.sleep(0.05)
+            return x
+
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            task = asyncio.ensure_future(
+                aio.apply(slow, np.arange(100), chunksize=1,
+                          executor=executor))
+            await asyncio.sleep(0.12)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        self.assertLess(len(started), 10)
+
+
+class TestCEA(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.problem = cea.Problem(
+            'tp', {'t,k': 1000, 'p,bar': 1.0},
+            reactants=(cea.Reactant('name', 'CO2', 100.0),),
+            only=('CO2', 'CO', 'O2')
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    async def test_run(self):
+        problems = [self.problem._replace(parameters={'t,k': T})
+                    for T in (500, 1000, 1500, 2000)]
+        calls = []
+        outputs = await aio.run_cea(problems, thermoinp.DB(),
+                                    executable=STUB, tmpdir=self.tmpdir,
+                                    max_workers=2,
+                                    progress=lambda *a: calls.append(a))
+        for problem, output in zip(problems, outputs):
+            self.assertIn(problem.format(), output)
+            self.assertTrue(output.startswith(' CEA STUB\n'))
+        workdirs = {re.search(r' CWD (.*)\n', output).group(1)
+                    for output in outputs}
+        self.assertEqual(len(workdirs), 4)
+        self.assertEqual(calls, [(1, 4), (2, 4), (3, 4), (4, 4)])
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    async def test_failure(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            await aio.run_deck('# stub: exit 3\n', STUB)
+        with self.assertRaises(IOError):
+            await aio.run_deck('# stub: no-output\n', STUB)
+        with self.assertRaises(subprocess.TimeoutExpired):
+            await aio.run_deck('# stub: sleep 5\n', STUB, timeout=0.5)
+
+    async def test_cancel(self):
+        """Cancelled cases are killed and their directories removed."""
+        decks = ['# stub: sleep 5\n'] * 3
+        task = asyncio.ensure_future(aio.run_cea(decks, executable=STUB,
+                                                 tmpdir=self.tmpdir))
+        await asyncio.sleep(0.5)
+        self.assertTrue(os.listdir(self.tmpdir))
+        start = time.perf_counter()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from benchmarks import runner, suite
+
+
+class TestRunner(unittest.TestCase):
+    """Measurement and comparison of benchmark results."""
+
+    def test_measure(self):
+        result = runner.measure(lambda: [0] * 1000, repeat=2,
+                                min_time=0.001)
+        self.assertEqual(result['repeat'], 2)
+        self.assertGreater(result['time'], 0)
+        self.assertLessEqual(result['time'], result['median'])
+        self.assertGreaterEqual(result['peak'], 8000)
+        self.assertGreaterEqual(result['allocations'], 1)
+
+    def test_allocations(self):
+        """Blocks freed by the call don't offset its allocations."""
+        held = [[i] for i in range(1000)]
+        def replace():
+            held[:] = [(i,) for i in range(100)]
+            return held
+        self.assertGreaterEqual(runner._memory(replace)[1], 100)
+
+    def test_measure_error(self):
+        """Exceptions of the measured callable propagate."""
+        def fail():
+            raise ZeroDivisionError
+        with self.assertRaises(ZeroDivisionError):
+            runner._memory(fail)
+
+    def test_compare(self):
+        base = {'results': {'a': {'time': 1.0, 'peak': 100},
+                            'b': {'time': 1.0, 'peak': 100},
+                            'c': {'time': 1.0, 'peak': 100}}}
+        head = {'results': {'a': {'time': 1.1, 'peak': 100},
+                            'b': {'time': 1.5, 'peak': 120},
+                            'd': {'time': 1.0, 'peak': 100}}}
+        rows = runner.compare(base, head)
+        self.assertEqual([(name, flags) for name, _, _, flags in rows],
+                         [('a', []), ('b', ['time', 'peak'])])
+        self.assertIn('REGRESSION (time, peak)',
+                      runner.format_comparison(rows))
+
+
+class TestSuite(unittest.TestCase):
+    """Every workload sets up and runs."""
+
+    @classmethod
+    def tearDownClass(cls):
+        suite.cleanup()
+
+    def test_workloads(self):
+        for name, setup in sorted(suite.BENCHMARKS.items()):
+            with self.subTest(name):
+                setup()()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import binary, packed, thermoinp
+from thermodata.thermodata import ChemDB
+
+
+class TestBinaryDB(unittest.TestCase):
+    """Round-trip the source database through the binary format."""
+    source = thermoinp.DB()
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'thermo.tdcb')
+        binary.write(self.source, self.path)
+        self.db = binary.BinaryDB(self.path)
+
+    def tearDown(self):
+        del self.db
+        shutil.rmtree(self.tmpdir)
+
+    def test_arrays_are_memory_mapped(self):
+        """Table and block are views on the file mapping."""
+        self.assertIsInstance(self.db.table.base, np.memmap)
+        self.assertIsInstance(self.db.block.base, np.memmap)
+        self.assertTrue(self.db.block.flags['C_CONTIGUOUS'])
+
+    def test_len(self):
+        """Repeated species names are resolved as in thermoinp.DB."""
+        self.assertEqual(len(self.db), len(self.source._dict))
+
+    def test_repeated_names(self):
+        """All datasets are packed unless names are unique."""
+        db = packed.PackedDB.from_db(self.source, unique=False)
+        self.assertEqual(len(db), len(self.source.all))
+        first = next(r for r in self.source.all if r.name == 'Fe(a)')
+        self.assertEqual(db.rows('Fe(a)')[:, 0].tolist(),
+                         [interval.lim[0] for interval in first.intervals])
+
+    def test_rows(self):
+        """Coefficient rows match the source intervals."""
+        record = self.source['CO2']
+        rows = self.db.rows('CO2')
+        self.assertEqual(rows.shape, (3, packed.NCOLS))
+        for row, interval in zip(rows.tolist(), record.intervals):
+            self.assertEqual(tuple(row), interval.lim + interval.a +
+                                         interval.b)
+
+    def test_species_matches_chemdb(self):
+        """Hydrated species compare equal to the ChemDB species."""
+        chemdb = ChemDB()
+        chemdb.select(('CO2', 'Air', 'KCL'))
+        for name in chemdb:
+            self.assertEqual(self.db[name], chemdb[name])
+            self.assertEqual(self.db[name].phase, chemdb[name].phase)
+
+    def test_species_without_intervals(self):
+        """Assigned-enthalpy species have no thermo model."""
+        species = self.db['B2H6(L)']
+        self.assertIsNone(species.thermo)
+        self.assertIsNone(species.Hf)
+        entry = self.db.table[self.db.index('B2H6(L)')]
+        self.assertEqual(entry['h_assigned'], 16445.0)
+        self.assertEqual(entry['T_reference'], 180.59)
+
+    def test_contains(self):
+        self.assertIn('Air', self.db)
+        self.assertNotIn('Adamantium', self.db)
+        self.assertRaises(KeyError, self.db.__getitem__, 'Adamantium')
+
+    def test_write_from_chemdb(self):
+        """A ChemDB selection can be written and reopened."""
+        chemdb = ChemDB()
+        chemdb.select(('N2', 'O2'))
+        binary.write(chemdb, self.path + '2')
+        db = binary.BinaryDB(self.path + '2')
+        self.assertEqual(db.names, ['N2', 'O2'])
+        self.assertEqual(db['N2'], chemdb['N2'])
+
+    def test_invalid_file(self):
+        """Files without the magic number are rejected."""
+        path = os.path.join(self.tmpdir, 'thermo.inp')
+        with open(path, 'wb') as f:
+            f.write(b'thermo'.ljust(binary.HEADER_SIZE))
+        self.assertRaises(ValueError, binary.BinaryDB, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from thermodata import cea, thermoinp
+
+
+STUB = os.path.join(os.path.dirname(__file__), 'data', 'cea_stub.py')
+
+
+class TestDeck(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def setUp(self):
+        self.problem = cea.Problem(
+            'tp', {'t,k': (1000, 2000), 'p,bar': 1.0},
+            reactants=(cea.Reactant('fuel', 'C3H8', 100.0, T=298.15),
+                       cea.Reactant('oxid', 'Air', 100.0)),
+            only=('CO2', 'CO', 'H2O', 'N2', 'O2', 'Ar'),
+            output=('siunits',)
+        )
+
+    def test_format(self):
+        self.assertEqual(self.problem.format(), '\n'.join([
+            'problem tp t,k=1000,2000 p,bar=1.0',
+            'react',
+            '  fuel=C3H8 wt%=100.0 t,k=298.15',
+            '  oxid=Air wt%=100.0',
+            'only CO2 CO H2O N2 O2 Ar',
+            'output siunits',
+            'end'
+        ]))
+
+    def test_wrap(self):
+        """Long species lists continue on the following lines."""
+        lines = cea._wrap('only', ['Species{}'.format(i)
+                                   for i in range(20)])
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(all(len(line) <= 79 for line in lines))
+        self.assertEqual(' '.join(lines).split()[1:],
+                         ['Species{}'.format(i) for i in range(20)])
+
+    def test_deck_subset(self):
+        """The deck includes the problem species only."""
+        text = cea.deck(self.problem, self.db)
+        thermo, problem = re.split(r'END REACTANTS *\n', text)
+        self.assertTrue(thermo.startswith('thermo'))
+        self.assertEqual(problem, self.problem.format() + '\n')
+        names = set(re.findall(r'^([^ \n]+) ', thermo, re.MULTILINE))
+        self.assertTrue(set(self.problem.species) <= names)
+        self.assertNotIn('CH4', names)
+
+    def test_deck_repeated_datasets(self):
+        """All datasets of species with phase transitions are kept."""
+        problem = cea.Problem('tp', {'t,k': 300},
+                              reactants=(cea.Reactant('name', 'Fe(a)',
+                                                      100.0),),
+                              only=('Fe(a)',))
+        thermo = cea.thermo_subset(self.db, problem)
+        expected = [r for r in self.db.all if r.name == 'Fe(a)']
+        self.assertGreater(len(expected), 1)
+        self.assertEqual(thermo.count('\nFe(a) '), len(expected))
+
+    def test_deck_no_db(self):
+        self.assertEqual(cea.deck(self.problem),
+                         self.problem.format() + '\n')
+
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.problem = cea.Problem(
+            'tp', {'t,k': 1000, 'p,bar': 1.0},
+            reactants=(cea.Reactant('name', 'CO2', 100.0),),
+            only=('CO2', 'CO', 'O2')
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_run_deck(self):
+        text = cea.deck(self.problem)
+        output = cea.run_deck(text, STUB, tmpdir=self.tmpdir)
+        self.assertTrue(output.startswith(' CEA STUB\n'))
+        self.assertTrue(output.endswith(text))
+        # The working directory is removed
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_run(self):
+        """Cases run in isolated directories; outputs are ordered."""
+        problems = [self.problem._replace(parameters={'t,k': T})
+                    for T in (500, 1000, 1500, 2000)]
+        outputs = cea.run(problems, thermoinp.DB(), executable=STUB,
+                          tmpdir=self.tmpdir, max_workers=2)
+        self.assertEqual(len(outputs), 4)
+        for problem, output in zip(problems, outputs):
+            self.assertIn(problem.format(), output)
+            self.assertIn('END REACTANTS', output)
+        workdirs = {re.search(r' CWD (.*)\n', output).group(1)
+                    for output in outputs}
+        self.assertEqual(len(workdirs), 4)
+
+    def test_libs(self):
+        lib = os.path.join(self.tmpdir, 'thermo.lib')
+        with open(lib, 'w') as f:
+            f.write('lib')
+        output = cea.run_deck(cea.deck(self.problem), STUB, libs=(lib,))
+        self.assertIn(' FILES case.inp case.out thermo.lib\n', output)
+
+    def test_environment(self):
+        os.environ['CEA_EXECUTABLE'] = STUB
+        try:
+            self.assertEqual(cea.find_executable(), STUB)
+            self.assertEqual(cea.find_executable('other'), 'other')
+        finally:
+            del os.environ['CEA_EXECUTABLE']
+        self.assertEqual(cea.find_executable(), cea.EXECUTABLE)
+
+    def test_failure(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            cea.run_deck('# stub: exit 3\n', STUB)
+        with self.assertRaises(IOError):
+            cea.run_deck('# stub: no-output\n', STUB)
+
+    def test_timeout(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            cea.run_deck('# stub: sleep 5\n', STUB, timeout=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+import tracemalloc
+
+import numpy as np
+
+from thermodata import ceaout
+
+
+CAP_OUT = os.path.join(os.path.dirname(__file__), 'data', 'cap_out.txt')
+
+
+class TestParse(unittest.TestCase):
+
+    def setUp(self):
+        self.records = list(ceaout.read(CAP_OUT))
+        self.case = self.records[0]
+        self.tables = {r.name: r for r in self.records[1:]}
+
+    def test_records(self):
+        """A case is followed by a table per species."""
+        self.assertIsInstance(self.case, ceaout.Case)
+        self.assertEqual([r.name for r in self.records[1:]],
+                         ['CO2', 'C3H8', 'InCl3(cr)', 'Air'])
+        self.assertTrue(all(r.case is self.case
+                            for r in self.records[1:]))
+
+    def test_case(self):
+        self.assertEqual(self.case.species,
+                         ('CO2', 'C3H8', 'InCl3(cr)', 'Air'))
+        self.assertEqual(self.case.options, 'joules')
+        np.testing.assert_array_equal(
+            self.case.schedule,
+            [200.0, 298.15] + list(np.arange(300.0, 20001.0, 100.0))
+        )
+
+    def test_table(self):
+        co2 = self.tables['CO2']
+        self.assertEqual(co2.data.shape, (201, len(ceaout.COLUMNS)))
+        np.testing.assert_array_equal(co2.T[1:], self.case.schedule)
+        # 298.15 K row
+        np.testing.assert_array_equal(
+            co2.data[2],
+            [298.15, 37.135, 0.0, 213.787, 213.787, -393.510, -393.510,
+             69.0913]
+        )
+        # INFINITE and blank values
+        self.assertEqual(co2.GH298T[0], np.inf)
+        self.assertEqual(co2.logK[0], np.inf)
+        self.assertTrue(np.isnan(co2.Hf[-1]))
+        self.assertEqual(co2.H[-1], 1118.275)
+
+    def test_dataset(self):
+        lines = self.tables['C3H8'].dataset.splitlines()
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(lines[0].split()[0], 'C3H8')
+
+    def test_missing_species(self):
+        """Species without data have empty tables."""
+        table = self.tables['InCl3(cr)']
+        self.assertEqual(table.data.shape, (0, len(ceaout.COLUMNS)))
+        self.assertEqual(table.dataset, '')
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, copies):
+        path = os.path.join(self.tmpdir, '{}.out'.format(copies))
+        with open(CAP_OUT) as f:
+            text = f.read()
+        with open(path, 'w') as f:
+            for i in range(copies):
+                f.write(text)
+        return path
+
+    def _peak(self, path):
+        tracemalloc.start()
+        try:
+            count = sum(1 for record in ceaout.read(path))
+            return count, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_cases(self):
+        """Concatenated outputs are parsed as separate cases."""
+        records = list(ceaout.read(self._write(3)))
+        cases = [r for r in records if isinstance(r, ceaout.Case)]
+        self.assertEqual(len(cases), 3)
+        self.assertEqual(len(records), 15)
+        self.assertEqual(cases[2].species, cases[0].species)
+
+    def test_constant_memory(self):
+        """Peak memory doesn't grow with the size of the output."""
+        count, peak = self._peak(self._write(1))
+        count_50, peak_50 = self._peak(self._write(50))
+        self.assertEqual(count_50, 50 * count)
+        self.assertLess(peak_50, 1.5 * peak)
+
+
+if __name__ == '__main__':
+    unittest.main()
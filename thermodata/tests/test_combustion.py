@@ -0,0 +1,121 @@
+import unittest
+
+import numpy as np
+
+from thermodata import constants, thermoinp, vector
+from thermodata.combustion import Combustion
+
+
+class TestCombustion(unittest.TestCase):
+    db = thermoinp.DB()
+    methane = Combustion(['CH4', 'Air'], db=db)
+    phi = np.array([0.5, 0.8, 1.0, 1.2, 1.5])
+
+    def setUp(self):
+        self.amounts = self.methane.equivalence(self.phi, 'CH4', 'Air')
+        self.result = self.methane.solve(self.amounts, 298.15)
+
+    def test_equivalence(self):
+        # CH4 + 2 O2; air has 0.41959 mol O (and a little C) per mol
+        O = 0.41959
+        C = 0.00032
+        stoichiometric = (2.0 * O - 4.0 * C) / 8.0
+        np.testing.assert_allclose(self.amounts[:, 0],
+                                   self.phi * stoichiometric)
+        np.testing.assert_array_equal(self.amounts[:, 1], 1.0)
+
+    def test_flame_temperature(self):
+        """CH4/air at 1 bar and 298.15 K (CEA, same products)."""
+        self.assertTrue(self.result.converged.all())
+        self.assertAlmostEqual(self.result.T[2], 2224.0, delta=3.0)
+        self.assertEqual(np.argmax(self.result.T), 2)
+
+    def test_balance(self):
+        """Elements and enthalpy are conserved."""
+        result = self.result
+        np.testing.assert_allclose(result.n @ self.methane.A.T,
+                                   self.amounts @ self.methane.B.T,
+                                   rtol=1e-6, atol=1e-12)
+        index = vector.species_index(self.methane.packed,
+                                     self.methane.products)
+        H = vector.evaluate_pairs(self.methane.packed, index[None, :],
+                                  result.T[:, None])[2]
+        np.testing.assert_allclose((result.n * H).sum(axis=1),
+                                   self.methane.enthalpy(self.amounts,
+                                                         298.15),
+                                   atol=1e-2 * constants.R_CEA * 3000)
+
+    def test_equilibrium(self):
+        """Products minimise the Gibbs energy; reactions between them
+        are in equilibrium."""
+        result = self.methane.equilibrate(self.amounts, 2000.0, P=10.0)
+        self.assertTrue(result.converged.all())
+        np.testing.assert_array_equal(result.T, 2000.0)
+        # O2 = 2 O: X_O^2 P / X_O2 = Kp
+        products = self.methane.products
+        index = vector.species_index(self.methane.packed, ['O', 'O2'])
+        H, S = vector.evaluate_pairs(self.methane.packed, index,
+                                     2000.0)[2:]
+        dG = 2 * (H[0] - 2000.0 * S[0]) - (H[1] - 2000.0 * S[1])
+        logK = -dG / (constants.R_CEA * 2000.0 * np.log(10.0))
+        X = result.X
+        Kp = (X[:, products.index('O')] ** 2 * 10.0
+              / X[:, products.index('O2')])
+        np.testing.assert_allclose(np.log10(Kp), logK, atol=1e-4)
+
+    def test_warm_start(self):
+        result = self.methane.solve(self.amounts, 310.0,
+                                    guess=self.result)
+        self.assertTrue(result.converged.all())
+        self.assertLess(result.iterations.max(),
+                        self.result.iterations.min())
+        cold = self.methane.solve(self.amounts, 310.0)
+        np.testing.assert_allclose(result.T, cold.T, rtol=1e-5)
+        self.assertTrue((result.T > self.result.T).all())
+
+    def test_reactant_temperatures(self):
+        """Per reactant temperatures (preheated air)."""
+        T = np.array([[298.15, 298.15], [298.15, 600.0]])
+        result = self.methane.solve(self.amounts[[2, 2]], T)
+        self.assertGreater(result.T[1], result.T[0] + 100.0)
+
+    def test_mole_fractions(self):
+        X = self.result.X
+        np.testing.assert_allclose(X.sum(axis=1), 1.0)
+        # Lean: excess O2; rich: CO and H2
+        self.assertGreater(self.result['O2'][0], 0.09)
+        self.assertGreater(self.result['CO'][4], 0.05)
+        self.assertGreater(self.result['H2'][4], 0.03)
+
+    def test_absent_elements(self):
+        """Elements absent from a case (no carbon in H2/O2)."""
+        flame = Combustion(['H2', 'O2'], db=self.db)
+        result = flame.solve([[2.0, 1.0]], 298.15)
+        self.assertTrue(result.converged.all())
+        self.assertEqual(result['CO2'][0], 0.0)
+        self.assertEqual(result['N2'][0], 0.0)
+        self.assertGreater(result.T[0], 3000.0)
+
+    def test_liquid_fuel(self):
+        flame = Combustion(['Jet-A(L)', 'Air'], db=self.db)
+        amounts = flame.equivalence([1.0], 'Jet-A(L)', 'Air')
+        result = flame.solve(amounts, 298.15)
+        self.assertTrue(result.converged.all())
+        self.assertGreater(result.T[0], 2200.0)
+        self.assertLess(result.T[0], 2350.0)
+
+    def test_assigned_enthalpy(self):
+        """Reactants without intervals have their assigned enthalpy."""
+        flame = Combustion(['CH4(L)', 'O2'], db=self.db)
+        H = flame.enthalpy([[1.0, 0.0]], 111.643)
+        self.assertEqual(H[0], self.db['CH4(L)'].h_assigned)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, Combustion, ['SO2', 'Air'],
+                          db=self.db)
+        self.assertRaises(ValueError, Combustion, ['CH4', 'Air'],
+                          ['CO2', 'H2O(L)'], db=self.db)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import io
+import unittest
+
+import numpy as np
+
+from thermodata import convert, packed, thermoinp, vector
+from thermodata.thermodata import ChemDB
+
+
+# GRI-Mech 3.0
+GRI_CO2 = """\
+THERMO ALL
+   300.000  1000.000  5000.000
+! GRI-Mech Version 3.0 Thermodynamics released 7/30/99
+CO2               L 7/88C   1O   2    0    0G   200.000  3500.000  1000.000    1
+ 3.85746029E+00 4.41437026E-03-2.21481404E-06 5.23490188E-10-4.72084164E-14    2
+-4.87591660E+04 2.27163806E+00 2.35677352E+00 8.98459677E-03-7.12356269E-06    3
+ 2.45919022E-09-1.43699548E-13-4.83719697E+04 9.90105222E+00                   4
+END
+"""
+
+NAMES = ['CO2', 'H2O', 'N2', 'AL(cr)', 'AL(L)', 'CsBO2(cr)', 'NaCN(II)',
+         'Air', 'e-']
+
+
+def _evaluate(records, T):
+    # (Cp/R, H/RT, S/R) of records (rows) at temperatures T
+    db = packed.PackedDB.from_db(thermoinp.DB.from_records(records))
+    index = vector.species_index(db, [r.name for r in records])
+    rows = vector.rows(db, index[:, None], T, extrapolate=True)
+    return vector.dimensionless(db, rows, T)
+
+
+class TestNASA7(unittest.TestCase):
+    db = thermoinp.DB()
+    fit = convert.nasa7(db, NAMES)
+
+    def test_ranges(self):
+        np.testing.assert_array_equal(self.fit.T[self.fit.index['CO2']],
+                                      [200.0, 1000.0, 6000.0])
+        # Common temperature near the end of the range (1000 of 1005 K)
+        np.testing.assert_array_equal(
+            self.fit.T[self.fit.index['CsBO2(cr)']], [200.0, 602.5, 1005.0])
+
+    def test_error(self):
+        """Reported errors bound the errors between fitted points."""
+        u = np.random.RandomState(0).uniform(size=500)
+        T = self.fit.T[:, :1] + (self.fit.T[:, 2:] - self.fit.T[:, :1]) * u
+        expected = _evaluate(self.fit.records, T)
+        for k, (x, y) in enumerate(zip(self.fit.dimensionless(T),
+                                       expected)):
+            error = np.abs(x - y).max(axis=1)
+            self.assertTrue(np.all(error <= self.fit.error[:, k] * 1.05))
+        i = self.fit.index['CO2']
+        self.assertTrue(np.all(self.fit.error[i] < 0.03))
+        # Lambda transitions can't be fitted
+        self.assertGreater(self.fit.error[self.fit.index['NaCN(II)'], 0],
+                           1.0)
+
+    def test_continuity(self):
+        Tm = self.fit.T[:, 1:2]
+        below = self.fit.dimensionless(Tm)
+        above = convert._nasa7(self.fit.high, Tm[:, 0])
+        for x, y in zip(below, above):
+            np.testing.assert_allclose(x[:, 0], y, rtol=1e-9, atol=1e-9)
+
+    def test_chemdb(self):
+        chemdb = ChemDB()
+        chemdb.select(('H2O', 'CO2'))
+        fit = convert.nasa7(chemdb)
+        self.assertEqual(fit.names, ['H2O', 'CO2'])
+        np.testing.assert_array_equal(fit.high[1],
+                                      self.fit.high[self.fit.index['CO2']])
+
+
+class TestChemkin(unittest.TestCase):
+    db = thermoinp.DB()
+    fit = convert.nasa7(db, NAMES)
+
+    def setUp(self):
+        self.text = ''.join(convert.chemkin(self.fit))
+
+    def test_format(self):
+        lines = self.text.splitlines()
+        self.assertEqual(lines[0], 'THERMO ALL')
+        self.assertEqual(lines[-1], 'END')
+        self.assertIn('! Air skipped: fractional composition', lines)
+        entries = [line for line in lines[2:-1] if line[0] != '!']
+        self.assertEqual(len(entries), 4 * (len(NAMES) - 2))
+        for i, line in enumerate(entries):
+            self.assertEqual(len(line), 80)
+            self.assertEqual(line[79], str(i % 4 + 1))
+        self.assertEqual(entries[0][:45],
+                         'CO2               g 9/99C   1O   2          G')
+
+    def test_max_error(self):
+        """Fits worse than max_error are written as comments."""
+        lines = self.text.splitlines()
+        skipped, = [line for line in lines if 'NaCN(II)' in line]
+        self.assertRegex(skipped,
+                         r'^! NaCN\(II\) skipped: fit error \d+ above 1$')
+        text = ''.join(convert.chemkin(self.fit, max_error=np.inf))
+        lines = text.splitlines()
+        self.assertEqual(len(lines), len(self.text.splitlines()) + 3)
+        self.assertIn('NaCN(II) ', [line[:9] for line in lines])
+
+    def test_round_trip(self):
+        h_formation = {name: self.db[name].h_formation for name in NAMES}
+        records = list(convert.read_chemkin(io.StringIO(self.text),
+                                            h_formation=h_formation))
+        names = [r.name for r in records]
+        self.assertEqual(names, [n for n in NAMES
+                                 if n not in ('Air', 'NaCN(II)')])
+        fit = convert.nasa7(self.db, names)
+        T = np.linspace(0.0, 1.0, 11)
+        T = fit.T[:, :1] + (fit.T[:, 2:] - fit.T[:, :1]) * T
+        for x, y in zip(_evaluate(records, T), fit.dimensionless(T)):
+            np.testing.assert_allclose(x, y, rtol=1e-6, atol=1e-3)
+        for record in records:
+            source = self.db[record.name]
+            self.assertEqual(record.elements, source.elements)
+            self.assertEqual(record.phase > 0, source.phase > 0)
+            self.assertAlmostEqual(record.molwt / source.molwt, 1.0, 4)
+            self.assertEqual(record.h_formation, source.h_formation)
+
+    def test_h_formation(self):
+        """Species without data at 298.15 K require h_formation."""
+        with self.assertRaisesRegex(ValueError, 'AL\\(L\\): h_formation'):
+            list(convert.read_chemkin(io.StringIO(self.text)))
+
+    def test_read(self):
+        """Read foreign data (GRI-Mech)."""
+        record, = convert.read_chemkin(GRI_CO2.splitlines())
+        self.assertEqual(record.name, 'CO2')
+        self.assertEqual([x.lim for x in record.intervals],
+                         [(200.0, 1000.0), (1000.0, 3500.0)])
+        self.assertEqual(record.intervals[1].a[2:], (
+            3.85746029E+00, 4.41437026E-03, -2.21481404E-06,
+            5.23490188E-10, -4.72084164E-14))
+        self.assertAlmostEqual(record.molwt, 44.0095, 3)
+        self.assertAlmostEqual(record.h_formation, -393510.0, delta=200)
+        T = np.array([[300.0, 1500.0, 3000.0]])
+        expected = _evaluate([self.db['CO2']], T)
+        for x, y in zip(_evaluate([record], T), expected):
+            np.testing.assert_allclose(x, y, rtol=1e-2)
+        # As a database
+        db = thermoinp.DB.from_records([record])
+        self.assertEqual(db.gaseous, [record])
+        self.assertIn('\nCO2 ', '\n' + db.format())
+
+
+class TestCantera(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def test_format(self):
+        text = ''.join(convert.cantera(self.db, ['AL(cr)']))
+        self.assertEqual(text.splitlines()[:6], [
+            'species:',
+            '- name: "AL(cr)"',
+            '  composition: {Al: 1}',
+            '  thermo:',
+            '    model: NASA9',
+            '    temperature-ranges: [200, 933.61]'])
+
+    def test_nasa9(self):
+        """NASA9 converts exactly."""
+        text = ''.join(convert.cantera(self.db, NAMES))
+        h_formation = {'AL(L)': 0.0, 'NaCN(II)': -90709.0}
+        records = list(convert.read_cantera(text, h_formation=h_formation))
+        self.assertEqual([r.name for r in records], NAMES)
+        for record in records:
+            source = self.db[record.name]
+            self.assertEqual(record.elements, source.elements)
+            self.assertEqual(record.comments, source.comments.strip())
+            for x, y in zip(record.intervals, source.intervals):
+                self.assertEqual((x.lim, x.a, x.b), (y.lim, y.a, y.b))
+            self.assertAlmostEqual(record.h_formation,
+                                   source.h_formation, delta=1.0)
+        with self.assertRaisesRegex(ValueError, 'h_formation required'):
+            list(convert.read_cantera(text))
+
+    def test_nasa7(self):
+        fit = convert.nasa7(self.db, ['CO2', 'H2O'])
+        text = ''.join(convert.cantera(fit))
+        self.assertIn('    model: NASA7\n', text)
+        records = list(convert.read_cantera(text))
+        T = np.array([[300.0, 1200.0], [500.0, 3000.0]])
+        for x, y in zip(_evaluate(records, T), fit.dimensionless(T)):
+            np.testing.assert_allclose(x, y, rtol=1e-12)
+        # Fits worse than max_error are comments
+        text = ''.join(convert.cantera(self.db, ['CO2', 'NaCN(II)'],
+                                       model='NASA7'))
+        self.assertRegex(text, '\n# NaCN\\(II\\) skipped: fit error ')
+        self.assertEqual([r.name for r in convert.read_cantera(text)],
+                         ['CO2'])
+
+    def test_unsupported(self):
+        text = ('species:\n- name: X\n  composition: {H: 1}\n'
+                '  thermo: {model: constant-cp}\n')
+        with self.assertRaisesRegex(ValueError, 'unsupported'):
+            list(convert.read_cantera(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import fit, packed, thermoinp, vector
+
+
+NAMES = ['CO2', 'H2O', 'N2', 'CH4', 'AL(cr)']
+GASES = NAMES[:4]
+
+
+class TestFit(unittest.TestCase):
+    db = thermoinp.DB()
+    packed = packed.PackedDB.from_db(db)
+    T = np.arange(200.0, 6001.0, 50.0)
+
+    def table(self, T=T, names=NAMES):
+        table = vector.evaluate(self.packed, T, names)
+        return table.Cp, table.H, table.S
+
+    def test_reproduce(self):
+        """Tables of database species give back their coefficients."""
+        result = fit.fit(NAMES, self.T, *self.table())
+        self.assertLess(result.error.max(), 1e-7)
+        for name in NAMES:
+            intervals = result.intervals(name)
+            expected = [x for x in self.db[name].intervals
+                        if x.lim[0] < 6000.0]
+            self.assertEqual([x.lim[0] for x in intervals],
+                             [x.lim[0] for x in expected])
+            for x, y in zip(intervals, expected):
+                np.testing.assert_allclose(x.a, y.a[:7], rtol=1e-4,
+                                           atol=1e-12)
+                np.testing.assert_allclose(x.b, y.b, rtol=1e-5)
+        # Tabulated to 900 K; AL(cr) data end at 933.61 K
+        self.assertEqual(result.intervals('AL(cr)')[-1].lim,
+                         (200.0, 900.0))
+
+    def test_continuity(self):
+        T = np.arange(200.0, 3001.0, 50.0)
+        Cp, H, S = self.table(T, GASES)
+        Cp = Cp * (1.0 + 1e-3 * np.sin(T / 50.0))
+        result = fit.fit(GASES, T, Cp, H, S)
+        self.assertTrue((result.error > 1e-6).all())
+        for name in GASES:
+            low, high = result.intervals(name)
+            self.assertEqual((low.lim, high.lim),
+                             ((200.0, 1000.0), (1000.0, 3000.0)))
+            db = thermoinp.DB.from_records(
+                [result.record(name, {'C': 1}, molwt=12.0)])
+            p = packed.PackedDB.from_db(db)
+            rows = p.table['start'][0] + np.arange(2)
+            for x in vector.dimensionless(p, rows, np.full(2, 1000.0)):
+                self.assertAlmostEqual(x[0], x[1], places=10)
+
+    def test_breaks(self):
+        """Breaks leaving too few temperatures are dropped."""
+        T = np.arange(200.0, 1251.0, 50.0)
+        result = fit.fit(GASES, T, *self.table(T, GASES))
+        self.assertEqual(result.bounds.tolist(),
+                         [[200.0, 1000.0], [1000.0, 1250.0]] * 4)
+        T = np.arange(200.0, 1201.0, 50.0)
+        result = fit.fit(GASES, T, *self.table(T, GASES))
+        self.assertEqual(result.bounds.tolist(), [[200.0, 1200.0]] * 4)
+        self.assertEqual(result.offsets.tolist(), [0, 1, 2, 3, 4])
+        result = fit.fit(GASES, T, *self.table(T, GASES), min_points=3)
+        self.assertEqual(len(result.intervals('CO2')), 2)
+
+    def test_padding(self):
+        """Tables padded with NaN fit as separate tables."""
+        Cp, H, S = self.table()
+        T = np.tile(self.T, (len(NAMES), 1))
+        T[0, 60:] = np.nan
+        T[1, :3] = np.nan
+        Cp[2, 10] = np.nan
+        result = fit.fit(NAMES, T, Cp, H, S)
+        for i, name in enumerate(NAMES):
+            valid = np.isfinite(T[i]) & np.isfinite(H[i])
+            alone = fit.fit([name], T[i, valid], Cp[i, valid],
+                            H[i, valid], S[i, valid])
+            for x, y in zip(result.intervals(name),
+                            alone.intervals(name)):
+                self.assertEqual(x.lim, y.lim)
+                np.testing.assert_allclose(x.a, y.a, rtol=1e-6,
+                                           atol=1e-15)
+        self.assertEqual(result.intervals('CO2')[-1].lim,
+                         (1000.0, 3150.0))
+        self.assertEqual(result.intervals('H2O')[0].lim, (350.0, 1000.0))
+        with self.assertRaises(ValueError):
+            fit.fit(NAMES[:2], self.T, Cp, H, S)
+        with self.assertRaises(ValueError):
+            fit.fit(NAMES, self.T[:4], Cp[:, :4], H[:, :4], S[:, :4])
+
+    def test_h_formation(self):
+        """Fits excluding 298.15 K require the formation enthalpy."""
+        T = np.arange(400.0, 3001.0, 50.0)
+        result = fit.fit(['CO2'], T, *self.table(T, ['CO2']))
+        with self.assertRaisesRegex(ValueError, 'h_formation'):
+            result.record('CO2', {'C': 1, 'O': 2})
+        record = result.record('CO2', {'C': 1, 'O': 2},
+                               h_formation=-393510.0)
+        self.assertIn('-393510.000', record.formatted.split('\n')[1])
+        self.assertEqual(
+            thermoinp.SpeciesRecord.from_dataset(
+                record.formatted.split('\n')).h_formation, -393510.0)
+
+    def test_overlay(self):
+        """Fitted species are written as an overlay database."""
+        result = fit.fit(NAMES, self.T, *self.table())
+        record = result.record('CO2', {'C': 1, 'O': 2}, dh=9365.469,
+                               comments='Fitted', refcode='fit000')
+        self.assertAlmostEqual(record.molwt, 44.0095, places=3)
+        self.assertAlmostEqual(record.h_formation, -393510.0, places=0)
+        self.assertIsInstance(
+            result.intervals('CO2', thermoinp.Interval)[0],
+            thermoinp.Interval)
+
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'custom.inp')
+        with open(path, 'w') as f:
+            thermoinp.DB.from_records([record]).write(f)
+        db = thermoinp.DB(sources=(thermoinp.SOURCE, path))
+        self.assertEqual(db['CO2'].comments, 'Fitted')
+        self.assertEqual(db['CO2'].intervals[0].dh, 9365.469)
+        overlay = packed.PackedDB.from_db(db)
+        np.testing.assert_allclose(
+            vector.evaluate(overlay, self.T, ['CO2']).H,
+            self.table(names=['CO2'])[1], rtol=1e-7, atol=1e-2)
+
+
+if __name__ == '__main__':
+    unittest.main()
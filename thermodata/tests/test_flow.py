@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from thermodata import packed
+from thermodata.flow import Gas
+from thermodata.thermodata import ChemDB
+
+
+class TestGas(unittest.TestCase):
+    db = ChemDB()
+    db.select(('N2', 'O2', 'Ar', 'CO2'))
+    packed = packed.PackedDB.from_db(db)
+    air = Gas(packed, ('N2', 'O2', 'Ar'), X=(0.7809, 0.2095, 0.0096))
+
+    def test_species(self):
+        """Compare a single species with Thermo."""
+        species = self.db['CO2']
+        gas = Gas.from_species(species)
+        self.assertAlmostEqual(gas.R, species.R, places=9)
+        for T in (300.0, 1500.0):
+            thermo = species.thermo
+            thermo.T = T
+            self.assertAlmostEqual(gas.cp(T), thermo.cp, places=6)
+            self.assertAlmostEqual(gas.gamma(T),
+                                   thermo.cp / (thermo.cp - species.R),
+                                   places=12)
+
+    def test_air(self):
+        self.assertAlmostEqual(self.air.R, 287.07, delta=0.01)
+        self.assertAlmostEqual(float(self.air.gamma(300.0)), 1.400,
+                               delta=1e-3)
+        self.assertAlmostEqual(float(self.air.a(288.15)), 340.3,
+                               delta=0.1)
+
+    def test_shapes(self):
+        T = np.linspace(300.0, 2000.0, 6).reshape(2, 3)
+        self.assertEqual(self.air.gamma(T).shape, (2, 3))
+        T0, ratio = self.air.stagnation(T, [[1.0], [2.0]])
+        self.assertEqual(T0.shape, (2, 3))
+        self.assertEqual(ratio.shape, (2, 3))
+
+    def test_isentropic(self):
+        T1 = np.array([250.0, 300.0, 800.0])
+        T2 = self.air.isentropic_T(T1, 20.0)
+        np.testing.assert_allclose(self.air.s(T2, 20.0), self.air.s(T1),
+                                   rtol=0, atol=1e-8)
+        np.testing.assert_allclose(self.air.pressure_ratio(T1, T2), 20.0)
+        # Variable cp: below the constant gamma (300 K) estimate
+        gamma = self.air.gamma(300.0)
+        self.assertLess(T2[1], 300.0 * 20.0 ** ((gamma - 1) / gamma))
+
+    def test_constant_gamma(self):
+        """Small changes tend to the constant gamma relations."""
+        gamma = self.air.gamma(300.0)
+        T0, ratio = self.air.stagnation(300.0, 0.05)
+        self.assertAlmostEqual(float(T0),
+                               300.0 * (1 + 0.5 * (gamma - 1) * 0.05**2),
+                               places=5)
+        self.assertAlmostEqual(float(ratio),
+                               float((T0 / 300.0) ** (gamma / (gamma - 1))),
+                               places=7)
+
+    def test_stagnation(self):
+        """Energy is conserved; static inverts stagnation."""
+        T = np.array([220.0, 300.0, 1200.0])
+        mach = np.array([0.5, 2.0, 3.0])
+        T0, ratio = self.air.stagnation(T, mach)
+        np.testing.assert_allclose(
+            self.air.h(T0) - self.air.h(T), 0.5 * (mach * self.air.a(T))**2)
+        static, inverse = self.air.static(T0, mach)
+        np.testing.assert_allclose(static, T, rtol=1e-10)
+        np.testing.assert_allclose(inverse * ratio, 1.0, rtol=1e-10)
+
+    def test_undefined(self):
+        self.assertTrue(np.isnan(self.air.gamma(100.0)))
+        T2 = self.air.isentropic_T([100.0, 300.0], 2.0)
+        self.assertTrue(np.isnan(T2[0]))
+        self.assertTrue(np.isfinite(T2[1]))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, Gas, self.packed, ('N2', 'O2'))
+        self.assertRaises(ValueError, Gas, self.packed, ('N2', 'O2'),
+                          X=(1.0,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def run(code, *options):
+    """Run `code` in a fresh interpreter; return (stdout, stderr)."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run([sys.executable] + list(options) + ['-c', code],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, env=env, check=True)
+    return proc.stdout, proc.stderr
+
+
+class TestImport(unittest.TestCase):
+    """Importing thermodata.thermodata is cheap."""
+
+    def test_deferred_modules(self):
+        """The parser and XML modules aren't imported."""
+        out, _ = run(
+            'import sys, thermodata.thermodata\n'
+            'print(" ".join(m for m in ("thermodata.thermoinp", '
+            '"thermodata.poly", "xml.etree.ElementTree") '
+            'if m in sys.modules))'
+        )
+        self.assertEqual(out.strip(), '')
+
+    def test_deferred_constants(self):
+        """The constants XML is parsed on first access only, once."""
+        out, _ = run(
+            'import thermodata.constants as c\n'
+            'print(c._values is None)\n'
+            'c.R, c.M\n'
+            'values = c._values\n'
+            'c.R_CEA\n'
+            'print(c._values is values)'
+        )
+        self.assertEqual(out.split(), ['True', 'True'])
+
+    def test_lazy_thermoinp_attribute(self):
+        """thermoinp remains accessible as a module attribute."""
+        from thermodata import thermodata, thermoinp
+        self.assertIs(thermodata.thermoinp, thermoinp)
+
+
+if __name__ == '__main__':
+    unittest.main()
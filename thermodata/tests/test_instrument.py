@@ -0,0 +1,88 @@
+import unittest
+
+from thermodata import instrument, thermoinp, thermodata
+from thermodata.thermodata import ChemDB
+
+
+class TestInstrument(unittest.TestCase):
+
+    def setUp(self):
+        instrument.reset()
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_disabled_is_unpatched(self):
+        """Disabled instrumentation leaves the original functions."""
+        original = thermoinp.DB.__dict__['_parse_category']
+        dimless = thermodata._dimless_enthalpy
+        instrument.enable()
+        self.assertIsNot(thermoinp.DB.__dict__['_parse_category'],
+                         original)
+        instrument.disable()
+        self.assertIs(thermoinp.DB.__dict__['_parse_category'], original)
+        self.assertIs(thermodata._dimless_enthalpy, dimless)
+        self.assertIsInstance(
+            thermoinp.SpeciesRecord.__dict__['from_dataset'], classmethod
+        )
+
+    def test_enable_twice(self):
+        """Repeated enable doesn't nest wrappers."""
+        original = thermodata.ChemDB.select
+        instrument.enable()
+        instrument.enable()
+        instrument.disable()
+        self.assertIs(thermodata.ChemDB.select, original)
+        self.assertFalse(instrument.is_enabled())
+
+    def test_snapshot(self):
+        """Calls and times are recorded per function."""
+        with instrument.enabled():
+            db = ChemDB()
+            db.select(('CO2',))
+            db['CO2'].thermo.T = 1500.0
+        stats = instrument.snapshot()
+        self.assertEqual(stats['thermoinp._read_categories']['calls'], 1)
+        self.assertEqual(stats['thermoinp.DB._parse_category']['calls'], 2)
+        self.assertEqual(
+            stats['thermoinp.SpeciesRecord.from_dataset']['calls'],
+            len(thermoinp.DB().all)
+        )
+        self.assertEqual(stats['thermodata.ChemDB.select']['calls'], 1)
+        for name in ('Thermo._select_interval',
+                     '_dimless_heat_capacity',
+                     '_dimless_enthalpy',
+                     '_dimless_entropy'):
+            self.assertGreater(stats['thermodata.' + name]['calls'], 0)
+        for s in stats.values():
+            self.assertLessEqual(s['min'], s['max'])
+            self.assertLessEqual(s['max'], s['total'])
+
+        # Nothing is recorded once disabled
+        ChemDB().select(('CO2',))
+        self.assertEqual(instrument.snapshot(), stats)
+
+    def test_callbacks(self):
+        events = []
+        callback = lambda name, elapsed: events.append((name, elapsed))
+        instrument.add_callback(callback)
+        try:
+            with instrument.enabled():
+                thermoinp.DB()
+        finally:
+            instrument.remove_callback(callback)
+        names = [name for name, _ in events]
+        self.assertEqual(names.count('thermoinp._read_categories'), 1)
+        self.assertTrue(all(elapsed >= 0 for _, elapsed in events))
+
+    def test_reset(self):
+        with instrument.enabled():
+            thermoinp.DB()
+        self.assertTrue(instrument.snapshot())
+        instrument.reset()
+        self.assertEqual(instrument.snapshot(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
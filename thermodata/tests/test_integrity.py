@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+
+from thermodata import integrity, packed, thermoinp
+
+
+class TestScan(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def setUp(self):
+        # CO2 (3 intervals) and O2 as a packed database
+        source = packed.PackedDB.from_db(self.db)
+        names = ('CO2', 'O2')
+        self.table = source.table[[source.index(n) for n in names]]
+        self.block = np.concatenate([source.rows(n) for n in names])
+        self.table['start'] = (0, 3)
+
+    def scan(self, **kwargs):
+        return integrity.scan(packed.PackedDB(self.table, self.block),
+                              **kwargs)
+
+    def test_clean(self):
+        report = self.scan()
+        self.assertFalse(report)
+        self.assertEqual(report.ndatasets, 2)
+
+    def test_source_database(self):
+        """Known discontinuities of the NASA Glenn database."""
+        report = integrity.scan(self.db)
+        self.assertEqual(report.ndatasets, len(self.db.all))
+        self.assertIn('ALN(L)', report.species())
+        aln = [(i.check, i.interval, i.T) for i in report.issues
+               if i.name == 'ALN(L)']
+        self.assertEqual(aln, [('Cp', 0, 2700.0), ('H', 0, 2700.0),
+                               ('S', 0, 2700.0)])
+        counts = report.counts()
+        for check in ('order', 'gap', 'overlap', 'formation'):
+            self.assertEqual(counts[check], 0)
+
+    def test_names(self):
+        report = integrity.scan(self.db, names=('ALN(L)', 'CO2'))
+        self.assertEqual(report.ndatasets, 2)
+        self.assertEqual(report.species(), ['ALN(L)'])
+
+    def test_gap(self):
+        self.block[1, 0] = 1010.0
+        issue, = self.scan().issues
+        self.assertEqual(issue, ('CO2', 'gap', 0, 1000.0, 10.0))
+
+    def test_overlap(self):
+        self.block[2, 0] = 5990.0
+        issue, = self.scan().issues
+        self.assertEqual(issue, ('CO2', 'overlap', 1, 6000.0, 10.0))
+
+    def test_order(self):
+        self.block[3, 1] = self.block[3, 0]
+        issues = self.scan().issues
+        # 200-200 K leaves a gap up to 1000 K; H(298.15 K) falls in it
+        self.assertEqual([(i.name, i.check) for i in issues],
+                         [('O2', 'order'), ('O2', 'gap'),
+                          ('O2', 'formation')])
+
+    def test_discontinuity(self):
+        """A jump in a coefficient shows in Cp, H and S."""
+        self.block[1, 4] += 0.1   # a3 of interval 1
+        report = self.scan()
+        self.assertEqual([(i.check, i.interval) for i in report.issues],
+                         [('Cp', 0), ('H', 0), ('S', 0), ('Cp', 1),
+                          ('H', 1), ('S', 1)])
+        self.assertAlmostEqual(report.issues[0].value, 0.1)
+
+    def test_integration_constant(self):
+        """A jump in b1 shows in H only."""
+        self.block[2, 9] += 100.0
+        issue, = self.scan().issues
+        self.assertEqual(issue.check, 'H')
+        self.assertAlmostEqual(issue.value, 100.0 / 6000.0, places=5)
+
+    def test_formation(self):
+        self.table['h_formation'][0] += 10.0
+        issue, = self.scan().issues
+        self.assertEqual(issue[:4], ('CO2', 'formation', 0, 298.15))
+        self.assertAlmostEqual(issue.value, -10.0, places=3)
+        self.assertFalse(self.scan(formation_tol=20.0))
+
+    def test_formatted(self):
+        self.block[1, 0] = 1010.0
+        lines = self.scan().formatted().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2].split(),
+                         ['CO2', 'gap', '0', '1000.0', '1.000e+01'])
+
+
+if __name__ == '__main__':
+    unittest.main()
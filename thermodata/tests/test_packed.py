@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from thermodata import packed, thermoinp
+from thermodata.thermodata import ChemDB
+
+
+class TestExport(unittest.TestCase):
+    chemdb = ChemDB()
+    chemdb.select(('N2', 'CO2', 'Air', 'KCL', 'CH4(L)'))
+
+    def setUp(self):
+        self.coefficients = self.chemdb.export()
+
+    def test_layout(self):
+        c = self.coefficients
+        self.assertEqual(c.names, ['N2', 'CO2', 'Air', 'KCL', 'CH4(L)'])
+        self.assertEqual(c.index['CO2'], 1)
+        self.assertEqual(c.offsets.dtype, np.dtype('<i8'))
+        self.assertEqual(c.offsets[-1], len(c.bounds))
+        for name, shape in (('bounds', 2), ('coeffs', 7), ('consts', 2)):
+            array = getattr(c, name)
+            self.assertEqual(array.dtype, np.dtype('<f8'))
+            self.assertEqual(array.shape, (c.offsets[-1], shape))
+            self.assertTrue(array.flags['C_CONTIGUOUS'])
+            self.assertEqual(memoryview(array).format, 'd')
+
+    def test_values(self):
+        """The rows of each species are those of its intervals."""
+        c = self.coefficients
+        for i, name in enumerate(c.names):
+            thermo = self.chemdb[name].thermo
+            intervals = thermo.intervals if thermo is not None else []
+            rows = slice(c.offsets[i], c.offsets[i + 1])
+            self.assertEqual(c.bounds[rows].tolist(),
+                             [list(x.bounds) for x in intervals])
+            self.assertEqual(c.coeffs[rows].tolist(),
+                             [list(x.coeffs) for x in intervals])
+            self.assertEqual(c.consts[rows].tolist(),
+                             [list(x.integration_consts)
+                              for x in intervals])
+            self.assertEqual(c.molwt[i], self.chemdb[name].Mr)
+        # Reactant without intervals
+        i = c.index['CH4(L)']
+        self.assertEqual(c.offsets[i], c.offsets[i + 1])
+
+    def test_names(self):
+        db = packed.PackedDB.from_db(thermoinp.DB())
+        c = packed.export(db, ['O2', 'H2O'])
+        self.assertEqual(c.index, {'O2': 0, 'H2O': 1})
+        np.testing.assert_array_equal(c.coeffs[c.offsets[1]:],
+                                      db.rows('H2O')[:, 2:9])
+        self.assertEqual(len(packed.export(db)), len(db))
+        self.assertRaises(KeyError, packed.export, db, ['Unobtainium'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import concurrent.futures
+
+import numpy as np
+
+from thermodata import packed, parallel, thermoinp, vector
+from thermodata.flow import Gas
+from thermodata.shared import SharedDB
+
+
+class TestParallel(unittest.TestCase):
+    db = packed.PackedDB.from_db(thermoinp.DB())
+    names = ('N2', 'O2', 'H2O', 'CO2', 'AL(cr)')
+    T = np.linspace(150.0, 7000.0, 1001)
+
+    def assertSame(self, result, expected):
+        for prop in ('interval', 'Cp', 'H', 'S', 'dCp'):
+            np.testing.assert_array_equal(getattr(result, prop),
+                                          getattr(expected, prop))
+
+    def test_threads(self):
+        """Results are those of a single call."""
+        expected = vector.evaluate(self.db, self.T, self.names,
+                                   derivatives=True)
+        for chunksize in (1, 97, 100000):
+            result = parallel.evaluate(self.db, self.T, self.names,
+                                       derivatives=True, max_workers=3,
+                                       chunksize=chunksize)
+            self.assertEqual(result.names, list(self.names))
+            self.assertSame(result, expected)
+
+    def test_processes(self):
+        expected = vector.evaluate(self.db, self.T, self.names,
+                                   derivatives=True)
+        result = parallel.evaluate(self.db, self.T, self.names,
+                                   derivatives=True, max_workers=2,
+                                   processes=True, chunksize=500)
+        self.assertSame(result, expected)
+
+    def test_executor(self):
+        expected = vector.evaluate_pairs(self.db, 10, self.T,
+                                         extrapolate=True)
+        with SharedDB.publish(self.db) as db, \
+                concurrent.futures.ProcessPoolExecutor(2) as pool:
+            for i in range(2):
+                result = parallel.evaluate_pairs(db, 10, self.T,
+                                                 extrapolate=True,
+                                                 chunksize=300,
+                                                 executor=pool)
+                for values, expect in zip(result, expected):
+                    np.testing.assert_array_equal(values, expect)
+
+    def test_apply(self):
+        air = Gas(self.db, ('N2', 'O2', 'Ar'), X=(0.7809, 0.2095, 0.0096))
+        T, mach = np.meshgrid(np.linspace(200.0, 1000.0, 20),
+                              np.linspace(0.1, 3.0, 15))
+        expected = air.stagnation(T, mach)
+        result = parallel.apply(air.stagnation, T, mach, max_workers=2,
+                                chunksize=16)
+        self.assertEqual(result[0].shape, (15, 20))
+        for values, expect in zip(result, expected):
+            np.testing.assert_array_equal(values, expect)
+        np.testing.assert_array_equal(
+            parallel.apply(air.gamma, T, chunksize=7), air.gamma(T))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from thermodata import packed, thermoinp, vector
+from thermodata.phases import Phases
+
+
+class TestPhases(unittest.TestCase):
+    db = thermoinp.DB()
+    phases = Phases(db)
+
+    def test_groups(self):
+        self.assertIn('AL', self.phases)
+        self.assertEqual(self.phases.species('AL(L)'), 'AL')
+        self.assertEqual(self.phases.species('Fe(CO)5(L)'), 'Fe(CO)5')
+        names = self.phases.packed.names
+        self.assertEqual([names[i] for i in self.phases.datasets['Fe']],
+                         ['Fe(a)', 'Fe(a)', 'Fe(c)', 'Fe(d)', 'Fe(L)'])
+        # Isomers aren't phases of one another
+        self.assertNotEqual(self.phases.species('C8H18(L),n-octa'),
+                            self.phases.species('C8H18(L),isooct'))
+        self.assertNotIn('CO2', self.phases)
+        self.assertRaises(KeyError, self.phases.species, 'CO2')
+
+    def test_transitions(self):
+        T = [300.0, 1050.0, 1200.0, 1700.0, 2000.0]
+        result = self.phases.evaluate(['Fe'], T)
+        np.testing.assert_array_equal(
+            result.phase[0], ['Fe(a)', 'Fe(a)', 'Fe(c)', 'Fe(d)', 'Fe(L)'])
+        result = self.phases.evaluate(['AL2O3', 'S'], [2000.0, 2400.0])
+        np.testing.assert_array_equal(result.phase,
+                                      [['AL2O3(a)', 'AL2O3(L)'],
+                                       ['S(L)', 'S(L)']])
+
+    def test_minimum_gibbs(self):
+        """Where datasets overlap, the phase of lower G is taken."""
+        T = np.linspace(900.0, 990.0, 7)
+        result = self.phases.evaluate(['SrCL2'], T)
+        names = ['SrCL2(a)', 'SrCL2(b)']
+        db = packed.PackedDB.from_db(self.db.subset(names))
+        expected = vector.evaluate(db, T, names)
+        G = expected.H - T * expected.S
+        np.testing.assert_array_equal(result.phase[0],
+                                      np.array(names)[np.argmin(G, 0)])
+        np.testing.assert_allclose(result.G[0], G.min(axis=0))
+        self.assertEqual(len(set(result.phase[0])), 2)
+
+    def test_values(self):
+        """Compare with the datasets."""
+        T = np.array([300.0, 1000.0])
+        result = self.phases.evaluate(['AL'], T, derivatives=True)
+        db = packed.PackedDB.from_db(self.db.subset(['AL(cr)', 'AL(L)']))
+        expected = vector.evaluate(db, T, ['AL(cr)', 'AL(L)'],
+                                   derivatives=True)
+        for prop in ('Cp', 'H', 'S', 'dCp'):
+            np.testing.assert_array_equal(
+                getattr(result, prop)[0],
+                np.diag(getattr(expected, prop)))
+        np.testing.assert_array_equal(result.interval, [[0, 0]])
+
+    def test_undefined(self):
+        result = self.phases.evaluate(['AL', 'H2O'], [100.0, 1000.0])
+        self.assertIsNone(result.phase[0, 0])
+        self.assertIsNone(result.phase[1, 1])
+        self.assertTrue(np.isnan(result.Cp[0, 0]))
+        self.assertEqual(result.interval[0, 0], -1)
+        self.assertEqual(result.phase[0, 1], 'AL(L)')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+
+import numpy as np
+
+from thermodata import constants, packed, thermoinp
+from thermodata.reaction import parse, ReactionSet
+from thermodata.thermodata import ChemDB
+
+
+class TestParse(unittest.TestCase):
+
+    def test_coefficients(self):
+        self.assertEqual(dict(parse('CH4 + 2 O2 => CO2 + 2H2O')),
+                         {'CH4': -1.0, 'O2': -2.0, 'CO2': 1.0,
+                          'H2O': 2.0})
+        self.assertEqual(dict(parse('H2 + .5*O2 = H2O')),
+                         {'H2': -1.0, 'O2': -0.5, 'H2O': 1.0})
+
+    def test_order(self):
+        self.assertEqual(list(parse('CO + H2O <=> CO2 + H2')),
+                         ['CO', 'H2O', 'CO2', 'H2'])
+
+    def test_ions(self):
+        """'+' within names isn't a separator."""
+        self.assertEqual(dict(parse('AL+ + e- -> AL')),
+                         {'AL+': -1.0, 'e-': -1.0, 'AL': 1.0})
+
+    def test_netted(self):
+        self.assertEqual(dict(parse('N2 + 2 O = N2 + O2')),
+                         {'N2': 0.0, 'O': -2.0, 'O2': 1.0})
+
+    def test_invalid(self):
+        for equation in ('H2 + O2', 'H2 = O2 = H2O', 'H2 + = H2O',
+                         '2 = H2O'):
+            self.assertRaises(ValueError, parse, equation)
+
+
+class TestReactionSet(unittest.TestCase):
+    db = ChemDB()
+    db.select(('H2', 'O2', 'H2O', 'CO', 'CO2', 'O', 'N2', 'NO'))
+    equations = ['H2 + 0.5 O2 = H2O',
+                 'CO + H2O <=> CO2 + H2',
+                 'O2 = 2 O',
+                 'N2 + O2 = 2 NO']
+    T = np.array([298.15, 1000.0, 2000.0, 3000.0])
+
+    def setUp(self):
+        self.reactions = ReactionSet(self.db, self.equations)
+
+    def test_matrix(self):
+        self.assertEqual(self.reactions.species,
+                         ['H2', 'O2', 'H2O', 'CO', 'CO2', 'O', 'N2',
+                          'NO'])
+        self.assertEqual(len(self.reactions), 4)
+        np.testing.assert_array_equal(
+            self.reactions.matrix[0], [-1, -0.5, 1, 0, 0, 0, 0, 0])
+        np.testing.assert_array_equal(
+            self.reactions.matrix[3], [0, -1, 0, 0, 0, 0, -1, 2])
+
+    def test_thermo(self):
+        """Compare with manual stoichiometry over Thermo."""
+        result = self.reactions.evaluate(self.T)
+        self.assertEqual(result.logK.shape, (4, 4))
+        for i, coefficients in enumerate(map(parse, self.equations)):
+            for j, T in enumerate(self.T):
+                dH = dS = 0.0
+                for name, value in coefficients.items():
+                    thermo = self.db[name].thermo
+                    thermo.T = T
+                    dH += value * thermo.H
+                    dS += value * thermo.S
+                dG = dH - T * dS
+                self.assertAlmostEqual(result.dH[i, j], dH, places=6)
+                self.assertAlmostEqual(result.dS[i, j], dS, places=9)
+                self.assertAlmostEqual(result.dG[i, j], dG, places=6)
+                self.assertAlmostEqual(
+                    result.logK[i, j],
+                    -dG / (constants.R_CEA * T * np.log(10.0)),
+                    places=9)
+
+    def test_reference_values(self):
+        """Formation of water vapour; JANAF log Kf = 40.048 at 298.15
+        K and 10.062 at 1000 K."""
+        result = self.reactions.evaluate(self.T)
+        self.assertAlmostEqual(result.logK[0, 0], 40.048, delta=5e-3)
+        self.assertAlmostEqual(result.logK[0, 1], 10.062, delta=5e-3)
+        self.assertAlmostEqual(result.dH[0, 0] / 1000.0, -241.826,
+                               delta=1e-2)
+
+    def test_gibbs(self):
+        G_RT = self.reactions.gibbs(self.T)
+        result = self.reactions.evaluate(self.T)
+        np.testing.assert_array_equal(G_RT, result.G_RT)
+        np.testing.assert_allclose(
+            self.reactions.matrix @ G_RT,
+            result.dG / (constants.R_CEA * self.T))
+
+    def test_mappings(self):
+        reactions = ReactionSet(self.db, [{'O2': -1, 'O': 2},
+                                          {'H2': -1, 'O2': -0.5,
+                                           'H2O': 1}])
+        self.assertEqual(reactions.equations,
+                         ['O2 = 2 O', 'H2 + 0.5 O2 = H2O'])
+        np.testing.assert_allclose(
+            reactions.evaluate(self.T).logK,
+            self.reactions.evaluate(self.T).logK[[2, 0]])
+
+    def test_sources(self):
+        """thermoinp.DB and PackedDB give the same results."""
+        expected = self.reactions.evaluate(self.T).logK
+        db = thermoinp.DB()
+        for source in (db, packed.PackedDB.from_db(db)):
+            reactions = ReactionSet(source, self.equations)
+            np.testing.assert_allclose(reactions.evaluate(self.T).logK,
+                                       expected)
+
+    def test_missing(self):
+        self.assertRaises(KeyError, ReactionSet, self.db,
+                          ['CH4 + 2 O2 = CO2 + 2 H2O'])
+
+    def test_undefined(self):
+        result = self.reactions.evaluate([100.0, 1000.0])
+        self.assertTrue(np.isnan(result.logK[:, 0]).all())
+        self.assertTrue(np.isfinite(result.logK[:, 1]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
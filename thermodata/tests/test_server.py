@@ -0,0 +1,147 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import packed, thermoinp, vector
+from thermodata.server import Server, Client
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    db = packed.PackedDB.from_db(
+        thermoinp.DB().subset(['CO2', 'H2O', 'N2', 'O2']))
+
+    async def asyncSetUp(self):
+        self.server = await Server(self.db, window=0.01).start()
+        self.client = await Client.connect(port=self.server.address[1])
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_properties(self):
+        T = [100.0, 300.0, 1000.0]
+        response = await self.client.properties(['CO2', 'N2'], T)
+        expected = vector.evaluate(self.db, T, ['CO2', 'N2'])
+        result = response['result']
+        for prop in ('Cp', 'H', 'S'):
+            values = np.array(result[prop], dtype=float)
+            np.testing.assert_array_equal(values, getattr(expected, prop))
+        # Undefined values are null
+        self.assertIsNone(result['Cp'][0][0])
+        latency = response['latency']
+        self.assertEqual(latency['batch'], 1)
+        self.assertGreaterEqual(latency['total'], latency['queued'])
+
+    async def test_batching(self):
+        """Concurrent requests are evaluated together."""
+        T = np.linspace(300.0, 3000.0, 20)
+        responses = await asyncio.gather(
+            *[self.client.properties(['O2'], [t]) for t in T])
+        self.assertEqual([r['latency']['batch'] for r in responses],
+                         [len(T)] * len(T))
+        expected = vector.evaluate(self.db, T, ['O2'])
+        np.testing.assert_array_equal(
+            [r['result']['Cp'][0][0] for r in responses], expected.Cp[0])
+
+    async def test_temperature(self):
+        T = np.array([[400.5, 1500.5], [2500.5, 350.5]])
+        index = vector.species_index(self.db, ['N2', 'O2'])[:, None]
+        values = vector.evaluate_pairs(self.db, index, T)
+        for prop, i in (('H', 2), ('S', 3)):
+            response = await self.client.temperature(
+                ['N2', 'O2'], **{prop: values[i].tolist()})
+            np.testing.assert_allclose(
+                np.array(response['result']['T'], dtype=float), T,
+                rtol=1e-8)
+        response = await self.client.temperature('N2', H=0.0)
+        self.assertAlmostEqual(response['result']['T'], 298.15, 5)
+
+    async def test_errors(self):
+        with self.assertRaisesRegex(ValueError, 'Not in database'):
+            await self.client.properties(['XX'], [300.0])
+        with self.assertRaisesRegex(ValueError, 'Unknown operation'):
+            await self.client.request('sum')
+        with self.assertRaisesRegex(ValueError, 'One of H or S'):
+            await self.client.request('temperature', species='N2')
+        with self.assertRaisesRegex(ValueError, 'match the species'):
+            await self.client.temperature(['N2', 'O2'], H=[0.0] * 3)
+        # The connection is still served
+        response = await self.client.properties('N2', [300.0])
+        self.assertIn('result', response)
+
+    async def test_species_type(self):
+        with self.assertRaisesRegex(ValueError, 'list of names'):
+            await self.client.request('properties', species=[1], T=[300.0])
+        response = await self.client.properties('N2', [300.0])
+        self.assertIn('result', response)
+
+    async def test_large(self):
+        """Requests and responses beyond the default stream limit."""
+        T = np.linspace(200.0, 6000.0, 5000)
+        response = await self.client.properties(['CO2', 'N2'], T)
+        expected = vector.evaluate(self.db, T, ['CO2', 'N2'])
+        np.testing.assert_array_equal(
+            np.array(response['result']['H'], dtype=float), expected.H)
+
+    async def test_limit(self):
+        """Lines over the limit are answered with an error."""
+        server = await Server(self.db, limit=1000).start()
+        reader, writer = await asyncio.open_connection(
+            *server.address)
+        try:
+            for ident, T in ((1, [300.0] * 500), (2, [300.0])):
+                writer.write(json.dumps({'id': ident, 'op': 'properties',
+                                         'species': 'N2',
+                                         'T': T}).encode() + b'\n')
+            error = json.loads(await reader.readline())
+            self.assertEqual(error['error'], 'Line longer than the limit')
+            response = json.loads(await reader.readline())
+            self.assertEqual(response['id'], 2)
+            self.assertIn('result', response)
+        finally:
+            writer.close()
+            await server.close()
+
+    async def test_isolation(self):
+        """A failing request doesn't fail the others of its batch."""
+        class Failing(Server):
+            def evaluate(self, requests):
+                if any(r.id == 0 for r in requests):
+                    raise RuntimeError("failed")
+                return super().evaluate(requests)
+
+        server = await Failing(self.db, window=0.05).start()
+        client = await Client.connect(port=server.address[1])
+        try:
+            responses = await asyncio.gather(
+                client.properties(['N2'], [300.0]),
+                client.properties(['O2'], [300.0]),
+                return_exceptions=True)
+            self.assertIsInstance(responses[0], ValueError)
+            self.assertIn('result', responses[1])
+            self.assertEqual(responses[1]['latency']['batch'], 2)
+        finally:
+            await client.close()
+            await server.close()
+
+    async def test_unix(self):
+        path = os.path.join(tempfile.mkdtemp(), 'thermodata.sock')
+        server = await Server(self.db).start(path=path)
+        client = await Client.connect(path=path)
+        try:
+            response = await client.properties(['H2O'], [500.0])
+            self.assertAlmostEqual(response['result']['Cp'][0][0],
+                                   vector.evaluate(self.db, [500.0],
+                                                   ['H2O']).Cp[0, 0])
+        finally:
+            await client.close()
+            await server.close()
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import sys
+import pickle
+import unittest
+import subprocess
+import concurrent.futures
+
+import numpy as np
+
+from thermodata import packed, thermoinp, vector
+from thermodata.shared import SharedChemDB, SharedDB, attach
+from thermodata.thermodata import ChemDB
+
+
+def _evaluate(db, name):
+    # Evaluated in a worker process
+    return vector.evaluate(db, [300.0, 1000.0], [name]).Cp
+
+
+class TestSharedDB(unittest.TestCase):
+    source = packed.PackedDB.from_db(thermoinp.DB())
+
+    def setUp(self):
+        self.db = SharedDB.publish(self.source)
+
+    def tearDown(self):
+        self.db.unlink()
+
+    def test_arrays(self):
+        self.assertEqual(self.db.table.tobytes(),
+                         self.source.table.tobytes())
+        np.testing.assert_array_equal(self.db.block, self.source.block)
+        self.assertFalse(self.db.block.flags['WRITEABLE'])
+        self.assertEqual(self.db['CO2'].name, 'CO2')
+
+    def test_attach(self):
+        view = attach(self.db.name)
+        self.assertIs(attach(self.db.name), view)
+        self.assertIs(pickle.loads(pickle.dumps(self.db)), view)
+        np.testing.assert_array_equal(view.block, self.source.block)
+        self.assertRaises(ValueError, view.unlink)
+        view.close()
+        self.assertIsNot(attach(self.db.name), view)
+        attach(self.db.name).close()
+
+    def test_processes(self):
+        """Workers attach by name."""
+        expected = _evaluate(self.source, 'CO2')
+        with concurrent.futures.ProcessPoolExecutor(2) as pool:
+            for Cp in pool.map(_evaluate, [self.db] * 2, ['CO2'] * 2):
+                np.testing.assert_array_equal(Cp, expected)
+
+    def test_unlink(self):
+        with SharedDB.publish(thermoinp.DB()) as db:
+            name = db.name
+        self.assertRaises(FileNotFoundError, SharedDB, name)
+
+    def test_other_process(self):
+        """The block outlives processes (not children) attaching it."""
+        script = ('from thermodata.shared import SharedChemDB;'
+                  'db = SharedChemDB({!r}); db.select(("CO2",));'
+                  'print(db["CO2"].Mr)').format(self.db.name)
+        output = subprocess.check_output([sys.executable, '-c', script],
+                                         universal_newlines=True)
+        self.assertAlmostEqual(float(output), 44.0095, places=4)
+        attach(self.db.name).close()
+
+
+class TestSharedChemDB(unittest.TestCase):
+    source = ChemDB()
+
+    @classmethod
+    def setUpClass(cls):
+        cls.shared = SharedDB.publish(thermoinp.DB())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.shared.unlink()
+
+    def setUp(self):
+        self.db = SharedChemDB(self.shared.name)
+
+    def test_select(self):
+        self.assertEqual(self.db, {})
+        self.db.select(('CO2', 'Air'))
+        self.assertEqual(sorted(self.db), ['Air', 'CO2'])
+        self.assertRaises(Exception, self.db.select, ('Adamantium',))
+        self.db.select()
+        self.assertEqual(len(self.db), len(self.source._source_dict))
+
+    def test_species(self):
+        """Species are those of ChemDB."""
+        self.db.select(('CO2', 'AL(cr)'))
+        self.source.select(('CO2', 'AL(cr)'))
+        for name in ('CO2', 'AL(cr)'):
+            species, expected = self.db[name], self.source[name]
+            self.assertEqual(species.Mr, expected.Mr)
+            self.assertEqual(species.phase, expected.phase)
+            species.thermo.T = expected.thermo.T = 500.0
+            self.assertEqual(species.thermo.Cp, expected.thermo.Cp)
+            self.assertEqual(species.thermo.S, expected.thermo.S)
+
+    def test_binary(self):
+        """Views of other packed databases."""
+        db = SharedChemDB(packed.PackedDB.from_db(thermoinp.DB()))
+        db.select('CO2')
+        self.assertEqual(db['CO2'].name, 'CO2')
+
+
+if __name__ == '__main__':
+    unittest.main()
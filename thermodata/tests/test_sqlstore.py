@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from thermodata import poly, sqlstore, thermoinp
+
+
+class TestSQLiteDB(unittest.TestCase):
+    """An exported store answers queries as thermoinp.DB does."""
+    source = thermoinp.DB()
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmpdir, 'thermo.sqlite')
+        sqlstore.export(cls.source, cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.db = sqlstore.SQLiteDB(self.path, cache_size=4)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_len(self):
+        self.assertEqual(len(self.db), len(self.source._dict))
+
+    def test_key_query(self):
+        """Hydrated records equal the parsed records."""
+        for name in ('H2', 'Ag(cr)', 'Air', 'B2H6(L)'):
+            self.assertEqual(self.db[name], self.source[name])
+            self.assertEqual(self.db[name].formatted,
+                             self.source[name].formatted)
+            self.assertEqual(self.db[name].isproduct,
+                             self.source[name].isproduct)
+
+    def test_key_query_missing(self):
+        self.assertRaises(KeyError, self.db.__getitem__, 'Adamantium')
+        self.assertNotIn('Adamantium', self.db)
+
+    def test_path_quoted(self):
+        """Paths with URI delimiters open the file they name."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'thermo 100%?x=1#2.sqlite')
+        shutil.copy(self.path, path)
+        db = sqlstore.SQLiteDB(path)
+        self.addCleanup(db.close)
+        self.assertEqual(len(db), len(self.source._dict))
+        # Relative paths too
+        cwd = os.getcwd()
+        os.chdir(tmpdir)
+        self.addCleanup(os.chdir, cwd)
+        db = sqlstore.SQLiteDB(os.path.basename(path))
+        self.addCleanup(db.close)
+        self.assertEqual(db['H2'], self.source['H2'])
+
+    def test_polytype(self):
+        db = sqlstore.SQLiteDB(self.path, polytype='ml')
+        self.assertIsInstance(db['Air'].intervals[0], poly.NASAPolyML)
+        db.close()
+
+    def test_cache_is_bounded(self):
+        """The LRU cache retains at most cache_size records."""
+        for name in ('H2', 'N2', 'O2', 'Ar', 'CO2', 'Air'):
+            self.db[name]
+        self.assertEqual(list(self.db._cache),
+                         ['O2', 'Ar', 'CO2', 'Air'])
+        self.assertIs(self.db['Air'], self.db['Air'])
+
+    def test_lookup(self):
+        """Lookup matches thermoinp.DB.lookup."""
+        for string in ('H2', '.*H2', '^H2$', 'Jet-A(g)', 'i am a fish'):
+            self.assertEqual(
+                [s.name for s in self.db.lookup(string)],
+                [s.name for s in self.source.lookup(string)]
+            )
+
+    def test_subset_format(self):
+        """Subsets format identically to thermoinp.DB subsets."""
+        species = ('C3H8$', 'Air$', 'Jet-A(L)$', 'O2$')
+        self.assertEqual(self.db.subset(species).format(),
+                         self.source.subset(species).format())
+
+    def test_subset_filt(self):
+        subset = self.db.subset(filt=lambda s: s.name == 'H2')
+        self.assertIsInstance(subset, thermoinp.DB)
+        self.assertEqual(list(subset._dict), ['H2'])
+
+    def test_query(self):
+        """Indexed queries on phase, elements and molecular weight."""
+        names = [s.name for s in self.db.query(elements=('C', 'H'),
+                                                phase=0,
+                                                molwt=(10, 20))]
+        self.assertEqual(names, ['CH', 'CH+', 'CH2', 'CH3', 'CH4'])
+
+
+class TestLiteralPrefix(unittest.TestCase):
+
+    def test_prefix(self):
+        self.assertEqual(sqlstore._literal_prefix('H2'), 'H2')
+        self.assertEqual(sqlstore._literal_prefix('^H2$'), 'H2')
+        self.assertEqual(sqlstore._literal_prefix(r'Jet-A\(g\)'),
+                         'Jet-A(g)')
+        self.assertEqual(sqlstore._literal_prefix('CH3*'), 'CH')
+        self.assertEqual(sqlstore._literal_prefix('.*H2'), '')
+        self.assertEqual(sqlstore._literal_prefix('H2|O2'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+
+from thermodata import constants, packed, thermoinp, vector
+from thermodata.surrogate import Surrogate
+
+
+class TestSurrogate(unittest.TestCase):
+    """Compare surrogates with the vectorised engine."""
+    packed = packed.PackedDB.from_db(thermoinp.DB())
+    names = ('N2', 'O2', 'H2O', 'CO2', 'AL(cr)', 'AL(L)', 'ALN(L)')
+    surrogate = Surrogate.fit(packed, names, (250.0, 3000.0))
+
+    def assertWithin(self, T, names, tol):
+        # Errors of the dimensionless functions within tol
+        exact = vector.evaluate(self.packed, T, names)
+        approx = self.surrogate.evaluate(T, names)
+        R = constants.R_CEA
+        defined = ~np.isnan(exact.Cp)
+        np.testing.assert_array_equal(np.isnan(approx.Cp), ~defined)
+        for e, a, scale in ((exact.Cp, approx.Cp, R),
+                            (exact.H, approx.H, R * T),
+                            (exact.S, approx.S, R)):
+            error = np.abs(e - a)[defined] / np.broadcast_to(
+                scale, e.shape)[defined]
+            self.assertLessEqual(error.max(), tol)
+
+    def test_error_bound(self):
+        T = np.random.RandomState(0).uniform(250.0, 3000.0, 20000)
+        self.assertWithin(T, self.names, self.surrogate.tol)
+
+    def test_bounds(self):
+        # Interval bounds, either side and the ends of the range
+        T = np.array([250.0, 933.61, 933.62, 999.99, 1000.0, 1000.01,
+                      2700.0, 2999.99, 3000.0])
+        self.assertWithin(T, self.names, self.surrogate.tol)
+
+    def test_shared_bound(self):
+        # ALN(L) is discontinuous at 2700 K; the lower segment applies
+        # at the bound, as Thermo.
+        exact = vector.evaluate(self.packed, [2700.0], ['ALN(L)'])
+        approx = self.surrogate.evaluate([2700.0], ['ALN(L)'])
+        self.assertAlmostEqual(approx.Cp[0, 0], exact.Cp[0, 0], places=4)
+
+    def test_segments(self):
+        i = self.surrogate.index('N2')
+        offsets = self.surrogate.offsets
+        edges = self.surrogate.edges[offsets[i]:offsets[i + 1]]
+        self.assertEqual(edges[0, 0], 250.0)
+        self.assertEqual(edges[-1, 1], 3000.0)
+        np.testing.assert_array_equal(edges[1:, 0], edges[:-1, 1])
+        # Segments don't straddle interval bounds
+        self.assertIn(1000.0, edges[:, 0])
+
+        T = np.linspace(250.0, 3000.0, 1001)
+        segment, Cp, H, S = self.surrogate.evaluate_pairs(i, T)
+        self.assertTrue((edges[segment, 0] <= T).all())
+        self.assertTrue((T <= edges[segment, 1]).all())
+        segment = self.surrogate.evaluate_pairs(i, 1000.0)[0]
+        self.assertEqual(edges[segment, 1], 1000.0)
+
+    def test_out_of_range(self):
+        result = self.surrogate.evaluate([200.0, 3000.5, np.nan],
+                                         ['N2', 'AL(L)'])
+        self.assertTrue(np.isnan(result.Cp).all())
+        self.assertTrue((result.interval == -1).all())
+        # AL(L) is defined from 933.61 K
+        result = self.surrogate.evaluate([500.0], ['AL(L)'])
+        self.assertTrue(np.isnan(result.H[0, 0]))
+
+    def test_no_segments(self):
+        surrogate = Surrogate.fit(self.packed, ['AL(cr)', 'N2'],
+                                  (4000.0, 5000.0))
+        result = surrogate.evaluate([4500.0])
+        self.assertTrue(np.isnan(result.Cp[0, 0]))
+        self.assertFalse(np.isnan(result.Cp[1, 0]))
+        self.assertRaises(ValueError, surrogate.thermo, 'AL(cr)')
+
+    def test_degree(self):
+        surrogate = Surrogate.fit(self.packed, ['CO2'], (300.0, 2500.0),
+                                  tol=1e-4, degree=5)
+        self.assertEqual(surrogate.coeffs.shape[1:], (3, 6))
+        self.assertLess(len(surrogate.edges), len(self.surrogate.edges))
+        T = np.linspace(300.0, 2500.0, 1001)
+        exact = vector.evaluate(self.packed, T, ['CO2'])
+        approx = surrogate.evaluate(T)
+        self.assertLessEqual(
+            np.abs(exact.Cp - approx.Cp).max() / constants.R_CEA, 1e-4)
+
+    def test_unattainable(self):
+        self.assertRaises(ValueError, Surrogate.fit, self.packed, ['N2'],
+                          (300.0, 1000.0), tol=1e-17)
+
+    def test_thermo(self):
+        thermo = self.surrogate.thermo('N2', R=296.8)
+        exact = vector.evaluate(self.packed, [1234.5], ['N2'])
+        thermo.T = 1234.5
+        self.assertEqual(thermo.T, 1234.5)
+        approx = self.surrogate.evaluate([1234.5], ['N2'])
+        self.assertAlmostEqual(thermo.Cp, approx.Cp[0, 0], places=9)
+        self.assertAlmostEqual(thermo.H, approx.H[0, 0], places=6)
+        self.assertAlmostEqual(thermo.S, approx.S[0, 0], places=9)
+        self.assertAlmostEqual(thermo.cp, 296.8 * thermo.Cp
+                               / constants.R_CEA)
+        self.assertAlmostEqual(thermo.H, exact.H[0, 0], places=2)
+        for T in (1000.0, 250.0, 3000.0):
+            thermo.T = T
+            self.assertAlmostEqual(
+                thermo.Cp,
+                vector.evaluate(self.packed, [T], ['N2']).Cp[0, 0],
+                places=4)
+        self.assertRaises(ValueError, setattr, thermo, 'T', 3000.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -142,6 +142,32 @@ class TestThermo(unittest.TestCase):
         self.assertAlmostEqual(self.thermo.S, 4.344e2, delta=1e-1)
         self.assertAlmostEqual(self.thermo.s, 9.851e3, delta=1)
 
+    def test_superbound_T(self):
+        """Tests no values are kept from a previous temperature."""
+        self.thermo.T = 1100.
+        self.thermo.T = 30000.
+        self.assertEqual(self.thermo.T, 30000.)
+        self.assertIsNone(self.thermo.interval)
+        for name in ('Cp', 'cp', 'H', 'h', 'S', 's'):
+            with self.assertRaises(TypeError):
+                getattr(self.thermo, name)
+
+    def test_derivatives(self):
+        """Tests dCp against central differences."""
+        for T in (350.0, 1100.0):
+            dT = 1e-3
+            self.thermo.T = T + dT
+            upper = self.thermo.Cp, self.thermo.cp
+            self.thermo.T = T - dT
+            lower = self.thermo.Cp, self.thermo.cp
+            self.thermo.T = T
+            self.assertAlmostEqual(self.thermo.dCp,
+                                   (upper[0] - lower[0]) / (2 * dT),
+                                   places=6)
+            self.assertAlmostEqual(self.thermo.dcp,
+                                   (upper[1] - lower[1]) / (2 * dT),
+                                   places=4)
+
 
 class TestTable(unittest.TestCase):
     """Tests a range of species properties in tabular form."""
@@ -315,6 +341,50 @@ class TestChemDB(unittest.TestCase):
         self.assertEqual(self.db['KCL'], potassium_chloride)
         self.assertEqual(self.db['Ag(cr)'], silver_cryst)
 
+    def test_intervals_match_source(self):
+        """Shared interval values are equal to the source values."""
+        from math import copysign
+        for record in thermoinp.DB()._dict.values():
+            species = self.db._source_dict[record.name]
+            if species.thermo is None:
+                continue
+            for interval, source in zip(species.thermo.intervals,
+                                        record.intervals):
+                values = interval.bounds + interval.coeffs + \
+                    interval.integration_consts
+                expected = source.lim + source.a + source.b
+                self.assertEqual(values, expected)
+                self.assertEqual([copysign(1, v) for v in values],
+                                 [copysign(1, v) for v in expected])
+
+    def test_no_instance_dict(self):
+        """Species, Thermo and Interval instances have no __dict__."""
+        species = self.db._source_dict['CO2']
+        for obj in (species, species.thermo, species.thermo.interval):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_memory_report(self):
+        """Memory is reported per species and per structure."""
+        self.db.select(('CO2', 'KCL', 'Ag(cr)'))
+        report = self.db.memory_report()
+        self.assertEqual(report['species'], 3)
+        self.assertEqual(set(report['structures']),
+                         {'Species', 'Thermo', 'Interval'})
+        self.assertEqual(set(report['by_species']), set(self.db))
+        self.assertEqual(report['total'],
+                         sum(report['structures'].values()))
+        self.assertEqual(report['total'],
+                         sum(report['by_species'].values()))
+        self.assertTrue(all(size > 0 for size in
+                            report['structures'].values()))
+        self.assertAlmostEqual(report['per_species'],
+                               report['total'] / 3)
+
+    def test_memory_report_empty(self):
+        report = ChemDB.__new__(ChemDB).memory_report()
+        self.assertEqual(report['total'], 0)
+        self.assertEqual(report['per_species'], 0.0)
+
 
 if __name__ == '__main__':
     unittest.main()
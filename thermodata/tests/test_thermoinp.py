@@ -1,4 +1,7 @@
+import io
 import os
+import shutil
+import tempfile
 import unittest
 
 from thermodata import thermoinp
@@ -126,6 +129,45 @@ class TestDB(unittest.TestCase):
         subset = self.db.subset(species=('^H2$', '^N2$'))
         self.assertEqual(len(subset._dict), 2)
 
+    # ----------------------------------------------------------------
+    # Test construction from records
+    # ----------------------------------------------------------------
+    def test_from_records(self):
+        """Records are categorised by isproduct and phase."""
+        records = [self.db[name] for name in ('Air', 'Ag(cr)', 'H2')]
+        db = thermoinp.DB.from_records(records)
+        self.assertEqual(db.reactant, [self.db['Air']])
+        self.assertEqual(db.condensed, [self.db['Ag(cr)']])
+        self.assertEqual(db.gaseous, [self.db['H2']])
+        self.assertEqual(db['H2'], test_gas)
+
+    def test_elements(self):
+        """Element counts are parsed from the formula."""
+        self.assertEqual(self.db['CO2'].elements, {'C': 1.0, 'O': 2.0})
+        self.assertEqual(self.db['Air'].elements,
+                         {'N': 1.5617, 'O': 0.41959, 'AR': 0.00937,
+                          'C': 0.00032})
+
+    def test_create(self):
+        """Created records parse to the fields they were created from
+        and format as the source (bar trailing blanks)."""
+        for source in self.db.all:
+            record = Species.create(
+                source.name, source.elements, source.phase, source.molwt,
+                source.intervals or (), source.h_formation,
+                source.comments, source.refcode, source.h_assigned,
+                source.T_reference, source.isproduct)
+            if source.name in ('CO2', 'AL(cr)', 'CH4(L)', 'e-'):
+                self.assertEqual(
+                    [x.rstrip() for x in record.formatted.split('\n')],
+                    [x.rstrip() for x in source.formatted.split('\n')])
+            parsed = Species.from_dataset(record.formatted.split('\n'),
+                                          polycls=poly.NASAPoly)
+            self.assertEqual(parsed[:4] + parsed[5:],
+                             source[:4] + source[5:])
+            self.assertEqual(parsed.elements, source.elements)
+            self.assertEqual(record.isproduct, source.isproduct)
+
     # ----------------------------------------------------------------
     # Test format
     # ----------------------------------------------------------------
@@ -157,6 +199,150 @@ class TestDB(unittest.TestCase):
         testing_data = self.db.subset(species).format()
         self.assertEqual(testing_data, correct_data)
 
+    # ----------------------------------------------------------------
+    # Test write
+    # ----------------------------------------------------------------
+    def test_write_text(self):
+        """Streaming to a text file reproduces format."""
+        subset = self.db.subset(x + '$' for x in ('C3H8', 'Air'))
+        f = io.StringIO()
+        subset.write(f)
+        self.assertEqual(f.getvalue(), subset.format() + '\n')
+
+    def test_write_binary(self):
+        """Streaming to a binary file reproduces format."""
+        subset = self.db.subset(x + '$' for x in ('C3H8', 'Air', 'O2'))
+        f = io.BytesIO()
+        subset.write(f)
+        self.assertEqual(f.getvalue().decode('ascii'),
+                         subset.format() + '\n')
+
+    def test_write_unmapped(self):
+        """Records without a mapped source are written from text."""
+        db = thermoinp.DB.from_records([self.db['Air'], self.db['H2']])
+        f = io.BytesIO()
+        db.write(f)
+        self.assertEqual(f.getvalue().decode('ascii'), db.format() + '\n')
+
+class TestOverlay(unittest.TestCase):
+    """Databases built from several source files."""
+    base = thermoinp.DB()
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'custom.inp')
+        # Overlay redefining H2, adding a gas and a reactant.
+        h2 = self.base['H2'].formatted.replace('Ref-Elm.', 'Custom. ')
+        gas = self.base['N2'].formatted.replace('N2    ', 'XN2   ', 1)
+        self.write_overlay([h2, gas], [self.base['Air'].formatted])
+        self.db = thermoinp.DB(sources=(thermoinp.SOURCE, self.path))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_overlay(self, products, reactants):
+        db = [thermoinp.DB.header]
+        db.extend(products)
+        db.append('END PRODUCTS')
+        db.extend(reactants)
+        db.append('END REACTANTS')
+        with open(self.path, 'w') as f:
+            f.write('\n'.join(db) + '\n')
+
+    def test_sources(self):
+        self.assertEqual(self.db.sources, [thermoinp.SOURCE, self.path])
+
+    def test_precedence(self):
+        """Overlay species replace species of the same name."""
+        self.assertTrue(self.db['H2'].comments.startswith('Custom.'))
+        self.assertEqual(len(self.db.lookup('^H2$')), 1)
+        self.assertEqual(len(self.db.all), len(self.base.all) + 1)
+
+    def test_new_species(self):
+        """Overlay species are categorised and queryable."""
+        self.assertIn(self.db['XN2'], self.db.gaseous)
+        self.assertIn(self.db['Air'], self.db.reactant)
+
+    def test_reload(self):
+        """Reloading patches the species of the reloaded source."""
+        self.write_overlay([self.base['CO2'].formatted], [])
+        self.db.reload_source(self.path)
+        self.assertEqual(self.db['H2'], self.base['H2'])
+        self.assertEqual(self.db['CO2'].formatted,
+                         self.base['CO2'].formatted)
+        self.assertNotIn('XN2', self.db._dict)
+        self.assertEqual(self.db.format(), self.base.format())
+
+    def test_reload_parses_one_source(self):
+        """Only the reloaded source is parsed."""
+        parsed = []
+        parse = self.db._parse_source
+        self.db._parse_source = lambda path: parsed.append(path) or \
+                                             parse(path)
+        self.db.reload_source(self.path)
+        self.assertEqual(parsed, [self.path])
+
+    def test_remove_source(self):
+        subset = self.db.subset(('^H2$', 'XN2'))
+        source, = [s for (path, _), (s, _) in self.db._sources.items()
+                   if path == self.path]
+        self.db.remove_source(self.path)
+        self.assertEqual(self.db.sources, [thermoinp.SOURCE])
+        self.assertEqual(self.db.format(), self.base.format())
+        # Unmapped; subsets write their formatted text instead
+        self.assertTrue(source.closed)
+        f = io.BytesIO()
+        subset.write(f)
+        self.assertEqual(f.getvalue().decode('ascii'),
+                         subset.format() + '\n')
+        with self.assertRaisesRegex(ValueError, 'is not a source'):
+            self.db.remove_source(self.path)
+
+    def test_reload_unmaps(self):
+        """Reloading unmaps the previous parse of the source."""
+        mapped = lambda: [s for (path, _), (s, _) in
+                          self.db._sources.items() if path == self.path]
+        source, = mapped()
+        self.db.reload_source(self.path)
+        self.assertTrue(source.closed)
+        self.assertFalse(mapped()[0].closed)
+
+    def test_add_source_twice(self):
+        self.assertRaises(ValueError, self.db.add_source, self.path)
+
+    def test_write_overlay_subset(self):
+        """Subsets spanning sources stream from each mapped source."""
+        subset = self.db.subset(('^H2$', 'XN2', 'O2$'))
+        f = io.BytesIO()
+        subset.write(f)
+        self.assertEqual(f.getvalue().decode('ascii'),
+                         subset.format() + '\n')
+        self.assertIn('Custom.', subset.format())
+
+    def test_write_edited_source(self):
+        """Sources changed since parsing are not copied from."""
+        subset = self.db.subset(('^H2$', 'XN2', 'O2$'))
+        expected = subset.format() + '\n'
+        # Edit in place (same size; the mapping sees the new bytes), as
+        # a later edit would (timestamps are coarser than the test)
+        with open(self.path, 'r+b') as f:
+            contents = f.read().replace(b'Custom.', b'EDITED!')
+            f.seek(0)
+            f.write(contents)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns,
+                                stat.st_mtime_ns + 10**9))
+        f = io.BytesIO()
+        subset.write(f)
+        self.assertEqual(f.getvalue().decode('ascii'), expected)
+        # Truncated
+        with open(self.path, 'r+b') as f:
+            f.truncate(100)
+        f = io.BytesIO()
+        subset.write(f)
+        self.assertEqual(f.getvalue().decode('ascii'), expected)
+
+
 # --------------------------------------------------------------------
 # TEST DATA
 # --------------------------------------------------------------------
@@ -0,0 +1,138 @@
+import io
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+import numpy as np
+
+from thermodata import ceaout, packed, thermoinp, validate
+
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class TestValidate(unittest.TestCase):
+    packed = packed.PackedDB.from_db(thermoinp.DB())
+
+    def test_cap_out(self):
+        """CEA output agrees to the printed precision."""
+        report = validate.validate(
+            self.packed, validate.read(os.path.join(DATA, 'cap_out.txt'))
+        )
+        self.assertEqual(report.failures(), [])
+        # InCl3(cr) and Air have no tables
+        self.assertEqual(report.missing, [])
+        self.assertEqual({e.name for e in report.errors},
+                         {'CO2', 'C3H8'})
+        # CO2: 3 intervals, 5 properties
+        co2 = [e for e in report.errors if e.name == 'CO2']
+        self.assertEqual(len(co2), 15)
+        self.assertEqual(sum(e.npoints for e in co2
+                             if e.property == 'Cp'), 200)
+        # 0 K and C3H8 above 6000 K (extrapolated by CEA)
+        self.assertEqual(report.skipped, 2 + 12)
+        for max_abs, max_rel in report.summary().values():
+            self.assertLess(max_abs, 5e-4 + 1e-9)
+
+    def test_reference_tables(self):
+        report = validate.validate(
+            self.packed,
+            validate.read(os.path.join(DATA, 'reference_tables.txt'))
+        )
+        self.assertEqual(report.failures(), [])
+        self.assertEqual({e.name for e in report.errors},
+                         {'CO2', 'C3H8', 'In(cr)', 'Air'})
+
+    def test_abridged_table(self):
+        tables = validate.read(os.path.join(DATA, 'tableCO2.txt'), 'CO2')
+        report = validate.validate(self.packed, tables)
+        self.assertEqual(report.failures(), [])
+        self.assertEqual({e.property for e in report.errors},
+                         {'Cp', 'HH298', 'S', 'H'})
+
+    def test_missing(self):
+        table = ceaout.SpeciesTable('Adamantium', None, '',
+                                    np.ones((1, 8)) * 300.0)
+        report = validate.validate(self.packed, [table])
+        self.assertEqual(report.missing, ['Adamantium'])
+        self.assertIn('Adamantium', report.formatted())
+
+    def test_failure(self):
+        """Errors are attributed to the interval they occur in."""
+        T = np.array([300.0, 500.0, 1500.0, 3000.0])
+        table, = validate.tabulate(self.packed, T, ('CO2',))
+        table.data[3, ceaout.COLUMNS.index('S')] += 0.1
+        report = validate.validate(self.packed, [table])
+        failure, = report.failures()
+        self.assertEqual((failure.name, failure.property,
+                          failure.interval, failure.npoints,
+                          failure.nfail),
+                         ('CO2', 'S', 1, 2, 1))
+        self.assertAlmostEqual(failure.max_abs, 0.1)
+
+    def test_full_database(self):
+        """All species are compared in seconds."""
+        T = np.linspace(200.0, 20000.0, 100)
+        tables = list(validate.tabulate(self.packed, T))
+        self.assertEqual(len(tables), len(self.packed))
+        start = time.perf_counter()
+        report = validate.validate(self.packed, tables)
+        self.assertLess(time.perf_counter() - start, 5.0)
+        self.assertEqual(report.failures(), [])
+        self.assertEqual(len({e.name for e in report.errors}),
+                         sum(1 for t in tables if len(t.data)))
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = validate.main([os.path.join(DATA, 'cap_out.txt')])
+        self.assertEqual(status, 0)
+        self.assertIn('CO2', output.getvalue())
+
+        # Sources overlay the NASA Glenn database
+        with contextlib.redirect_stdout(output):
+            status = validate.main([
+                '--source', os.path.join(DATA, 'reactants_subset.txt'),
+                os.path.join(DATA, 'cap_out.txt')
+            ])
+        self.assertEqual(status, 0)
+
+        # CO2 replaced with the data of N2
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'overlay.inp')
+        base = thermoinp.DB()
+        with open(path, 'w') as f:
+            f.write('\n'.join([
+                thermoinp.DB.header,
+                base['N2'].formatted.replace('N2    ', 'CO2   ', 1),
+                'END PRODUCTS', 'END REACTANTS']) + '\n')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = validate.main(['-q', '--source', path,
+                                    os.path.join(DATA, 'cap_out.txt')])
+        self.assertEqual(status, 1)
+        self.assertIn('CO2', output.getvalue())
+        self.assertNotIn('C3H8', output.getvalue())
+
+    def test_main_unnamed(self):
+        """Tables without a species line are named with --name."""
+        path = os.path.join(DATA, 'tableCO2.txt')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = validate.main(['--name', 'CO2', path])
+        self.assertEqual(status, 0)
+        self.assertIn('CO2', output.getvalue())
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = validate.main([path])
+        self.assertEqual(status, 1)
+        self.assertIn(validate.UNNAMED, output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+
+import numpy as np
+
+from thermodata import packed, vector
+from thermodata.thermodata import ChemDB
+
+
+class TestVector(unittest.TestCase):
+    """Compare the vectorised engine with Thermo."""
+    db = ChemDB()
+    db.select()
+    packed = packed.PackedDB.from_db(db)
+    T = np.array([200.0, 298.15, 999.99, 1000.0, 1000.01, 3000.0,
+                  6000.0, 20000.0])
+
+    def test_all_species(self):
+        result = vector.evaluate(self.packed, self.T)
+        self.assertEqual(result.Cp.shape, (len(self.packed), len(self.T)))
+        for i, name in enumerate(result.names):
+            thermo = self.db[name].thermo
+            if thermo is None:
+                self.assertTrue(np.isnan(result.Cp[i]).all())
+                continue
+            for j, T in enumerate(self.T):
+                thermo.T = T
+                if thermo.interval is None or T < thermo.bounds[0]:
+                    self.assertTrue(np.isnan(result.H[i, j]))
+                    self.assertEqual(result.interval[i, j], -1)
+                    continue
+                self.assertEqual(
+                    thermo.intervals[result.interval[i, j]],
+                    thermo.interval
+                )
+                np.testing.assert_allclose(
+                    (result.Cp[i, j], result.H[i, j], result.S[i, j]),
+                    (thermo.Cp, thermo.H, thermo.S),
+                    rtol=1e-12, atol=1e-9
+                )
+
+    def test_names(self):
+        result = vector.evaluate(self.packed, 298.15, ('O2', 'CO2'))
+        self.assertEqual(result.names, ['O2', 'CO2'])
+        self.assertEqual(result.Cp.shape, (2, 1))
+        self.assertAlmostEqual(result.Cp[1, 0], 37.135, places=3)
+
+    def test_extrapolate(self):
+        T = [100.0, 30000.0]
+        result = vector.evaluate(self.packed, T, ('CO2',))
+        self.assertTrue(np.isnan(result.Cp).all())
+        result = vector.evaluate(self.packed, T, ('CO2',),
+                                 extrapolate=True)
+        np.testing.assert_array_equal(result.interval, [[0, 2]])
+        self.assertTrue(np.isfinite(result.Cp).all())
+
+    def test_pairs(self):
+        """Pairs broadcast like NumPy arrays."""
+        index = vector.species_index(self.packed, ('CO2', 'O2', 'CO2'))
+        T = np.array([300.0, 1500.0, 7000.0])
+        interval, Cp, H, S = vector.evaluate_pairs(self.packed, index, T)
+        np.testing.assert_array_equal(interval, [0, 1, 2])
+        grid = vector.evaluate(self.packed, T, ('CO2', 'O2'))
+        self.assertEqual(Cp[1], grid.Cp[1, 1])
+        self.assertEqual(S[2], grid.S[0, 2])
+
+    def test_derivatives(self):
+        """Analytic derivatives match Thermo and central differences."""
+        names = ('CO2', 'O2', 'ALN(L)')
+        result = vector.evaluate(self.packed, self.T, names,
+                                 derivatives=True)
+        self.assertIsNone(vector.evaluate(self.packed, self.T).dCp)
+        for i, name in enumerate(names):
+            thermo = self.db[name].thermo
+            for j, T in enumerate(self.T):
+                if result.interval[i, j] < 0:
+                    self.assertTrue(np.isnan(result.dCp[i, j]))
+                    continue
+                thermo.T = T
+                self.assertAlmostEqual(result.dCp[i, j], thermo.dCp,
+                                       places=12)
+        np.testing.assert_array_equal(result.dH, result.Cp)
+        np.testing.assert_allclose(result.dS, result.Cp / self.T)
+
+        # Central differences within intervals
+        T = np.array([300.0, 1500.0, 5000.0])
+        dT = 1e-3
+        upper = vector.evaluate(self.packed, T + dT, names)
+        lower = vector.evaluate(self.packed, T - dT, names)
+        result = vector.evaluate(self.packed, T, names, derivatives=True)
+        for prop in ('Cp', 'H', 'S'):
+            difference = (getattr(upper, prop)
+                          - getattr(lower, prop)) / (2 * dT)
+            np.testing.assert_allclose(getattr(result, 'd' + prop),
+                                       difference, rtol=1e-6, atol=1e-6)
+
+    def test_pairs_derivatives(self):
+        index = vector.species_index(self.packed, ('CO2', 'O2'))
+        values = vector.evaluate_pairs(self.packed, index, 1500.0,
+                                       derivatives=True)
+        self.assertEqual(len(values), 5)
+        grid = vector.evaluate(self.packed, [1500.0], ('CO2', 'O2'),
+                               derivatives=True)
+        np.testing.assert_array_equal(values[4], grid.dCp[:, 0])
+
+    def test_temperature(self):
+        """Inverts H and S (away from the interval bounds, where the
+        functions are discontinuous)."""
+        index = vector.species_index(self.packed)[:, None]
+        T = np.array([250.5, 712.5, 2501.5, 9001.5])
+        values = vector.evaluate_pairs(self.packed, index, T)
+        for prop, data in (('H', values[2]), ('S', values[3])):
+            result = vector.temperature(self.packed, index, prop, data)
+            self.assertEqual(result.shape, data.shape)
+            np.testing.assert_array_equal(np.isnan(result), np.isnan(data))
+            expected = np.where(np.isnan(data), np.nan, T)
+            np.testing.assert_allclose(result, expected, rtol=1e-8)
+
+    def test_temperature_undefined(self):
+        index = self.packed.index('N2')
+        result = vector.temperature(self.packed, index, 'H',
+                                    [-1.0e5, 0.0, 1.0e7])
+        self.assertTrue(np.isnan(result[[0, 2]]).all())
+        self.assertAlmostEqual(result[1], 298.15, places=5)
+        self.assertRaises(ValueError, vector.temperature, self.packed,
+                          index, 'Cp', 30.0)
+
+
+class TestMix(unittest.TestCase):
+    """Ideal mixtures and their composition Jacobians."""
+    packed = TestVector.packed
+    names = ('N2', 'O2', 'Ar')
+    T = np.array([300.0, 1200.0])
+    X = np.array([0.78, 0.21, 0.01])
+    species = vector.evaluate(packed, T, names, derivatives=True)
+
+    def test_values(self):
+        mixture = vector.mix(self.species, self.X)
+        R = 8.314510
+        for j in range(len(self.T)):
+            Cp = sum(x * self.species.Cp[i, j]
+                     for i, x in enumerate(self.X))
+            S = sum(x * (self.species.S[i, j] - R * np.log(x))
+                    for i, x in enumerate(self.X))
+            self.assertAlmostEqual(mixture.Cp[j], Cp)
+            self.assertAlmostEqual(mixture.S[j], S)
+        np.testing.assert_array_equal(mixture.dH, mixture.Cp)
+        np.testing.assert_allclose(mixture.dCp,
+                                   self.X.dot(self.species.dCp))
+
+    def test_jacobian(self):
+        """Jacobians match central differences of the mole fractions."""
+        mixture = vector.mix(self.species, self.X)
+        dX = 1e-7
+        for prop in ('Cp', 'H', 'S', 'dCp'):
+            jacobian = mixture.jacobian(prop)
+            self.assertEqual(jacobian.shape, (3, 2))
+            for i in range(3):
+                step = np.zeros(3)
+                step[i] = dX
+                upper = vector.mix(self.species, self.X + step)
+                lower = vector.mix(self.species, self.X - step)
+                difference = (getattr(upper, prop)
+                              - getattr(lower, prop)) / (2 * dX)
+                np.testing.assert_allclose(jacobian[i], difference,
+                                           rtol=1e-5, atol=1e-6)
+
+    def test_zero_fraction(self):
+        mixture = vector.mix(self.species, [0.79, 0.21, 0.0])
+        self.assertTrue(np.isfinite(mixture.S).all())
+        self.assertTrue(np.isposinf(mixture.jacobian('S')[2]).all())
+
+    def test_compositions(self):
+        """One composition per temperature."""
+        X = np.array([[0.79, 0.5], [0.21, 0.5], [0.0, 0.0]])
+        mixture = vector.mix(self.species, X)
+        self.assertAlmostEqual(
+            mixture.H[1], 0.5 * self.species.H[0, 1]
+                          + 0.5 * self.species.H[1, 1])
+
+    def test_no_derivatives(self):
+        species = vector.evaluate(self.packed, self.T, self.names)
+        mixture = vector.mix(species, self.X)
+        self.assertIsNone(mixture.dCp)
+        self.assertRaises(ValueError, mixture.jacobian, 'dCp')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -44,13 +44,17 @@ Key limitations:
     defined as it is) is a WIP and dependent on emerging requirements.
 
 """
+import os
 import sys
-from math import log
+from math import log, copysign
+import itertools
 import collections
-from xml.etree import ElementTree as etree
 
 import thermodata.constants as constants
-import thermodata.thermoinp as thermoinp
+
+# The source parser (`thermoinp`) and the XML machinery are only
+# needed to load and write databases; they're imported on first use to
+# keep this module cheap to import.
 
 
 _Interval = collections.namedtuple('Interval',
@@ -59,6 +63,7 @@ _Interval = collections.namedtuple('Interval',
                                   'integration_consts'])
 
 class Interval(_Interval):
+    __slots__ = ()
 
     def _cp_nodim(self, T):
         # Return dimensionles heat capacity for temperature
@@ -102,6 +107,13 @@ class ChemDB(dict):
     def __init__(self):
         self._thermoinp_load()
 
+    @classmethod
+    async def aload(cls, executor=None):
+        """Load the database in `executor` (default: the event loop's)
+        without blocking the event loop (see the `aio` module)."""
+        from thermodata import aio
+        return await aio.call(cls, executor=executor)
+
     def select(self, species=None):
         """Generate database by a list of species names."""
         if species is None:
@@ -120,15 +132,28 @@ class ChemDB(dict):
                 errmsg = "{} not in source database.".format(name)
                 raise Exception(errmsg)
 
+    def export(self, names=None):
+        """Return the coefficients of the selected species (default:
+        all, in order of selection) in C-contiguous arrays (see
+        packed.export)."""
+        from thermodata import packed
+        return packed.export(self, names)
+
     def _thermoinp_load(self):
         # Database loader. Loads the contents of `thermo.inp` into a
         # flat dictionary.
+        import thermodata.thermoinp as thermoinp
         db = thermoinp.DB()
-        self._source_dict = {species.name: self._map_species(species)
+        # Equal values (e.g. interval bounds and zero coefficients)
+        # are shared between species rather than repeated.
+        cache = {}
+        self._source_dict = {species.name: self._map_species(species,
+                                                             cache)
                              for species in db.all}
 
     def toxml(self):
         """Represent database contents in XML form."""
+        from xml.etree import ElementTree as etree
         root = etree.Element('chemdb')
         for species_obj in self.values():
             species_obj.toxml(root)
@@ -142,36 +167,88 @@ class ChemDB(dict):
           - If file exists, an exception is raised.
 
         """
+        # ElementTree writes encoded (utf-8) XML, so a binary stream
+        # is required.
         if path is None:
-            f = sys.stdout
+            f = sys.stdout.buffer
         else:
             if os.path.isfile(path):
                 raise IOError("{} exists.".format(path))
-            f = open(path, 'w')
+            f = open(path, 'wb')
 
+        from xml.etree import ElementTree as etree
         root = self.toxml()
         _indentxml(root)
         etree.ElementTree(root).write(f,
                                       xml_declaration=True,
                                       encoding='utf-8',
                                       method='xml')
-        if f is not sys.stdout:
+        if f is sys.stdout.buffer:
+            f.flush()
+        else:
             f.close()
 
-    def _map_species(self, source):
+    def memory_report(self):
+        """Report the memory footprint of the current view.
+
+        Returns a dict of:
+
+            species     : number of species
+            total       : total size, bytes
+            per_species : mean size per species, bytes
+            structures  : bytes by structure ('Species', 'Thermo',
+                          'Interval'), including attribute values
+            by_species  : bytes by species name
+
+        Sizes are deep (`sys.getsizeof` of each object and the objects
+        it refers to); objects shared between species or structures
+        are counted once, against the first referrer.
+
+            >>> db.select()
+            >>> db.memory_report()['per_species']
+            1293.4
+        """
+        seen = set()
+        structures = collections.OrderedDict(
+            (name, 0) for name in ('Species', 'Thermo', 'Interval')
+        )
+        by_species = {}
+        for name, species in self.items():
+            thermo = species.thermo
+            sizes = (('Species', _sizeof(species, seen, (Thermo,))),
+                     ('Interval', _sizeof(getattr(thermo, 'intervals', None),
+                                          seen)),
+                     ('Thermo', _sizeof(thermo, seen)))
+            for structure, size in sizes:
+                structures[structure] += size
+            by_species[name] = sum(size for _, size in sizes)
+
+        total = sum(structures.values())
+        return {'species': len(self),
+                'total': total,
+                'per_species': total / len(self) if self else 0.0,
+                'structures': dict(structures),
+                'by_species': by_species}
+
+    def _map_species(self, source, cache=None):
         # map thermoinp.Species instance data to Species instances.
         try:
-            intervals = [self._map_interval(i)
-                         for i in source.intervals]
+            intervals = tuple(self._map_interval(i, cache)
+                              for i in source.intervals)
         except TypeError:
             intervals = None
 
         return Species.from_source(source, intervals)
 
     @staticmethod
-    def _map_interval(source):
-        # map thermoinp.Interval instance data to Interval instances
-        return Interval(source.bounds, source.coeff, source.const)
+    def _map_interval(source, cache=None):
+        # map thermoinp.Interval instance data to Interval instances;
+        # equal values are shared via `cache` (a dict) if given.
+        if cache is None:
+            return Interval(source.lim, source.a, source.b)
+        return Interval(_intern(source.lim, cache),
+                        _intern(source.a, cache),
+                        _intern(source.b, cache))
 
     @classmethod
     def from_category(cls, string):
@@ -207,6 +284,8 @@ class Species(object):
     instantiated in the database loading during the instantiation of
     ChemDB.
     """
+    __slots__ = ('name', 'Mr', 'Hf', 'M', 'R', 'hf', 'thermo', 'phase')
+
     def __init__(self, name, rel_molar_mass, formation_enthalpy,
                  intervals=None):
         self.name = name
@@ -237,6 +316,7 @@ class Species(object):
 
     def toxml(self, parent):
         """Create an XML representation of the thermodynamic model"""
+        from xml.etree import ElementTree as etree
         attributes = {'name' : self.name}
         node = etree.SubElement(parent, 'species', attributes)
         M = etree.SubElement(node,
@@ -254,7 +334,8 @@ class Species(object):
                              {'units' : 'J/mol'}
                              )
         Hf.text = str(self.Hf)
-        self.thermo.toxml(node)
+        if self.thermo is not None:
+            self.thermo.toxml(node)
 
     def _calculate_specific_gas_constant(self):
         # Returns the specific gas constant as a function of molar
@@ -293,6 +374,8 @@ class Thermo(object):
       - Cp, cp : Standard-state heat capacity at constant pressure
       - H, h   : Standard-state enthalpy
       - S, s   : Standard-state entropy
+      - dCp, dcp : Temperature derivative of the heat capacity
+                   (evaluated on access; dH/dT = Cp, dS/dT = Cp/T)
 
     Note that upper-case and lower-case properties are in units of
     amount-of-substance (/mol) and mass (/kg) respectively.
@@ -300,7 +383,14 @@ class Thermo(object):
     Like Species, Thermo can be instantiated directly but is generally
     handled during the ChemDB database loading.
 
+    Only the dimensionless state functions are stored; the properties
+    above are scaled on access. Above the intervals there is no data;
+    the stored functions are None and the properties raise TypeError.
+
     """
+    __slots__ = ('species', 'intervals', 'bounds', 'interval', '_T',
+                 '_cp_nodim', '_h_nodim', '_s_nodim')
+
     def __init__(self, species, intervals, T=298.15):
         self.species = species
         self.intervals = intervals
@@ -328,25 +418,17 @@ class Thermo(object):
         self._T = T
         self._select_interval(T)
 
-        # Localise variables for repeated access
-        Ru = constants.R_CEA
-        R = self.species.R
         if self.interval:
             a = self.interval.coeffs
             b1, b2 = self.interval.integration_consts
 
             # Calculate dimensionless values
-            Cp_nodim = _dimless_heat_capacity(T, a)
-            H_nodim = _dimless_enthalpy(T, a, b1)
-            S_nodim = _dimless_entropy(T, a, b2)
-
-            # Assign properties
-            self._Cp = Cp_nodim * Ru
-            self._cp = Cp_nodim * R
-            self._H = H_nodim * Ru * T
-            self._h = H_nodim * R * T
-            self._S = S_nodim * Ru
-            self._s = S_nodim * R
+            self._cp_nodim = _dimless_heat_capacity(T, a)
+            self._h_nodim = _dimless_enthalpy(T, a, b1)
+            self._s_nodim = _dimless_entropy(T, a, b2)
+        else:
+            # Don't keep the values of the previous temperature
+            self._cp_nodim = self._h_nodim = self._s_nodim = None
 
 
     # Heat capacity properties
@@ -354,36 +436,50 @@ class Thermo(object):
     @property
     def Cp(self):
         """Molar heat capacity at constant pressure, J/mol-K."""
-        return self._Cp
+        return self._cp_nodim * constants.R_CEA
 
     @property
     def cp(self):
         """Specific heat capacity at constant pressure, J/kg-K."""
-        return self._cp
+        return self._cp_nodim * self.species.R
+
+    @property
+    def dCp(self):
+        """Temperature derivative of Cp, J/mol-K^2."""
+        return (_dimless_heat_capacity_derivative(self._T,
+                                                  self.interval.coeffs)
+                * constants.R_CEA)
+
+    @property
+    def dcp(self):
+        """Temperature derivative of cp, J/kg-K^2."""
+        return (_dimless_heat_capacity_derivative(self._T,
+                                                  self.interval.coeffs)
+                * self.species.R)
 
     # Enthalpy properties
     # ----------------------------------------------------------------
     @property
     def H(self):
         """Molar enthalpy, J/mol"""
-        return self._H
+        return self._h_nodim * constants.R_CEA * self._T
 
     @property
     def h(self):
         """Specific enthalpy, J/kg"""
-        return self._h
+        return self._h_nodim * self.species.R * self._T
 
     # Entropy properties
     # ----------------------------------------------------------------
     @property
     def S(self):
         """Molar entropy, J/mol-K"""
-        return self._S
+        return self._s_nodim * constants.R_CEA
 
     @property
     def s(self):
         """Specific entropy, J/kg-K"""
-        return self._s
+        return self._s_nodim * self.species.R
 
 
     # ----------------------------------------------------------------
@@ -397,9 +493,10 @@ class Thermo(object):
         raise ValueError("Temperature exceeds data range.")
 
     def _select_interval(self, T):
-        # Select the appropriate interval for the current temperature
-        if self.bounds[1] < T  < self.bounds[0]:
-            raise ValueError("Temperature out of bounds")
+        # Select the appropriate interval for the current temperature.
+        # Temperatures below an interval (T < Tmin, including any gap
+        # between intervals) aren't rejected; see the `integrity`
+        # module for checks of the interval coverage.
         self.interval = None
         for interval in self.intervals:
             if T <= interval.bounds[1]:
@@ -408,6 +505,7 @@ class Thermo(object):
 
     def toxml(self, parent):
         """Create an XML representation of the thermodynamic model"""
+        from xml.etree import ElementTree as etree
         attributes = {'Tmin' : str(self.bounds[0]),
                      'Tmax' : str(self.bounds[1])}
         node = etree.SubElement(parent, 'thermo', attributes)
@@ -515,6 +613,19 @@ def _dimless_heat_capacity(T, a):
             )
 
 
+def _dimless_heat_capacity_derivative(T, a):
+    # Returns the temperature derivative of Cp/R, 1/K
+    # T : Temperature, K
+    # a : coefficients, len(a) == 7
+    return (- 2.0 * a[0] / T**3
+            - a[1] / T**2
+            + a[3]
+            + 2.0 * a[4] * T
+            + 3.0 * a[5] * T**2
+            + 4.0 * a[6] * T**3
+            )
+
+
 def _dimless_enthalpy(T, a, b):
     # Returns the dimensionless enthalpy, H/RT
     # T : Temperature, K
@@ -545,6 +656,56 @@ def _dimless_entropy(T, a, b):
             )
 
 
+def __getattr__(name):
+    # Lazily import `thermoinp` as a module attribute.
+    if name == 'thermoinp':
+        import thermodata.thermoinp as thermoinp
+        return thermoinp
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name)
+    )
+
+
+def _intern(values, cache):
+    # Return a tuple equal to `values` made of shared instances from
+    # `cache`. Zero keys carry the sign (0.0 == -0.0) and tuples are
+    # keyed by the identity of their (shared) items for the same
+    # reason.
+    def intern(value):
+        key = (value, copysign(1.0, value)) if value == 0 else value
+        return cache.setdefault(key, value)
+    values = tuple(intern(value) for value in values)
+    return cache.setdefault(tuple(map(id, values)), values)
+
+
+def _sizeof(obj, seen, stop=()):
+    # Return the deep size of obj in bytes, excluding objects whose id
+    # is in `seen` (updated) and instances of the `stop` types.
+    if obj is None or obj is True or obj is False:
+        return 0
+    if id(obj) in seen or isinstance(obj, stop):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float)):
+        return size
+    if isinstance(obj, dict):
+        children = itertools.chain.from_iterable(obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        children = obj
+    else:
+        children = []
+    slots = itertools.chain.from_iterable(
+        getattr(cls, '__slots__', ()) for cls in type(obj).__mro__
+    )
+    children = itertools.chain(
+        children,
+        (getattr(obj, slot) for slot in slots if hasattr(obj, slot)),
+        (vars(obj),) if hasattr(obj, '__dict__') else ()
+    )
+    return size + sum(_sizeof(child, seen, stop) for child in children)
+
+
 def _indentxml(elem, level=0):
     # Indent XML string representation of elements;
     # http://effbot.org/zone/element-lib.htm#prettyprint
@@ -8,14 +8,29 @@ properties).
 
 The DB class is the main point of access now. It provides categories
 of species data (as SpeciesRecords) amongst other functionality.
+
+A DB may be built from several files in the source format; the NASA
+Glenn database distributed with this package (`SOURCE`) and any number
+of overlays (e.g. proprietary species). Species in later sources take
+precedence over species of the same name in earlier sources.
+
+    >>> db = DB(sources=(SOURCE, 'custom.inp'))
+    >>> db.reload_source('custom.inp') # re-parses custom.inp only
 """
+import io
 import re
 import os
+import mmap
+import itertools
 import collections
 
 from thermodata import poly
 
 
+#: Path of the NASA Glenn database distributed with this package.
+SOURCE = os.path.join(os.path.dirname(__file__), 'data', 'thermo.inp')
+
+
 class DB(object):
     """Interface to the 'thermo.inp' source database.
 
@@ -26,6 +41,13 @@ class DB(object):
         reactants
 
     This class provides subsets of the database species.
+
+    Arguments
+    ---------
+
+        polytype : polynomial class suffix, see module `poly`
+        sources : iterable of source file paths in increasing order of
+            precedence (default: the NASA Glenn database only)
     """
 
     polytype = poly.NASAPoly
@@ -36,10 +58,33 @@ class DB(object):
         '   200.000  1000.000  6000.000 20000.000   9/09/04'
     ])
 
-    def __init__(self, polytype=''):
+    def __init__(self, polytype='', sources=None):
         self._select_polytype(polytype)
-        self._parse()
-        self._dict = {s.name:s for s in self.all}
+        self._init_indexes()
+        for path in (SOURCE,) if sources is None else sources:
+            self.add_source(path)
+
+    @classmethod
+    def from_records(cls, records, polytype=''):
+        """Create a database from an iterable of SpeciesRecord.
+
+        No source file is parsed. Records are categorised by their
+        `isproduct` and `phase` fields and keep the order given.
+        """
+        inst = cls.__new__(cls)
+        inst._select_polytype(polytype)
+        inst._init_indexes()
+        layer = _group(records)
+        inst._layers[None] = layer
+        inst._patch(layer)
+        return inst
+
+    @classmethod
+    async def aload(cls, polytype='', sources=None, executor=None):
+        """Parse the database in `executor` (default: the event loop's)
+        without blocking the event loop (see the `aio` module)."""
+        from thermodata import aio
+        return await aio.call(cls, polytype, sources, executor=executor)
 
     # ----------------------------------------------------------------
     # Categories
@@ -49,42 +94,86 @@ class DB(object):
     @property
     def all(self):
         """All species."""
-        return self._condensed + self._gaseous + self._reactant
+        return self.condensed + self.gaseous + self.reactant
 
     @property
     def allcondensed(self):
         """All condensed species (including reactants)."""
         return [s
-                for s in (self._condensed + self._reactant)
+                for s in (self.condensed + self.reactant)
                 if s.phase > 0]
 
     @property
     def allgases(self):
         """All gaseous species (including reactants)."""
         return [s
-                for s in (self._gaseous + self._reactant)
+                for s in (self.gaseous + self.reactant)
                 if s.phase == 0]
 
     @property
     def product(self):
         """Species that can appear as products in reactions."""
-        return self._condensed + self._gaseous
+        return self.condensed + self.gaseous
 
     # NOTE wrt above TODO: Keep these!
     @property
     def condensed(self):
         """Condensed, product-only species."""
-        return self._condensed
+        return self._category('condensed')
 
     @property
     def gaseous(self):
         """Gaseous, product-only species."""
-        return self._gaseous
+        return self._category('gaseous')
 
     @property
     def reactant(self):
         """Mixed-phase, reactant-only species."""
-        return self._reactant
+        return self._category('reactant')
+
+    # ----------------------------------------------------------------
+    # Sources
+    # ----------------------------------------------------------------
+    @property
+    def sources(self):
+        """Source file paths in increasing order of precedence."""
+        return [path for path in self._layers if path is not None]
+
+    def add_source(self, path):
+        """Add a source file with precedence over existing sources.
+
+        Only `path` is parsed; species it defines replace species of
+        the same name from existing sources.
+        """
+        if path in self._layers:
+            raise ValueError("{} is already a source.".format(path))
+        self._layers[path] = {}
+        self.reload_source(path)
+
+    def reload_source(self, path):
+        """Re-parse source file `path` and update the database.
+
+        The precedence of the source is unchanged. Only `path` is
+        parsed and only the species it defined before or defines now
+        are updated.
+        """
+        if path not in self._layers:
+            raise ValueError("{} is not a source.".format(path))
+        old = self._layers[path]
+        key, source, records = self._parse_source(path)
+        self._drop_sources(path)
+        if source is not None:
+            self._sources[key] = source
+        new = self._layers[path] = _group(records)
+        self._patch(list(new) + [name for name in old if name not in new])
+
+    def remove_source(self, path):
+        """Remove source file `path` from the database."""
+        if path not in self._layers:
+            raise ValueError("{} is not a source.".format(path))
+        old = self._layers.pop(path)
+        self._drop_sources(path)
+        self._patch(old)
 
     # ----------------------------------------------------------------
     # External methods
@@ -114,6 +203,40 @@ class DB(object):
 
         return '\n'.join(filter(None, db))
 
+    def write(self, fileobj):
+        """Write database in the source format to a file object.
+
+        The output is that of `format` (plus a terminating newline)
+        but species datasets are streamed to `fileobj` one at a time
+        rather than joined into a single string. `fileobj` may be
+        opened in text or binary mode; for binary files, datasets
+        parsed from a memory-mapped source are written directly from
+        the mapped slices, unless the source file has changed (size or
+        modification time) since it was parsed.
+
+            >>> with open('subset.inp', 'wb') as f:
+            ...     db.subset(('C3H8$', 'Air$')).write(f)
+        """
+        if isinstance(fileobj, io.TextIOBase):
+            write = fileobj.write
+            write_dataset = lambda s: write(s.formatted)
+        else:
+            write = lambda string: fileobj.write(string.encode('latin-1'))
+            sources = self._unchanged_sources()
+            write_dataset = lambda s: self._write_dataset(fileobj, s,
+                                                          sources)
+
+        write(self.header)
+        for category in (self.condensed, self.gaseous):
+            for species in category:
+                write('\n')
+                write_dataset(species)
+        write('\n{:<80s}'.format('END PRODUCTS'))
+        for species in self.reactant:
+            write('\n')
+            write_dataset(species)
+        write('\n{:<80s}\n'.format('END REACTANTS'))
+
     def list_categories(self):
         """List categories implemented in the original database."""
         return ['condensed', 'gaseous', 'reactant']
@@ -220,72 +343,150 @@ class DB(object):
         else:
             species_set = set(self._dict.values())
 
-        # New DB instance (super crude, might want to subclass)
-        # -----------------------------------------------------
-        subset = self.__class__()
-        subset._dict = {}
-        for obj in filter(filt, species_set):
-            subset._dict[obj.name] = obj
-
-        # Bit of a hack workaround; previously the database was split
-        # into three groups as it was parsed. This information is now
-        # carried with the species (isproduct and phase). This is
-        # fairly deeply entrenched in the database structure currently
-        # so we're going to overwrite the condensed, gaseous and
-        # reactant lists which are the guts (but _dict should be now)
-        objs = subset._dict.values()
-        reactants = filter(lambda o: o in self.reactant, objs)
-        gaseous = filter(lambda o: o in self.gaseous, objs)
-        condensed = filter(lambda o: o in self.condensed, objs)
-        sort_key = lambda o: o.name
-        subset._reactant = sorted(reactants, key=sort_key)
-        subset._condensed = sorted(condensed, key=sort_key)
-        subset._gaseous = sorted(gaseous, key=sort_key)
+        # New DB instance from the (already parsed) records. Records
+        # carry their category (isproduct and phase) and the location
+        # of their datasets in the (shared) sources.
+        objs = sorted(filter(filt, species_set), key=lambda o: o.name)
+        subset = self.from_records(objs)
+        subset.polytype = self.polytype
+        subset._sources = self._sources
 
         return subset
 
     # ----------------------------------------------------------------
     # Internal methods
     # ----------------------------------------------------------------
-    def _parse_to_categories(self):
-        """Split database file into categories.
-
-        File location is hardcoded.
+    def _init_indexes(self):
+        # Sources are layered in increasing order of precedence; each
+        # layer maps names to the records parsed from it. Categories
+        # map names to records too (in order of first appearance);
+        # the flat lists exposed via the category properties are
+        # cached until the next patch.
+        self._layers = collections.OrderedDict()
+        self._sources = {}
+        self._categories = {c: {} for c in self.list_categories()}
+        self._flat = {}
+        self._dict = {}
+
+    def _category(self, category):
+        # Return (cached) list of records in category
+        try:
+            return self._flat[category]
+        except KeyError:
+            flat = [s
+                    for group in self._categories[category].values()
+                    for s in group]
+            self._flat[category] = flat
+            return flat
+
+    def _patch(self, names):
+        # Update the category and name indexes for species `names`
+        # from the highest-precedence layer defining them.
+        for name in names:
+            records = ()
+            for layer in reversed(self._layers.values()):
+                if name in layer:
+                    records = layer[name]
+                    break
+
+            for category, groups in self._categories.items():
+                group = [s for s in records if _category(s) == category]
+                if group:
+                    groups[name] = group
+                else:
+                    groups.pop(name, None)
+
+            # As {s.name: s for s in self.all}
+            flat = [s
+                    for category in self.list_categories()
+                    for s in self._categories[category].get(name, ())]
+            if flat:
+                self._dict[name] = flat[-1]
+            else:
+                self._dict.pop(name, None)
+        self._flat.clear()
+
+    def _drop_sources(self, path):
+        # Forget and unmap the contents of previous parses of `path`.
+        # Subsets share the mapping so their records fall back to
+        # their formatted text.
+        for key in [k for k in self._sources if k[0] == path]:
+            source, signature = self._sources.pop(key)
+            source.close()
+
+    def _parse_source(self, path):
+        """Split source file into (categorised) SpeciesRecords.
+
+        Returns the key identifying this parse of the file, the
+        memory-mapped file with the signature of the file parsed (see
+        `_signature`; or None) and the records.
         """
-        categ_dict = _read_categories()
-        self._condensed = categ_dict['condensed_products']
-        self._gaseous = categ_dict['gas_products']
-        self._reactant = categ_dict['reactants']
+        key = path, next(_parse_count)
+        signature = _signature(path)
+        source, categ_dict = _read_categories(path)
+        if source is not None:
+            source = source, signature
+        records = []
+        for category, isproduct in (('products', True),
+                                    ('reactants', False)):
+            offset, string = categ_dict[category]
+            records.extend(
+                self._parse_category(key, offset, string, isproduct)
+            )
+        return key, source, records
 
-    def _parse_category(self, category):
-        """Split category into species datasets."""
-        pattern = re.compile(r'\n(?=[eA-Z(])')
-        name = '_{}'.format(category)
+    def _parse_category(self, key, offset, string, isproduct):
+        """Split category into species datasets.
 
-        # Add a flag to indicate whether the species is reactant-only
-        if category == 'reactant':
-            isproduct = False
-        else:
-            isproduct = True
+        Arguments
+        ---------
+
+            key : source key, recorded with the species
+            offset : offset of category `string` in the source
+            string : category (species datasets)
+            isproduct : flag indicating product species
+        """
+        pattern = re.compile(r'\n(?=[eA-Z(])')
 
         # Split category (string) into species dataset (strings) and
-        # cast them as SpeciesRecord instances.
+        # cast them as SpeciesRecord instances. Each record carries
+        # the location of its dataset in the source file.
         # FIXME: src should be passed directly, but for now other
         # functions in this module are dependent on this list form.
         l = []
-        for src in pattern.split(getattr(self, name)):
-            src = src.split('\n')
+        if not string:
+            return l
+        start = 0
+        for match in list(pattern.finditer(string)) + [None]:
+            end = len(string) if match is None else match.start()
+            src = string[start:end].split('\n')
             polycls = self.polytype
             sr = SpeciesRecord.from_dataset(src, isproduct, polycls)
+            sr._origin = key, offset + start, offset + end
             l.append(sr)
-        setattr(self, name, l)
-
-    def _parse(self):
-        """Split database file into (categorised) datasets."""
-        self._parse_to_categories()
+            if match is not None:
+                start = match.end()
+        return l
 
-        for c in self.list_categories():
-            self._parse_category(c)
+    def _unchanged_sources(self):
+        # Mapped sources whose files are unchanged since they were
+        # parsed; the offsets of their datasets are still valid.
+        return {key: source
+                for key, (source, signature) in self._sources.items()
+                if signature is not None and
+                _signature(key[0]) == signature}
+
+    def _write_dataset(self, fileobj, species, sources):
+        # Write a species dataset to a binary file object; straight
+        # from the memory-mapped source where there is an (unchanged)
+        # one.
+        key, start, end = getattr(species, '_origin', (None, 0, 0))
+        source = sources.get(key)
+        if source is None:
+            fileobj.write(species.formatted.encode('latin-1'))
+        else:
+            with memoryview(source) as view:
+                fileobj.write(view[start:end])
 
     def _select_polytype(self, polytype):
         # Selects appropriate class from module: poly
@@ -347,25 +548,79 @@ def _pprint_refcode(code):
             ''.join(date)
             )
 
-# TODO: To be deprecated - replace with soft-coded file approach
-def _read_categories():
-    # Split the database into three category strings.
-    # Returns a category-keyed dictionary of string values.
-    path = os.path.join(os.path.dirname(__file__),
-                        'data',
-                        'thermo.inp')
-    keys = 'gas_products', 'condensed_products', 'reactants'
-    with open(path, 'r') as f: contents = f.read()
-    # Gaseous reactants/products begin with species 'e-'
-    # Condensed reactants/products begin with species 'Ag(cr)'
-    # Reactants begin with 'Air'
-    # We can catch all three categories in one go with a regex:
-    pattern = re.compile(r'\n(e-.*)'
-                          r'\n(Ag\(cr\).*)'
-                          '\nEND PRODUCTS.*'
-                          '\n(Air.*)'
-                          '\nEND REACTANTS', re.DOTALL)
-    return dict(zip(keys, pattern.search(contents).groups()))
+# Count parses of source files (identifies memory-mapped sources)
+_parse_count = itertools.count()
+
+def _read_categories(path):
+    # Split a source file into its two sections; species that can
+    # appear as products (gaseous or condensed) and reactant-only
+    # species. Returns the memory-mapped file contents (None if the
+    # file could not be mapped) and a category-keyed dictionary of
+    # (offset, string) values.
+    source = contents = _map_file(path)
+    if source is None:
+        with open(path, 'r') as f: contents = f.read()
+    # Species datasets follow the 'thermo' record and the record of
+    # common temperature interval bounds. Products end with the 'END
+    # PRODUCTS' record and reactants with the 'END REACTANTS' record.
+    # Either category may be empty.
+    regex = (r'^thermo[^\n]*\n[^\n]*\n'
+             r'(.*?)^END PRODUCTS[^\n]*\n'
+             r'(.*?)^END REACTANTS')
+    if source is not None:
+        regex = regex.encode('ascii')
+    match = re.compile(regex, re.DOTALL | re.MULTILINE).search(contents)
+    if match is None:
+        raise ValueError("{} is not a thermo.inp database.".format(path))
+    categories = [(match.start(i), _decode(match.group(i)).rstrip('\n'))
+                  for i in (1, 2)]
+    return source, dict(zip(('products', 'reactants'), categories))
+
+def _category(record):
+    # Return the DB category of a SpeciesRecord
+    if not record.isproduct:
+        return 'reactant'
+    elif record.phase > 0:
+        return 'condensed'
+    return 'gaseous'
+
+def _group(records):
+    # Group records by name (dict of lists, in order of appearance)
+    groups = {}
+    for record in records:
+        groups.setdefault(record.name, []).append(record)
+    return groups
+
+def _map_file(path):
+    # Return a read-only memory map of the file at `path` or None if
+    # it is empty or doesn't use '\n' line endings (the offsets of
+    # the datasets in the mapped file must be the offsets of the
+    # datasets in the decoded text).
+    with open(path, 'rb') as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+    if source.find(b'\r') != -1:
+        source.close()
+        return None
+    return source
+
+def _signature(path):
+    # Size and modification time of a file (None if it can't be
+    # read); a file edited after parsing has a different signature.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def _decode(string):
+    # Decode a mapped byte string; latin-1 maps bytes to characters
+    # 1:1, so string offsets equal file offsets.
+    if isinstance(string, bytes):
+        return string.decode('latin-1')
+    return string
 
 # --------------------------------------------------------------------
 #
@@ -477,6 +732,11 @@ class SpeciesRecord(_Species):
         """Flag indicates if species is a valid reaction product."""
         return self._isproduct
 
+    @property
+    def elements(self):
+        """Element counts parsed from `formula` (dict)."""
+        return _parse_formula(self.formula)
+
 
     @classmethod
     def from_dataset(cls, records, isproduct=False, polycls=Interval):
@@ -546,10 +806,104 @@ class SpeciesRecord(_Species):
         inst._isproduct = isproduct
         return inst
 
+    @classmethod
+    def create(cls, name, elements, phase, molwt, intervals=(),
+               h_formation=None, comments='', refcode='',
+               h_assigned=None, T_reference=None, isproduct=True):
+        """Create a SpeciesRecord from its fields; it is formatted in
+        the source format (see `formatted`).
+
+        Arguments
+        ---------
+
+            elements : dict of element counts (up to 5 elements)
+            intervals : poly.NASAPoly intervals; if none, the species
+                has enthalpy `h_assigned` at `T_reference`
+
+        See the class docstring for the others.
+        """
+        if len(elements) > 5:
+            raise ValueError("{} has more than 5 elements.".format(name))
+        fields = [(element, _fixed(count, 6, 2))
+                  for element, count in elements.items()]
+        formula = ' '.join('{}:{}'.format(element, count.strip())
+                           for element, count in fields)
+        intervals = tuple(intervals) or None
+        if intervals is not None:
+            h_assigned = T_reference = None
+        inst = cls(name, comments, len(intervals or ()), refcode,
+                   formula, phase, molwt, h_formation, h_assigned,
+                   T_reference, intervals)
+        inst._formatted = _format_dataset(inst, fields)
+        inst._isproduct = isproduct
+        return inst
+
+
+def _format_dataset(record, fields):
+    # Return the thermo.inp dataset of a record, given its formula
+    # fields as (element, count) strings
+    refenthalpy = (record.h_formation if record.intervals
+                   else record.h_assigned)
+    fields = fields + [('', '0.00')] * (5 - len(fields))
+    lines = [
+        '{:<18s}{:<62s}'.format(record.name, record.comments[:62]),
+        ' {:1d} {:<6s} {}{:2d}{:>13s}{:>15s}'.format(
+            record.nintervals, record.refcode[:6],
+            ''.join('{:<2s}{:>6s}'.format(*f) for f in fields),
+            record.phase, _fixed(record.molwt, 13, 7),
+            '{:.3f}'.format(refenthalpy or 0.0))
+    ]
+    if not record.intervals:
+        lines.append(_format_limits((record.T_reference, 0.0), 0,
+                                    (0.0,) * 8, 0.0))
+    for interval in record.intervals or ():
+        a = tuple(interval.a) + (0.0,) * (8 - len(interval.a))
+        lines.append(_format_limits(interval.lim, interval.n,
+                                    interval.exp, interval.dh))
+        lines.append(''.join(map(_double, a[:5])))
+        eighth = _double(a[7]) if interval.n > 7 else ' ' * 16
+        lines.append(''.join(map(_double, a[5:7])) + eighth +
+                     ''.join(map(_double, interval.b)))
+    return '\n'.join(lines)
+
+def _format_limits(bounds, n, exponents, dh):
+    # Return the first record of an interval
+    return '{:11.3f}{:11.3f}{:1d}{}{:17.3f}'.format(
+        bounds[0], bounds[1], n,
+        ''.join('{:5.1f}'.format(x) for x in exponents), dh)
+
+def _double(value):
+    # Format a 16-char Fortran-style double
+    return '{:16.9E}'.format(value).replace('E', 'D')
+
+def _fixed(value, width, places):
+    # Format a number as fixed-point in `width` characters with at
+    # least `places` decimal places, more if needed and they fit (a
+    # leading zero is dropped to fit, e.g. '.41959')
+    value = float(value)
+    string = '{:.{}f}'.format(value, places)
+    for n in itertools.count(places + 1):
+        if float(string) == value:
+            break
+        longer = '{:.{}f}'.format(value, n)
+        if len(longer) > width:
+            longer = longer.replace('0.', '.', 1)
+        if len(longer) > width:
+            break
+        string = longer
+    return string.rjust(width)
 
 def _parse_species(records):
     return SpeciesRecord.from_dataset(records)
 
+def _parse_formula(formula):
+    # Takes a formula string as formatted by SpeciesRecord (e.g.
+    # 'C:1.00 O:2.00') and returns a dict of element counts.
+    # Blank element fields (e.g. ':.00000') are dropped.
+    pairs = (pair.split(':') for pair in formula.split())
+    return {element: float(count)
+            for element, count in pairs if element}
+
 def _parse_first_record(record):
     # Takes the first record of a species dataset and returns the name
     # and comment fields
@@ -0,0 +1,276 @@
+"""Validation of a database against reference tables.
+
+Every reference point (species and temperature) is evaluated with the
+vectorised engine (see the `vector` module) and compared with the
+reference values of heat capacity, enthalpy and entropy. Errors are
+reported per species, property and temperature interval.
+
+References are tables of CEA output (see `ceaout.parse`) or plain
+tables such as ThermoBuild output (see `ceaout.parse_tables`):
+
+    >>> packed = PackedDB.from_db(thermoinp.DB())
+    >>> report = validate(packed, read('cap_out.txt'))
+    >>> report.failures()
+    []
+    >>> print(report.formatted())
+
+Tables can also be generated from a database with `tabulate`, e.g. to
+compare a modified database with the original:
+
+    >>> T = np.linspace(200.0, 6000.0, 50)
+    >>> report = validate(new, tabulate(old, T))
+
+The module can be run as a script, e.g. to gate changes to a
+database; the exit status is non-zero if any point is out of
+tolerance or any reference species is missing. Sources (`--source`)
+overlay the NASA Glenn database:
+
+    $ python -m thermodata.validate --source custom.inp cap_out.txt
+    $ python -m thermodata.validate --name CO2 tableCO2.txt
+
+Properties (see `PROPERTIES`) are in the units of CEA output; J/mol-K
+and kJ/mol. H298 is the enthalpy of formation of the species (or its
+assigned enthalpy).
+"""
+import sys
+import argparse
+import collections
+
+import numpy as np
+
+from thermodata import ceaout, vector
+
+
+#: Validated properties (columns of ceaout.COLUMNS).
+PROPERTIES = ('Cp', 'HH298', 'S', 'GH298T', 'H')
+
+#: Default tolerances; a point fails if
+#: |value - reference| > atol + rtol * |reference|.
+ATOL = 1e-3
+RTOL = 1e-5
+
+#: Name reported (missing) for reference tables without a species.
+UNNAMED = '(unnamed)'
+
+
+Error = collections.namedtuple('Error',
+                               'name, property, interval, npoints, '
+                               'max_abs, max_rel, nfail')
+Error.__doc__ = """Errors of a property of a species in an interval.
+
+    npoints : number of reference points compared
+    max_abs : maximum absolute error
+    max_rel : maximum relative error (NaN if all references are 0)
+    nfail : number of points out of tolerance
+"""
+
+
+class Report(object):
+    """Validation report.
+
+    Attributes
+    ----------
+
+        errors : list of Error sorted by species, property and
+            interval
+        missing : names of reference species not in the database
+            (`UNNAMED` for tables without a species name)
+        skipped : number of reference points outside the temperature
+            range of the database species (e.g. T = 0 K)
+    """
+    def __init__(self, errors, missing, skipped):
+        self.errors = errors
+        self.missing = missing
+        self.skipped = skipped
+
+    def failures(self):
+        """Return the errors with points out of tolerance."""
+        return [error for error in self.errors if error.nfail]
+
+    def summary(self):
+        """Return {property: (max_abs, max_rel)} over all species."""
+        summary = {}
+        for error in self.errors:
+            max_abs, max_rel = summary.get(error.property,
+                                           (0.0, np.nan))
+            summary[error.property] = (max(max_abs, error.max_abs),
+                                       np.fmax(max_rel, error.max_rel))
+        return summary
+
+    def formatted(self):
+        """Format the report as a table."""
+        spec = '{:<16}{:<8}{:>9}{:>8}{:>12}{:>12}{:>6}'
+        lines = [spec.format('species', 'prop', 'interval', 'points',
+                             'max abs', 'max rel', 'fail'),
+                 '-' * 71]
+        for e in self.errors:
+            lines.append(spec.format(e.name, e.property, e.interval,
+                                     e.npoints,
+                                     '{:.3e}'.format(e.max_abs),
+                                     '{:.3e}'.format(e.max_rel),
+                                     e.nfail))
+        for name in self.missing:
+            lines.append('{:<16}missing'.format(name))
+        return '\n'.join(lines)
+
+
+def read(path, name=None):
+    """Yield the reference tables (ceaout.SpeciesTable) of a file.
+
+    CEA output is recognised by its headings; other files are read as
+    plain tables, `name` being the species of an unnamed table.
+    """
+    with open(path, 'r') as f:
+        head = f.read(4096)
+        f.seek(0)
+        if 'TEMPERATURE SCHEDULE' in head or 'COEFFICIENTS FOR' in head:
+            tables = (record for record in ceaout.parse(f)
+                      if isinstance(record, ceaout.SpeciesTable))
+        else:
+            tables = ceaout.parse_tables(f, name)
+        for table in tables:
+            yield table
+
+
+def validate(packed, tables, atol=ATOL, rtol=RTOL):
+    """Validate a packed database against reference tables.
+
+    Arguments
+    ---------
+
+        packed : packed.PackedDB (or binary.BinaryDB)
+        tables : iterable of ceaout.SpeciesTable
+        atol, rtol : tolerances (see module constants)
+
+    Tables without a species name (see `read`) or of species not in
+    the database are reported missing.
+
+    Returns a Report.
+    """
+    # Flatten the reference points
+    index, data, missing = [], [], []
+    for table in tables:
+        if not len(table.data):
+            continue
+        if table.name is None:
+            missing.append(UNNAMED)
+            continue
+        try:
+            i = packed.index(table.name)
+        except KeyError:
+            missing.append(table.name)
+            continue
+        index.append(np.full(len(table.data), i))
+        data.append(table.data)
+    if not data:
+        return Report([], missing, 0)
+    index = np.concatenate(index)
+    data = np.concatenate(data)
+    T = data[:, 0]
+
+    # Evaluate
+    interval, values = _evaluate(packed, index, T)
+
+    # Group by species, interval and property
+    defined = interval >= 0
+    width = int(packed.table['nintervals'].max())
+    groups = index * width + interval
+    errors = []
+    for prop in PROPERTIES:
+        reference = data[:, ceaout.COLUMNS.index(prop)]
+        mask = (defined & np.isfinite(reference) &
+                np.isfinite(values[prop]))
+        if not mask.any():
+            continue
+        ref = reference[mask]
+        error = np.abs(values[prop][mask] - ref)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = np.where(ref != 0, error / np.abs(ref), np.nan)
+        fail = error > atol + rtol * np.abs(ref)
+
+        keys, inverse = np.unique(groups[mask], return_inverse=True)
+        max_abs = np.zeros(len(keys))
+        np.maximum.at(max_abs, inverse, error)
+        max_rel = np.full(len(keys), np.nan)
+        np.fmax.at(max_rel, inverse, relative)
+        npoints = np.bincount(inverse, minlength=len(keys))
+        nfail = np.bincount(inverse, weights=fail, minlength=len(keys))
+        for k, key in enumerate(keys.tolist()):
+            name = packed.table['name'][key // width].decode('ascii')
+            errors.append(Error(name, prop, key % width, int(npoints[k]),
+                                float(max_abs[k]), float(max_rel[k]),
+                                int(nfail[k])))
+
+    order = {prop: i for i, prop in enumerate(PROPERTIES)}
+    errors.sort(key=lambda e: (e.name, order[e.property], e.interval))
+    skipped = int(np.count_nonzero(~defined))
+    return Report(errors, missing, skipped)
+
+
+def tabulate(packed, T, names=None):
+    """Yield tables (ceaout.SpeciesTable) of species `names` (default:
+    all) evaluated at temperatures T.
+
+    Points outside the temperature range of a species are omitted.
+    """
+    T = np.asarray(T, dtype=float)
+    for i in vector.species_index(packed, names).tolist():
+        index = np.full(len(T), i)
+        interval, values = _evaluate(packed, index, T)
+        data = np.full((len(T), len(ceaout.COLUMNS)), np.nan)
+        data[:, 0] = T
+        for prop in PROPERTIES:
+            data[:, ceaout.COLUMNS.index(prop)] = values[prop]
+        name = packed.table['name'][i].decode('ascii')
+        yield ceaout.SpeciesTable(name, None, '', data[interval >= 0])
+
+
+def main(argv=None):
+    from thermodata import thermoinp, packed
+    parser = argparse.ArgumentParser(prog='python -m thermodata.validate')
+    parser.add_argument('references', nargs='+',
+                        help='reference files (CEA output or tables)')
+    parser.add_argument('--source', action='append', default=[],
+                        help='thermo.inp source overlaid on the NASA '
+                             'Glenn database; its species replace those '
+                             'of the same name (repeatable, in '
+                             'increasing order of precedence)')
+    parser.add_argument('--name',
+                        help='species of tables without a species line')
+    parser.add_argument('--atol', type=float, default=ATOL)
+    parser.add_argument('--rtol', type=float, default=RTOL)
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='print failures only')
+    args = parser.parse_args(argv)
+
+    db = thermoinp.DB(sources=(thermoinp.SOURCE,) + tuple(args.source))
+    tables = (table for path in args.references
+              for table in read(path, args.name))
+    report = validate(packed.PackedDB.from_db(db), tables,
+                      args.atol, args.rtol)
+    if args.quiet:
+        report.errors = report.failures()
+    print(report.formatted())
+    return 1 if report.failures() or report.missing else 0
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _evaluate(packed, index, T):
+    # Return (interval, {property: values}) for (species, T) pairs in
+    # the units of CEA output
+    interval, Cp, H, S = vector.evaluate_pairs(packed, index, T)
+    entries = packed.table[index]
+    H298 = np.where(np.isnan(entries['h_formation']),
+                    entries['h_assigned'], entries['h_formation'])
+    HH298 = (H - H298) / 1000.0
+    return interval, {'Cp': Cp,
+                      'HH298': HH298,
+                      'S': S,
+                      'GH298T': S - HH298 * 1000.0 / T,
+                      'H': H / 1000.0}
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""Vectorised evaluation of the state functions.
+
+Evaluates heat capacity, enthalpy and entropy for many species and
+temperatures at once from a packed database (see the `packed` module)
+rather than one `Thermo` instance and one temperature at a time.
+
+The primitive is `evaluate_pairs`, which evaluates arbitrary (species,
+temperature) pairs given as two index-aligned arrays. `evaluate`
+evaluates every combination of a set of species and temperatures:
+
+    >>> packed = PackedDB.from_db(thermoinp.DB())
+    >>> result = evaluate(packed, [298.15, 1000.0], ('CO2', 'H2O'))
+    >>> result.Cp
+    array([[37.13..., 54.30...],
+           [33.58..., 41.29...]])
+
+Intervals are selected as in `Thermo`; the first interval with
+T <= Tmax. Temperatures outside the range of a species' intervals
+(or species without intervals) give NaN unless `extrapolate` is set,
+in which case the nearest interval is used.
+
+Temperature derivatives are evaluated analytically in the same pass
+if `derivatives` is set; dCp/dT from the coefficients, dH/dT = Cp and
+dS/dT = Cp/T. `mix` evaluates the state functions of ideal mixtures
+and their derivatives with respect to temperature and composition:
+
+    >>> result = evaluate(packed, T, ('N2', 'O2'), derivatives=True)
+    >>> mixture = mix(result, [0.79, 0.21])
+    >>> mixture.Cp, mixture.dCp, mixture.jacobian('S')
+
+`temperature` inverts enthalpy or entropy to temperature.
+"""
+import numpy as np
+
+from thermodata import constants
+
+
+#: Relative tolerance and maximum iterations of `temperature`.
+TOL = 1e-10
+MAXITER = 100
+
+
+class Properties(object):
+    """State functions of species (rows) at temperatures (columns).
+
+    Attributes
+    ----------
+
+        names : species names
+        T : temperatures, K
+        interval : interval indexes (-1 where undefined)
+        Cp : molar heat capacity, J/mol-K
+        H : molar enthalpy, J/mol
+        S : molar entropy, J/mol-K
+        dCp, dH, dS : temperature derivatives of Cp (J/mol-K^2), H
+            (J/mol-K) and S (J/mol-K^2); None unless evaluated with
+            `derivatives`
+    """
+    def __init__(self, names, T, interval, Cp, H, S, dCp=None):
+        self.names = names
+        self.T = T
+        self.interval = interval
+        self.Cp = Cp
+        self.H = H
+        self.S = S
+        self.dCp = dCp
+
+    @property
+    def dH(self):
+        """dH/dT (= Cp), J/mol-K"""
+        return None if self.dCp is None else self.Cp
+
+    @property
+    def dS(self):
+        """dS/dT (= Cp/T), J/mol-K^2"""
+        return None if self.dCp is None else self.Cp / self.T
+
+
+class Mixture(object):
+    """State functions of ideal mixtures at temperatures T.
+
+    Attributes
+    ----------
+
+        names : species names
+        T : temperatures, K
+        X : mole fractions, (nspecies, nT)
+        species : Properties of the species
+        Cp, H, S : molar heat capacity (J/mol-K), enthalpy (J/mol)
+            and entropy (J/mol-K, including the entropy of mixing at
+            standard pressure)
+        dCp, dH, dS : temperature derivatives (as Properties)
+    """
+    def __init__(self, species, X):
+        self.names = species.names
+        self.T = species.T
+        self.species = species
+        self.X = X
+        self.Cp = np.sum(X * species.Cp, axis=0)
+        self.H = np.sum(X * species.H, axis=0)
+        self.S = np.sum(X * self._partial_entropy(), axis=0)
+        self.dCp = (None if species.dCp is None
+                    else np.sum(X * species.dCp, axis=0))
+
+    @property
+    def dH(self):
+        """dH/dT (= Cp), J/mol-K"""
+        return None if self.dCp is None else self.Cp
+
+    @property
+    def dS(self):
+        """dS/dT (= Cp/T), J/mol-K^2"""
+        return None if self.dCp is None else self.Cp / self.T
+
+    def jacobian(self, prop):
+        """Return the derivatives of property `prop` ('Cp', 'H', 'S'
+        or 'dCp') with respect to the mole fractions.
+
+        Returns an array (nspecies, nT); row i is d(prop)/dX_i with
+        the other mole fractions fixed. Derivatives of S are inf
+        where X_i is 0.
+        """
+        if prop == 'S':
+            with np.errstate(divide='ignore'):
+                return (self.species.S - constants.R_CEA
+                        * (np.log(self.X) + 1.0))
+        values = getattr(self.species, prop)
+        if values is None:
+            raise ValueError("Species evaluated without derivatives")
+        return np.broadcast_to(values, self.X.shape).copy()
+
+    def _partial_entropy(self):
+        # S_i - R ln X_i (X_i ln X_i vanishes where X_i is 0)
+        X = np.where(self.X > 0, self.X, 1.0)
+        return self.species.S - constants.R_CEA * np.log(X)
+
+
+def species_index(packed, names=None):
+    """Return the table indexes of species `names` (default: all)."""
+    if names is None:
+        return np.arange(len(packed))
+    return np.array([packed.index(name) for name in names], dtype=int)
+
+
+def rows(packed, index, T, extrapolate=False):
+    """Return the coefficient block rows for (species, T) pairs.
+
+    `index` (table indexes) and `T` are broadcast against each other.
+    Rows are -1 where no interval applies (see module docstring).
+    """
+    index, T = np.broadcast_arrays(np.asarray(index),
+                                   np.asarray(T, dtype=float))
+    start = packed.table['start'][index].astype(np.intp)
+    count = packed.table['nintervals'][index].astype(np.intp)
+    block = packed.block
+    nrows = len(block)
+    if nrows == 0:
+        return np.full(index.shape, -1, dtype=np.intp)
+
+    # Number of intervals with Tmax < T; one pass per interval
+    # position (at most 6 in the source database).
+    below = np.zeros(index.shape, dtype=np.intp)
+    for k in range(int(count.max()) if count.size else 0):
+        valid = k < count
+        Tmax = block[np.minimum(start + k, nrows - 1), 1]
+        below += valid & (Tmax < T)
+
+    last = count - 1
+    selected = start + np.minimum(below, last)
+    if extrapolate:
+        undefined = count == 0
+    else:
+        Tmin = block[np.minimum(start, nrows - 1), 0]
+        undefined = (count == 0) | (below > last) | (T < Tmin)
+    return np.where(undefined, -1, selected)
+
+
+def dimensionless(packed, rows, T, derivative=False):
+    """Return (Cp/R, H/RT, S/R) for block `rows` at temperatures T.
+
+    With `derivative`, d(Cp/R)/dT (1/K) is appended. NaN where rows
+    are -1.
+    """
+    T = np.asarray(T, dtype=float)
+    coeffs = packed.block[np.maximum(rows, 0)]
+    a = [coeffs[..., i] for i in range(2, 9)]
+    b1, b2 = coeffs[..., 9], coeffs[..., 10]
+
+    # Undefined points (e.g. T = 0) are masked below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logT = np.log(T)
+        T2, T3, T4 = T**2, T**3, T**4
+        cp = (a[0] / T2 + a[1] / T + a[2] + a[3] * T + a[4] * T2
+              + a[5] * T3 + a[6] * T4)
+        h = (- a[0] / T2 + (a[1] * logT + b1) / T + a[2]
+             + a[3] * T / 2.0 + a[4] * T2 / 3.0 + a[5] * T3 / 4.0
+             + a[6] * T4 / 5.0)
+        s = (- a[0] / T2 / 2.0 - a[1] / T + (a[2] * logT + b2)
+             + a[3] * T + a[4] * T2 / 2.0 + a[5] * T3 / 3.0
+             + a[6] * T4 / 4.0)
+        functions = (cp, h, s)
+        if derivative:
+            dcp = (- 2.0 * a[0] / T3 - a[1] / T2 + a[3]
+                   + 2.0 * a[4] * T + 3.0 * a[5] * T2 + 4.0 * a[6] * T3)
+            functions += (dcp,)
+
+    undefined = rows < 0
+    return tuple(np.where(undefined, np.nan, values)
+                 for values in functions)
+
+
+def evaluate_pairs(packed, index, T, extrapolate=False,
+                   derivatives=False):
+    """Evaluate (species, T) pairs.
+
+    Returns (interval, Cp, H, S) arrays of the broadcast shape of
+    `index` and `T` where interval is the interval index within each
+    species (-1 where undefined). With `derivatives`, dCp/dT is
+    appended. Units as `Properties`.
+    """
+    T = np.asarray(T, dtype=float)
+    selected = rows(packed, index, T, extrapolate)
+    functions = dimensionless(packed, selected, T, derivatives)
+    start = packed.table['start'][np.asarray(index)]
+    interval = np.where(selected < 0, -1, selected - start)
+    R = constants.R_CEA
+    result = (interval, functions[0] * R, functions[1] * R * T,
+              functions[2] * R)
+    if derivatives:
+        result += (functions[3] * R,)
+    return result
+
+
+def evaluate(packed, T, names=None, extrapolate=False, derivatives=False):
+    """Evaluate species `names` (default: all) at temperatures T.
+
+    Returns Properties with arrays of shape (len(names), len(T)).
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    index = species_index(packed, names)
+    result = evaluate_pairs(packed, index[:, None], T[None, :],
+                            extrapolate, derivatives)
+    if names is None:
+        names = packed.names
+    return Properties(list(names), T, *result)
+
+
+def mix(properties, X):
+    """Return the Mixture of species Properties with mole fractions X.
+
+    X is either one composition (nspecies,) or one per temperature
+    (nspecies, nT).
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    X = np.broadcast_to(X, (len(properties.names), len(properties.T)))
+    return Mixture(properties, X)
+
+
+def temperature(packed, index, prop, values, T=1000.0):
+    """Return the temperatures at which species have enthalpy or
+    entropy `values`.
+
+    `prop` is 'H' (values in J/mol) or 'S' (J/mol-K); `index` (table
+    indexes), `values` and the initial temperatures T are broadcast
+    against each other. Solved by Newton iteration, bracketed by the
+    range of the species' intervals (both functions increase with
+    temperature); NaN where the values are outside the range.
+
+        >>> temperature(packed, packed.index('N2'), 'H', [0.0, 2.0e4])
+        array([298.14..., 955.09...])
+    """
+    if prop not in ('H', 'S'):
+        raise ValueError("Property H or S expected: {}".format(prop))
+    index, values, T = np.broadcast_arrays(np.asarray(index),
+                                           np.asarray(values, dtype=float),
+                                           np.asarray(T, dtype=float))
+    shape = T.shape
+    index, values = index.ravel(), values.ravel()
+    def residual(T, todo):
+        Cp, H, S = evaluate_pairs(packed, index[todo], T)[1:]
+        if prop == 'H':
+            return H - values[todo], Cp
+        return S - values[todo], Cp / T
+
+    start = packed.table['start'][index].astype(np.intp)
+    count = packed.table['nintervals'][index].astype(np.intp)
+    last = np.maximum(start + count - 1, 0)
+    lower = np.where(count > 0, packed.block[start, 0], np.nan)
+    upper = np.where(count > 0, packed.block[last, 1], np.nan)
+    everything = slice(None)
+    with np.errstate(invalid='ignore'):
+        defined = ((residual(lower, everything)[0] <= 0.0)
+                   & (residual(upper, everything)[0] >= 0.0))
+    T = np.where(defined, np.clip(T.ravel(), lower, upper), np.nan)
+
+    # Newton steps leaving the bracket bisect it instead. Points stop
+    # once converged (each result is independent of the others) and
+    # are dropped from the iteration.
+    todo = np.flatnonzero(defined)
+    for iteration in range(MAXITER):
+        if not todo.size:
+            break
+        x, lo, hi = T[todo], lower[todo], upper[todo]
+        f, df = residual(x, todo)
+        lo = np.where(f < 0.0, x, lo)
+        hi = np.where(f > 0.0, x, hi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = x - f / df
+            inside = (step > lo) & (step < hi)
+        step = np.where(inside, step, 0.5 * (lo + hi))
+        converged = ((np.abs(step - x) <= TOL * x) | (hi - lo <= TOL * x)
+                     | (f == 0.0))
+        T[todo] = np.where(f == 0.0, x, step)
+        lower[todo], upper[todo] = lo, hi
+        todo = todo[~converged]
+    return T.reshape(shape)